@@ -0,0 +1,137 @@
+"""
+Load generator untuk ai_server.py — pengganti game client sungguhan saat uji beban
+- N client konkuren, masing-masing mengirim request acak (closed loop, `--inflight` per client)
+- Laporan p50/p99 latency sisi client, throughput, dan statistik batch dari server
+- `--spawn`: jalankan server di proses yang sama (port bebas); `--check`: bandingkan
+  respons dengan get_all_scores / get_bot_action yang dipanggil langsung
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+import fuzzy
+import ai_server
+
+BOT_TYPES = ['Zombie', 'Skeleton', 'Enderman', 'Boss']
+
+def random_request(rng, rid, op):
+    bot_type = rng.choice(BOT_TYPES)
+    req = {
+        'id': rid, 'op': op, 'bot_type': bot_type,
+        'hp_player': rng.randint(0, 20), 'hp_bot': rng.randint(0, 30),
+        'mana_player': rng.choice([0, 20, 50, 100]),
+        'mana_bot': 0 if bot_type in ('Zombie', 'Skeleton') else rng.randint(0, 100),
+        'cd_player': rng.randint(0, 10),
+    }
+    if op == 'action':
+        cells = [(x, y) for x in range(8) for y in range(6)]
+        bot_pos, player_pos = rng.sample(cells, 2)
+        req.update({'bot_pos': list(bot_pos), 'player_pos': list(player_pos),
+                    'occupied': [list(player_pos)], 'grid_w': 8, 'grid_h': 6})
+    return req
+
+def expected(req):
+    # jawaban referensi lewat API skalar fuzzy
+    args = [req[f] for f in ai_server._FIELDS]
+    if req['op'] == 'scores':
+        return {'scores': fuzzy.get_all_scores(req['bot_type'], *args)}
+    act, tgt = fuzzy.get_bot_action(req['bot_type'], *args, tuple(req['bot_pos']), tuple(req['player_pos']),
+                                    {tuple(p) for p in req['occupied']}, req['grid_w'], req['grid_h'])
+    return {'action': [act, list(tgt) if tgt is not None else None]}
+
+async def run_client(host, port, cid, n_requests, inflight, op, seed, latencies, responses):
+    rng = random.Random(seed * 1000 + cid)
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = {}
+    sem = asyncio.Semaphore(inflight)
+
+    async def read_loop():
+        for _ in range(n_requests):
+            res = json.loads(await reader.readline())
+            latencies.append((time.perf_counter() - sent_at.pop(res['id'])) * 1000.0)
+            responses[res['id']] = res
+            sem.release()
+
+    reader_task = asyncio.ensure_future(read_loop())
+    for i in range(n_requests):
+        await sem.acquire()
+        rid = cid * n_requests + i
+        req = random_request(rng, rid, rng.choice(['scores', 'action']) if op == 'mixed' else op)
+        responses[('req', rid)] = req
+        sent_at[rid] = time.perf_counter()
+        writer.write((json.dumps(req) + "\n").encode())
+        await writer.drain()
+    await reader_task
+    writer.close()
+    await writer.wait_closed()
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"id": "stats", "op": "stats"}\n')
+    await writer.drain()
+    res = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return res['stats']
+
+async def run(args):
+    server = batcher = None
+    host, port = args.host, args.port
+    if args.spawn:
+        server, batcher = await ai_server.start_server(host, 0, args.window_ms, args.max_batch)
+        port = server.sockets[0].getsockname()[1]
+    latencies, responses = [], {}
+    t0 = time.perf_counter()
+    await asyncio.gather(*[run_client(host, port, cid, args.requests, args.inflight, args.op,
+                                      args.seed, latencies, responses)
+                           for cid in range(args.clients)])
+    elapsed = time.perf_counter() - t0
+    stats = await fetch_stats(host, port)
+    if server is not None:
+        server.close()
+        await asyncio.sleep(0.05)   # beri waktu handler koneksi membaca EOF
+        await server.wait_closed()
+        await batcher.close()
+    return latencies, responses, elapsed, stats
+
+def main():
+    ap = argparse.ArgumentParser(description="Load generator for ai_server.py")
+    ap.add_argument("--host", default=ai_server.HOST)
+    ap.add_argument("--port", type=int, default=ai_server.PORT)
+    ap.add_argument("--spawn", action="store_true", help="jalankan server in-process")
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=200, help="request per client")
+    ap.add_argument("--inflight", type=int, default=1, help="request outstanding per client")
+    ap.add_argument("--op", choices=['scores', 'action', 'mixed'], default='mixed')
+    ap.add_argument("--window-ms", type=float, default=ai_server.BATCH_WINDOW_MS)
+    ap.add_argument("--max-batch", type=int, default=ai_server.BATCH_MAX)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--check", action="store_true", help="verifikasi respons vs API skalar")
+    args = ap.parse_args()
+
+    latencies, responses, elapsed, stats = asyncio.run(run(args))
+    lat = np.array(latencies)
+    total = len(latencies)
+    print(f"clients={args.clients} requests={total} inflight={args.inflight} op={args.op}")
+    print(f"client  p50={np.percentile(lat, 50):.2f}ms p99={np.percentile(lat, 99):.2f}ms "
+          f"throughput={total / elapsed:.0f} req/s")
+    print(f"server  p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+          f"batches={stats['batches']} mean_batch={stats['mean_batch']:.1f}")
+    if args.check:
+        bad = 0
+        for key, req in responses.items():
+            if not isinstance(key, tuple):
+                continue
+            res = dict(responses[req['id']])
+            res.pop('id')
+            if res != expected(req):
+                bad += 1
+        print(f"check: {bad} mismatches of {total}")
+        if bad:
+            raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+AI decision service — get_all_scores / get_bot_action lewat socket lokal (asyncio)
+- Protokol: satu objek JSON per baris (newline-delimited) di TCP loopback
+- Request yang datang dalam jendela pendek digabung jadi satu panggilan batch inference
+- Statistik latency (p50/p99) dan throughput bisa diminta lewat op "stats"
+
+Contoh request:
+  {"id": 1, "op": "scores", "bot_type": "Boss", "hp_player": 12, "hp_bot": 20,
+   "mana_player": 0, "mana_bot": 60, "cd_player": 5}
+  {"id": 2, "op": "action", "bot_type": "Zombie", "hp_player": 12, "hp_bot": 20,
+   "mana_player": 0, "mana_bot": 0, "cd_player": 5,
+   "bot_pos": [6, 3], "player_pos": [1, 3], "occupied": [[1, 3]], "grid_w": 8, "grid_h": 6}
+Respons: {"id": 1, "scores": {...}} / {"id": 2, "action": ["MOVE_CLOSE", [5, 3]]} / {"id": .., "error": ".."}
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import fuzzy
+
+HOST = "127.0.0.1"
+PORT = 8765
+BATCH_WINDOW_MS = 2.0      # tunggu request lain selama ini sebelum inference dijalankan
+BATCH_MAX = 512
+LATENCY_WINDOW = 10000     # jumlah sampel latency terakhir untuk p50/p99
+
+_FIELDS = ('hp_player', 'hp_bot', 'mana_player', 'mana_bot', 'cd_player')
+
+def _score_group(bot_type, reqs):
+    # satu panggilan get_all_scores_batch untuk semua request dengan bot_type sama
+    cols = [[float(r.get(f, 0)) for r in reqs] for f in _FIELDS]
+    batch = fuzzy.get_all_scores_batch(bot_type, *cols)
+    return [{meth: float(vals[i]) for meth, vals in batch.items()} for i in range(len(reqs))]
+
+def _action(req, scores):
+    # sama dengan get_bot_action; skor Mamdani diambil dari hasil batch
+    bot_type = req['bot_type']
+    if bot_type in ('Zombie', 'Skeleton'):
+        mana_p, mana_b = 0, 0
+    else:
+        mana_p, mana_b = req.get('mana_player', 0), req.get('mana_bot', 0)
+    act, tgt = fuzzy.get_final_action(bot_type, req.get('hp_player', 0), req.get('hp_bot', 0),
+                                      mana_p, mana_b, req.get('cd_player', 0),
+                                      tuple(req['bot_pos']), tuple(req['player_pos']),
+                                      {tuple(p) for p in req.get('occupied', [])},
+                                      req.get('grid_w', 8), req.get('grid_h', 6),
+                                      score=scores['mamdani'])
+    return [act, list(tgt) if tgt is not None else None]
+
+def decide_batch(reqs):
+    """Jalankan inference untuk list request sekaligus; hasil berupa list respons (urutan sama)."""
+    out = [None] * len(reqs)
+    by_type = {}
+    for i, req in enumerate(reqs):
+        if req.get('op', 'scores') not in ('scores', 'action') or 'bot_type' not in req:
+            out[i] = {'id': req.get('id'), 'error': 'bad request'}
+            continue
+        by_type.setdefault(req['bot_type'], []).append(i)
+    for bot_type, idx in by_type.items():
+        try:
+            scores = _score_group(bot_type, [reqs[i] for i in idx])
+        except Exception as e:
+            for i in idx:
+                out[i] = {'id': reqs[i].get('id'), 'error': str(e)}
+            continue
+        for i, sc in zip(idx, scores):
+            req = reqs[i]
+            try:
+                if req.get('op', 'scores') == 'action':
+                    out[i] = {'id': req.get('id'), 'action': _action(req, sc)}
+                else:
+                    out[i] = {'id': req.get('id'), 'scores': sc}
+            except Exception as e:
+                out[i] = {'id': req.get('id'), 'error': str(e)}
+    return out
+
+class MicroBatcher:
+    """
+    Kumpulkan request selama window_ms (atau sampai max_batch), lalu jalankan
+    decide_batch sekali di thread executor supaya event loop tetap melayani koneksi.
+    """
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch=BATCH_MAX):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-batch')
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def submit(self, req):
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((req, fut, time.perf_counter()))
+        return await fut
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # sisa antrian yang sudah ada ikut diambil tanpa menunggu
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            reqs = [req for req, fut, t0 in items]
+            try:
+                results = await loop.run_in_executor(self.executor, decide_batch, reqs)
+            except Exception as e:
+                results = [{'id': req.get('id'), 'error': str(e)} for req in reqs]
+            now = time.perf_counter()
+            self.batches += 1
+            for (req, fut, t0), res in zip(items, results):
+                self.requests += 1
+                self.latencies.append((now - t0) * 1000.0)
+                if not fut.done():
+                    fut.set_result(res)
+
+    def stats(self):
+        lat = np.array(self.latencies) if self.latencies else np.zeros(1)
+        elapsed = time.perf_counter() - self.started
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch': self.requests / self.batches if self.batches else 0.0,
+            'p50_ms': float(np.percentile(lat, 50)),
+            'p99_ms': float(np.percentile(lat, 99)),
+            'throughput_rps': self.requests / elapsed if elapsed > 0 else 0.0,
+        }
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+async def handle_client(batcher, reader, writer):
+    pending = set()
+    lock = asyncio.Lock()
+
+    async def reply(req):
+        res = await batcher.submit(req)
+        async with lock:
+            writer.write((json.dumps(res) + "\n").encode())
+            await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                req = json.loads(line)
+            except ValueError:
+                writer.write(b'{"id": null, "error": "invalid json"}\n')
+                continue
+            if not isinstance(req, dict):
+                # JSON valid tapi bukan objek (mis. [1] atau 42): tidak ada id untuk dibalas
+                writer.write(b'{"id": null, "error": "request must be a JSON object"}\n')
+                continue
+            if req.get('op') == 'stats':
+                writer.write((json.dumps({'id': req.get('id'), 'stats': batcher.stats()}) + "\n").encode())
+                continue
+            # request di-pipeline: tiap request jalan sebagai task sendiri, respons membawa id
+            task = asyncio.ensure_future(reply(req))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        writer.close()
+
+async def start_server(host=HOST, port=PORT, window_ms=BATCH_WINDOW_MS, max_batch=BATCH_MAX):
+    """Mulai server di event loop yang sedang berjalan; return (server, batcher)."""
+    batcher = MicroBatcher(window_ms, max_batch)
+    batcher.start()
+    server = await asyncio.start_server(lambda r, w: handle_client(batcher, r, w), host, port)
+    return server, batcher
+
+async def serve(host, port, window_ms, max_batch, report_s):
+    server, batcher = await start_server(host, port, window_ms, max_batch)
+    addr = server.sockets[0].getsockname()
+    print(f"AI service listening on {addr[0]}:{addr[1]} (window {window_ms} ms, max batch {max_batch})")
+    last = 0
+    try:
+        async with server:
+            while True:
+                await asyncio.sleep(report_s)
+                st = batcher.stats()
+                if st['requests'] == last:
+                    continue
+                # throughput per interval laporan; p50/p99 dari LATENCY_WINDOW sampel terakhir
+                rate = (st['requests'] - last) / report_s
+                last = st['requests']
+                print(f"req={st['requests']} batches={st['batches']} mean_batch={st['mean_batch']:.1f} "
+                      f"p50={st['p50_ms']:.2f}ms p99={st['p99_ms']:.2f}ms {rate:.0f} req/s")
+    finally:
+        await batcher.close()
+
+def main():
+    ap = argparse.ArgumentParser(description="Local fuzzy AI decision service")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS)
+    ap.add_argument("--max-batch", type=int, default=BATCH_MAX)
+    ap.add_argument("--report", type=float, default=5.0, help="interval print statistik (detik)")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.window_ms, args.max_batch, args.report))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+Benchmark suite — inference, keputusan, pathfinding dan render headless
+- Tiap benchmark diukur beberapa ronde; yang dibandingkan adalah median waktu per panggilan
+- Baseline disimpan di JSON (default bench_baseline.json); run berikutnya gagal (exit 1)
+  jika median ada yang lebih lambat dari baseline * (1 + tolerance)
+- Render memakai SDL dummy video driver, jadi jalan offline tanpa display
+
+Pemakaian:
+  python bench.py --save            # ukur & simpan baseline mesin ini
+  python bench.py                   # bandingkan dengan baseline (tolerance default 25%)
+  python bench.py -k find_path -t 0.5
+Perbandingan default memakai median rasio terhadap beban referensi yang diukur bergantian
+dengan tiap ronde (--raw untuk waktu mentah), supaya drift kecepatan mesin tidak terbaca sebagai regresi.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import fuzzy
+
+BASELINE = "bench_baseline.json"
+TOLERANCE = 0.25
+ROUNDS = 15
+TARGET_ROUND_S = 0.02      # tiap ronde kira-kira selama ini (jumlah iterasi dikalibrasi)
+
+ENTITIES = ['Zombie', 'Skeleton', 'Enderman', 'Boss']
+METHODS = ['mamdani', 'sugeno', 'tsukamoto']
+GRID_SIZES = [(8, 6), (16, 12), (32, 24)]
+BATCH_N = 256
+
+BENCHES = []   # (nama, setup) ; setup() -> fungsi tanpa argumen yang diukur
+
+def bench(name):
+    def register(setup):
+        BENCHES.append((name, setup))
+        return setup
+    return register
+
+SCALAR_INPUTS = 4096       # > flush_after_run skfuzzy (1000): tiap panggilan benar-benar menghitung
+
+def _inputs(rng, n):
+    # state acak (float) dalam rentang game: HP player 0-20, HP musuh 0-30, mana 0-100, cd 0-10.
+    # Nilai float unik supaya cache hasil ControlSystemSimulation tidak ikut terukur.
+    return [(rng.uniform(0, 20), rng.uniform(0, 30), 0.0, rng.uniform(0, 100), rng.uniform(0, 10))
+            for _ in range(n)]
+
+def _cycle(fn, items, block=1):
+    # panggil fn bergiliran pada items supaya tidak hanya mengukur satu titik input;
+    # block > 1: satu "panggilan" = block item berurutan (untuk fungsi yang biayanya tergantung cabang)
+    state = {'i': 0}
+    n = len(items)
+
+    def run():
+        i = state['i']
+        state['i'] = (i + block) % n
+        for k in range(i, i + block):
+            fn(*items[k % n])
+    return run
+
+# --- inference: get_all_scores & tiap metode per entity (skalar) + batch ---
+def _register_inference():
+    for etype in ENTITIES:
+        mana = etype not in ('Zombie', 'Skeleton')
+        suffix = 'with_mana' if mana else 'no_mana'
+
+        def setup_all(etype=etype):
+            items = [(etype,) + x for x in _inputs(random.Random(1), SCALAR_INPUTS)]
+            return _cycle(fuzzy.get_all_scores, items)
+        bench(f'get_all_scores[{etype}]')(setup_all)
+
+        for meth in METHODS:
+            def setup_meth(etype=etype, meth=meth, mana=mana, suffix=suffix):
+                fn = getattr(fuzzy, f'{meth}_{suffix}')
+                rows = _inputs(random.Random(2), SCALAR_INPUTS)
+                items = rows if mana else [(hp_p, hp_b, cd) for hp_p, hp_b, _, _, cd in rows]
+                return _cycle(fn, items)
+            bench(f'{meth}[{etype}]')(setup_meth)
+
+        def setup_batch(etype=etype):
+            cols = np.array(_inputs(random.Random(3), BATCH_N), dtype=float).T
+            return lambda: fuzzy.get_all_scores_batch(etype, *cols)
+        bench(f'get_all_scores_batch[{etype}] x{BATCH_N}')(setup_batch)
+
+_register_inference()
+
+FINAL_ACTION_BLOCK = 16
+
+@bench(f'get_final_action x{FINAL_ACTION_BLOCK}')
+def _setup_final_action():
+    rng = random.Random(4)
+    cells = [(x, y) for x in range(8) for y in range(6)]
+    items = []
+    for etype in ENTITIES * (SCALAR_INPUTS // 4):
+        hp_p, hp_b, mana_p, mana_b, cd = _inputs(rng, 1)[0]
+        pos, ppos = rng.sample(cells, 2)
+        items.append((etype, hp_p, hp_b, mana_p, mana_b, cd, pos, ppos, {ppos}, 8, 6))
+    return _cycle(fuzzy.get_final_action, items, FINAL_ACTION_BLOCK)
+
+# --- pathfinding: Game.find_path & bfs_reachable pada beberapa ukuran grid ---
+def _with_grid(w, h, fn):
+    # in_bounds membaca GRID_W/GRID_H dari modul main; ganti sementara selama pengukuran
+    import main
+
+    def run():
+        old = main.GRID_W, main.GRID_H
+        main.GRID_W, main.GRID_H = w, h
+        try:
+            return fn()
+        finally:
+            main.GRID_W, main.GRID_H = old
+    return run
+
+def _obstacles(rng, w, h, density=0.15):
+    return {(rng.randrange(w), rng.randrange(h)) for _ in range(int(w * h * density))}
+
+def _register_paths():
+    for w, h in GRID_SIZES:
+        def setup_path(w=w, h=h):
+            import main
+            game = main.Game.headless()
+            obstacles = _obstacles(random.Random(5), w, h) - {(0, 0), (w - 1, h - 1)}
+            return _with_grid(w, h, lambda: game.find_path((0, 0), (w - 1, h - 1), obstacles))
+        bench(f'find_path[{w}x{h}]')(setup_path)
+
+        def setup_bfs(w=w, h=h):
+            import main
+            obstacles = _obstacles(random.Random(6), w, h) - {(w // 2, h // 2)}
+            return _with_grid(w, h, lambda: main.bfs_reachable((w // 2, h // 2), max(w, h), obstacles))
+        bench(f'bfs_reachable[{w}x{h}]')(setup_bfs)
+
+_register_paths()
+
+# --- render headless: frame dirty-rect (animasi saja) dan frame penuh ---
+_game = None
+
+def _render_game(stage):
+    global _game
+    import main
+    if _game is None:
+        main.AI_ASYNC = False
+        _game = main.Game()
+    g = _game
+    g.reset(init_from_menu=True)
+    g.stage_index = stage
+    g.spawn_enemy(stage)
+    g.menu_state = 'IN_GAME'
+    g.draw_frame()
+    return g
+
+def _register_render():
+    for stage, label in ((0, 'single'), (4, 'wave')):
+        def setup_dirty(stage=stage):
+            g = _render_game(stage)
+
+            def frame():
+                g.update(1)
+                g.draw_frame()
+            return frame
+        bench(f'render_dirty[{label}]')(setup_dirty)
+
+        def setup_full(stage=stage):
+            g = _render_game(stage)
+
+            def frame():
+                g.update(1)
+                g.renderer.invalidate()
+                g.draw_frame()
+            return frame
+        bench(f'render_full[{label}]')(setup_full)
+
+_register_render()
+
+def _calibrate(fn):
+    # jumlah iterasi supaya satu ronde kira-kira TARGET_ROUND_S
+    fn()   # warm-up (cache, lazy import)
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= TARGET_ROUND_S / 4 or number >= 1 << 20:
+            break
+        number *= 4
+    return max(1, int(number * TARGET_ROUND_S / max(dt, 1e-9)))
+
+def _round(fn, number):
+    t0 = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - t0) / number
+
+def measure(fn, rounds=ROUNDS, ref=None):
+    """
+    Median detik per panggilan dari beberapa ronde. Jika ref diberikan, tiap ronde didahului
+    satu ronde ref dan median rasio fn/ref ikut dikembalikan (None jika tanpa ref).
+    """
+    number = _calibrate(fn)
+    ref_number = _calibrate(ref) if ref is not None else 0
+    times, ratios = [], []
+    for _ in range(rounds):
+        r = _round(ref, ref_number) if ref is not None else None
+        t = _round(fn, number)
+        times.append(t)
+        if r:
+            ratios.append(t / r)
+    return statistics.median(times), (statistics.median(ratios) if ratios else None), number
+
+_REF_X = np.linspace(0.0, 100.0, 101)
+
+def _reference():
+    # beban referensi (loop Python + dict + numpy kecil) untuk menormalkan kecepatan mesin saat ini
+    s = 0.0
+    d = {}
+    for i in range(2000):
+        d[i & 63] = i
+        s += d.get(i & 31, 0) * 0.5
+    np.interp(np.arange(64.0), _REF_X, _REF_X)
+    return s
+
+def run(selected, rounds=ROUNDS):
+    # tiap ronde dipasangkan dengan ronde referensi, jadi burst beban mesin menimpa keduanya
+    results = {}
+    for name, setup in selected:
+        median, ratio, number = measure(setup(), rounds, ref=_reference)
+        results[name] = {'median_us': median * 1e6, 'ref_ratio': ratio}
+        print(f"{name:42s} {median * 1e6:12.2f} us  (x{number}, {ratio:8.3f} ref)", flush=True)
+    return results
+
+def compare(results, baseline, tolerance, raw=False):
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if raw:
+            ratio = res['median_us'] / base['median_us']
+        else:
+            ratio = res['ref_ratio'] / base['ref_ratio']
+        flag = 'REGRESSION' if ratio > 1 + tolerance else ''
+        print(f"{name:42s} {base['median_us']:12.2f} -> {res['median_us']:12.2f} us  x{ratio:5.2f} {flag}")
+        if flag:
+            regressions.append(name)
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print("tidak ada baseline untuk:", ', '.join(missing))
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description="Fuzzy AI benchmark suite")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="tulis hasil sebagai baseline baru")
+    ap.add_argument("-t", "--tolerance", type=float, default=TOLERANCE, help="mis. 0.25 = boleh 25%% lebih lambat")
+    ap.add_argument("-k", "--filter", default=None, help="hanya benchmark yang namanya mengandung teks ini")
+    ap.add_argument("--rounds", type=int, default=ROUNDS)
+    ap.add_argument("--raw", action="store_true", help="bandingkan waktu mentah, tanpa normalisasi referensi")
+    ap.add_argument("--list", action="store_true")
+    args = ap.parse_args()
+
+    selected = [(n, s) for n, s in BENCHES if args.filter is None or args.filter in n]
+    if args.list:
+        print('\n'.join(n for n, _ in selected))
+        return 0
+    results = run(selected, args.rounds)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get('benchmarks', {})
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'numpy': np.__version__, 'benchmarks': baseline},
+                      f, indent=2, sort_keys=True)
+        print(f"baseline ditulis ke {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"baseline {args.baseline} belum ada; jalankan dengan --save dulu")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('benchmarks', {})
+    print()
+    regressions = compare(results, baseline, args.tolerance, args.raw)
+    if regressions:
+        print(f"{len(regressions)} benchmark melewati toleransi {args.tolerance:.0%}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Adaptive boundary sampling — peta region behavior tiap metode tanpa sweep rapat
+- Ruang input (sumbu bebas pilihan, sisanya tetap) dibagi rekursif seperti quadtree/octree
+  di atas lattice resolusi akhir 2**depth per sumbu; skor dihitung hanya di sudut sel
+- Sel dipecah jika behavior (fuzzy.map_fuzzy_score_to_behavior, cut-off fuzzy.BEHAVIOR_CUTS)
+  berbeda di antara sudutnya untuk salah satu metode, atau rentang skor di sudut > --grad
+  (gradien curam); sampai --min-depth semua sel dipecah supaya region kecil tidak terlewat
+- Tiap level: semua sudut baru dikumpulkan lalu dihitung dalam satu get_all_scores_batch
+- Output di <out>/<name>/: leaves.csv (sel daun + behavior per metode, "mixed" untuk sel batas),
+  <metode>.npy (kode behavior di tiap titik lattice, hasil isi sel daun) dan meta.json
+- --verify: hitung juga grid rapat resolusi sama dan laporkan titik yang berbeda
+
+Pemakaian:
+  python boundary.py --etype Boss                          # sumbu hp_p x hp_b, depth 8
+  python boundary.py --etype Enderman --axes hp_b,mana_b,cd --depth 6 --fix hp_p=30 --verify
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import fuzzy
+import tablewriter
+
+OUT_DIR = os.path.join("experiments_out", "boundary")
+METHODS = ('mamdani', 'sugeno', 'tsukamoto')
+INPUTS = ('hp_p', 'hp_b', 'mana_p', 'mana_b', 'cd')
+RANGES = {'hp_p': (0.0, 100.0), 'hp_b': (0.0, 100.0), 'mana_p': (0.0, 100.0),
+          'mana_b': (0.0, 100.0), 'cd': (0.0, 10.0)}
+FIXED = {'hp_p': 50.0, 'hp_b': 50.0, 'mana_p': 0.0, 'mana_b': 50.0, 'cd': 5.0}   # cd game selalu 5
+DEPTH = 8
+MIN_DEPTH = 3
+GRAD = 20.0                # rentang skor di sudut sel yang dianggap curam
+RASTER_MAX = 1 << 24       # titik lattice maksimum untuk <metode>.npy / --verify
+
+def behavior_labels(etype):
+    """(label behavior unik, array kode per kelas kekuatan Weak/Mid/Strong)."""
+    weak_cut, strong_cut = fuzzy.BEHAVIOR_CUTS.get(etype, (40, 70))
+    names = [fuzzy.map_fuzzy_score_to_behavior(s, etype) for s in (weak_cut - 1, weak_cut, strong_cut)]
+    labels = sorted(set(names))
+    return labels, np.array([labels.index(n) for n in names])
+
+class BoundarySampler:
+    def __init__(self, etype, axes, fixed=None, depth=DEPTH, min_depth=MIN_DEPTH, grad=GRAD, intervals=None):
+        self.etype = etype
+        self.axes = list(axes)
+        self.fixed = dict(FIXED, **(fixed or {}))
+        self.depth = depth
+        self.min_depth = min(min_depth, depth)
+        self.grad = grad
+        self.intervals = intervals
+        self.n = 1 << depth
+        self.dims = (self.n + 1,) * len(self.axes)
+        self.labels, self.strength_code = behavior_labels(etype)
+        self.cuts = np.array(fuzzy.BEHAVIOR_CUTS.get(etype, (40, 70)), dtype=float)
+        # titik yang sudah dihitung: index lattice datar (terurut) -> skor (k, metode)
+        self.known = np.zeros(0, dtype=np.int64)
+        self.scores = np.zeros((0, len(METHODS)))
+        self.calls = 0
+        self.leaves = []   # (lo index (d,), ukuran, kode behavior per metode; -1 = mixed)
+
+    def inputs(self, flat):
+        """Index lattice datar -> 5 array input untuk get_all_scores_batch."""
+        idx = np.unravel_index(flat, self.dims)
+        cols = {k: np.full(len(flat), float(v)) for k, v in self.fixed.items()}
+        for axis, i in zip(self.axes, idx):
+            lo, hi = RANGES[axis]
+            cols[axis] = lo + i * ((hi - lo) / self.n)
+        return [cols[k] for k in INPUTS]
+
+    def score_points(self, flat):
+        return fuzzy.get_all_scores_batch(self.etype, *self.inputs(flat), intervals=self.intervals)
+
+    def evaluate(self, flat):
+        """Skor (len(flat), metode) untuk index datar; titik baru dihitung dalam satu batch."""
+        uniq = np.unique(flat)
+        pos = np.searchsorted(self.known, uniq)
+        hit = pos < len(self.known)
+        hit[hit] = self.known[pos[hit]] == uniq[hit]
+        new = uniq[~hit]
+        if len(new):
+            batch = self.score_points(new)
+            self.calls += len(new)
+            known = np.concatenate([self.known, new])
+            scores = np.concatenate([self.scores, np.column_stack([batch[m] for m in METHODS])])
+            order = np.argsort(known, kind='stable')
+            self.known, self.scores = known[order], scores[order]
+        return self.scores[np.searchsorted(self.known, flat)]
+
+    def codes(self, scores):
+        # skor -> kode behavior (sama dengan map_fuzzy_score_to_behavior: batas kiri inklusif)
+        return self.strength_code[np.digitize(scores, self.cuts, right=False)]
+
+    def run(self):
+        d = len(self.axes)
+        offsets = np.array(np.meshgrid(*[[0, 1]] * d, indexing='ij')).reshape(d, -1).T   # (2**d, d)
+        cells = np.zeros((1, d), dtype=np.int64)
+        size = self.n
+        level = 0
+        while len(cells):
+            corners = cells[:, None, :] + offsets[None] * size                               # (m, 2**d, d)
+            flat = np.ravel_multi_index(tuple(corners.reshape(-1, d).T), self.dims)
+            sc = self.evaluate(flat).reshape(len(cells), len(offsets), len(METHODS))
+            code = self.codes(sc)
+            mixed = code.min(axis=1) != code.max(axis=1)                                     # (m, metode)
+            steep = (sc.max(axis=1) - sc.min(axis=1) > self.grad).any(axis=1)
+            split = (mixed.any(axis=1) | steep | (level < self.min_depth)) & (size > 1)
+            for lo, m, c in zip(cells[~split], mixed[~split], code[~split, 0]):
+                self.leaves.append((lo, size, np.where(m, -1, c)))
+            if size == 1:
+                break
+            half = size // 2
+            cells = (cells[split][:, None, :] + offsets[None] * half).reshape(-1, d)
+            size = half
+            level += 1
+        return self
+
+    def raster(self, method):
+        """Kode behavior di tiap titik lattice: sel daun seragam diisi, titik yang dihitung eksak."""
+        m = METHODS.index(method)
+        out = np.full(self.dims, -1, dtype=np.int8)
+        for lo, size, code in self.leaves:
+            if code[m] >= 0:
+                out[tuple(slice(a, a + size + 1) for a in lo)] = code[m]
+        out.reshape(-1)[self.known] = self.codes(self.scores[:, m])
+        return out
+
+    def dense_codes(self, chunk=1 << 16):
+        """Referensi --verify: semua titik lattice dihitung (tidak memakai/menambah cache)."""
+        total = int(np.prod(self.dims))
+        out = {m: np.empty(total, dtype=np.int8) for m in METHODS}
+        for start in range(0, total, chunk):
+            flat = np.arange(start, min(total, start + chunk))
+            batch = self.score_points(flat)
+            for m in METHODS:
+                out[m][flat] = self.codes(batch[m])
+        return {m: v.reshape(self.dims) for m, v in out.items()}
+
+def parse_fix(items):
+    fixed = {}
+    for item in items or []:
+        key, _, val = item.partition('=')
+        if key not in INPUTS or not val:
+            raise ValueError(f"--fix harus berbentuk input=nilai dengan input salah satu dari {', '.join(INPUTS)}")
+        fixed[key] = float(val)
+    return fixed
+
+def main():
+    ap = argparse.ArgumentParser(description="Adaptive boundary map of fuzzy behavior regions")
+    ap.add_argument("--etype", required=True, choices=['Zombie', 'Skeleton', 'Enderman', 'Boss'])
+    ap.add_argument("--axes", default="hp_p,hp_b", help=f"sumbu bebas, subset dari {','.join(INPUTS)}")
+    ap.add_argument("--fix", action="append", default=None, metavar="INPUT=NILAI",
+                    help=f"nilai input yang tidak di-sweep (default {FIXED})")
+    ap.add_argument("--depth", type=int, default=DEPTH, help="resolusi akhir: 2**depth interval per sumbu")
+    ap.add_argument("--min-depth", type=int, default=MIN_DEPTH)
+    ap.add_argument("--grad", type=float, default=GRAD)
+    ap.add_argument("--intervals", default=None, help="file JSON interval membership")
+    ap.add_argument("--verify", action="store_true", help="bandingkan dengan grid rapat resolusi sama")
+    ap.add_argument("--name", default=None)
+    ap.add_argument("--out", default=OUT_DIR)
+    args = ap.parse_args()
+
+    axes = [a for a in args.axes.split(',') if a]
+    if not axes or set(axes) - set(INPUTS) or len(set(axes)) != len(axes):
+        ap.error(f"--axes harus subset unik dari {','.join(INPUTS)}")
+    try:
+        fixed = parse_fix(args.fix)
+    except ValueError as e:
+        ap.error(str(e))
+    intervals = None
+    if args.intervals:
+        with open(args.intervals) as f:
+            intervals = json.load(f)
+
+    t0 = time.perf_counter()
+    bs = BoundarySampler(args.etype, axes, fixed, args.depth, args.min_depth, args.grad, intervals).run()
+    elapsed = time.perf_counter() - t0
+    dense = int(np.prod(bs.dims))
+    name = args.name or f"{args.etype.lower()}_{'_'.join(axes)}"
+    path = os.path.join(args.out, name)
+    os.makedirs(path, exist_ok=True)
+    print(f"{args.etype} {' x '.join(axes)}, lattice {'x'.join(map(str, bs.dims))}: "
+          f"{bs.calls} titik dihitung vs {dense} grid rapat ({bs.calls / dense:.1%}), "
+          f"{len(bs.leaves)} sel daun, {elapsed:.2f} s")
+
+    header = ['level_size'] + [f'{a}_{s}' for a in axes for s in ('lo', 'hi')] + list(METHODS)
+    with tablewriter.open_table(path, 'leaves', header) as w:
+        for lo, size, code in bs.leaves:
+            bounds = []
+            for axis, a in zip(axes, lo):
+                rlo, rhi = RANGES[axis]
+                step = (rhi - rlo) / bs.n
+                bounds += [rlo + a * step, rlo + (a + size) * step]
+            w.writerow([int(size)] + bounds + [bs.labels[c] if c >= 0 else 'mixed' for c in code])
+
+    meta = {'etype': args.etype, 'axes': {a: list(RANGES[a]) for a in axes}, 'fixed': bs.fixed,
+            'depth': args.depth, 'min_depth': args.min_depth, 'grad': args.grad, 'intervals': intervals,
+            'labels': bs.labels, 'calls': bs.calls, 'dense_points': dense, 'leaves': len(bs.leaves)}
+    if dense <= RASTER_MAX:
+        dense_ref = bs.dense_codes() if args.verify else None
+        mismatch = {}
+        for m in METHODS:
+            r = bs.raster(m)
+            np.save(os.path.join(path, m + '.npy'), r)
+            share = ', '.join(f"{lab} {np.mean(r == i):.1%}" for i, lab in enumerate(bs.labels))
+            line = f"  {m:10s} {share}"
+            if dense_ref is not None:
+                mismatch[m] = int((r != dense_ref[m]).sum())
+                line += f"; beda dengan grid rapat: {mismatch[m]} titik"
+            print(line)
+        if dense_ref is not None:
+            meta['verify_mismatch'] = mismatch
+    else:
+        print(f"  lattice > {RASTER_MAX} titik: raster <metode>.npy dilewati, lihat leaves.csv")
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    print(f"hasil -> {path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
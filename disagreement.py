@@ -0,0 +1,505 @@
+"""
+Branch-and-bound region beda-keputusan antar metode (Mamdani / Sugeno / Tsukamoto)
+- Box input dievaluasi dengan aritmetika interval: derajat membership (min/max fungsi linear
+  sepotong-sepotong pada rentang input), firing rule (min), lalu batas skor tiap metode:
+  * Sugeno/Tsukamoto: rata-rata berbobot dengan bobot firing dalam interval -> batas eksak
+    rasio linear-pecahan (bobot atas untuk nilai kecil, bobot bawah untuk nilai besar);
+    z Tsukamoto diambil ujung intervalnya
+  * Mamdani: centroid fungsi keanggotaan output yang terjepit di antara amplop cut bawah dan
+    atas (iterasi Dinkelbach, integral eksak per segmen linear)
+  * jika box bisa berisi titik tanpa rule aktif, batas skor fallback (_fallback_batch) digabung
+- Box yang terbukti memberi behavior sama untuk ketiga metode dibuang; box yang terbukti beda
+  dilaporkan 'disagree'; sisanya dibelah dua pada sumbu terlebar sampai lebar <= --precision
+  (persen rentang sumbu) dan dilaporkan 'undecided' (mungkin berisi batas behavior)
+- --brute: bandingkan waktu dengan sweep rapat beresolusi sama (diekstrapolasi dari sampel
+  jika terlalu besar) dan cek bahwa semua titik beda dari sweep berada di box yang dilaporkan
+
+Pemakaian:
+  python disagreement.py --etype Boss --axes hp_p,hp_b --brute
+  python disagreement.py --etype Enderman --axes hp_p,hp_b,mana_b,cd --precision 2
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import fuzzy
+import tablewriter
+
+OUT_DIR = os.path.join("experiments_out", "disagreement")
+METHODS = ('mamdani', 'sugeno', 'tsukamoto')
+INPUTS = ('hp_p', 'hp_b', 'mana_p', 'mana_b', 'cd')
+RANGES = np.array([[0.0, 100.0], [0.0, 100.0], [0.0, 100.0], [0.0, 100.0], [0.0, 10.0]])
+FIXED = {'hp_p': 50.0, 'hp_b': 50.0, 'mana_p': 0.0, 'mana_b': 50.0, 'cd': 5.0}
+PRECISION = 1.0            # lebar box minimum, persen rentang sumbu
+EPS = 1e-6                 # pelebaran batas skor (pembulatan float di jalur inference)
+MAX_BOXES = 2_000_000
+BRUTE_MAX = 4_000_000      # titik sweep rapat maksimum; lebih dari ini diekstrapolasi dari sampel
+_ZERO = 1e-9               # sama dengan _safe_ratio: den <= ini -> fallback
+
+# --- derajat membership ---
+def _label_table(no_mana, intervals):
+    """label derajat (nama di _degrees_*_batch) -> (index input, universe, array membership)."""
+    if no_mana:
+        memb = fuzzy.get_membership_no_mana(intervals)
+        src = {'hp_p_low': (0, 'hp_l'), 'hp_p_med': (0, 'hp_m'), 'hp_p_high': (0, 'hp_h'),
+               'hp_b_low': (1, 'hp_l'), 'hp_b_med': (1, 'hp_m'), 'hp_b_high': (1, 'hp_h'),
+               'cd_ready': (4, 'cd_r'), 'cd_mid': (4, 'cd_m'), 'cd_long': (4, 'cd_l')}
+    else:
+        memb = fuzzy.get_membership_with_mana(intervals)
+        src = {}
+        for i, prefix in enumerate(('hp_p', 'hp_b', 'mana_p', 'mana_b')):
+            for term in ('low', 'med', 'high'):
+                src[f'{prefix}_{term}'] = (i, f'{prefix}_{term}')
+        for term in ('ready', 'mid', 'long'):
+            src[f'cd_{term}'] = (4, f'cd_{term}')
+    universes = (fuzzy.x_hp, fuzzy.x_hp, fuzzy.x_mana, fuzzy.x_mana, fuzzy.x_cd)
+    return {label: (i, universes[i], memb[key]) for label, (i, key) in src.items()}
+
+@functools.lru_cache(maxsize=None)
+def _sparse_table(mf_bytes, n):
+    # range-min/max O(1): level k berisi ekstrem jendela panjang 2**k
+    mf = np.frombuffer(mf_bytes, dtype=float, count=n)
+    mins, maxs = [mf], [mf]
+    k = 1
+    while (1 << k) <= n:
+        half = 1 << (k - 1)
+        mins.append(np.minimum(mins[-1][:-half], mins[-1][half:]))
+        maxs.append(np.maximum(maxs[-1][:-half], maxs[-1][half:]))
+        k += 1
+    return mins, maxs
+
+def degree_bounds(x, mf, lo, hi):
+    # np.interp linear di antara titik universe: ekstrem pada ujung interval atau titik universe di dalamnya
+    mf = np.ascontiguousarray(mf, dtype=float)
+    a = np.interp(lo, x, mf, left=0.0, right=0.0)
+    b = np.interp(hi, x, mf, left=0.0, right=0.0)
+    mn, mx = np.minimum(a, b), np.maximum(a, b)
+    i = np.searchsorted(x, lo, 'right')           # titik universe pertama > lo
+    j = np.searchsorted(x, hi, 'left') - 1        # titik universe terakhir < hi
+    has = i <= j
+    if has.any():
+        mins, maxs = _sparse_table(mf.tobytes(), len(mf))
+        i, j = i[has], j[has]
+        lv = np.floor(np.log2(j - i + 1)).astype(int)
+        q_lo = np.empty(len(i)); q_hi = np.empty(len(i))
+        for level in np.unique(lv):
+            sel = lv == level
+            ii, jj = i[sel], j[sel] - (1 << level) + 1
+            q_lo[sel] = np.minimum(mins[level][ii], mins[level][jj])
+            q_hi[sel] = np.maximum(maxs[level][ii], maxs[level][jj])
+        mn[has] = np.minimum(mn[has], q_lo)
+        mx[has] = np.maximum(mx[has], q_hi)
+    return mn, mx
+
+def firing_bounds(table, specs, lo, hi, labels=None):
+    """list (f_lo, f_hi, output) per rule; label tanpa derajat -> [0, 0] (sama dengan _firing_batch)."""
+    m = len(lo)
+    deg = {}
+    out = []
+    for conds, res in specs:
+        f_lo = f_hi = None
+        for c in conds:
+            if labels:
+                c = labels.get(c, c)
+            if c not in deg:
+                if c in table:
+                    i, x, mf = table[c]
+                    deg[c] = degree_bounds(x, mf, lo[:, i], hi[:, i])
+                else:
+                    deg[c] = (np.zeros(m), np.zeros(m))
+            d_lo, d_hi = deg[c]
+            f_lo = d_lo if f_lo is None else np.minimum(f_lo, d_lo)
+            f_hi = d_hi if f_hi is None else np.minimum(f_hi, d_hi)
+        out.append((f_lo, f_hi, res))
+    return out
+
+# --- batas skor ---
+def ratio_bounds(w_lo, w_hi, z_lo, z_hi):
+    """
+    Batas sum(w*z)/sum(w) untuk w dalam [w_lo, w_hi] dan z dalam [z_lo, z_hi] (array (m, k)).
+    Minimum: z bawah, urut naik, j bobot pertama di ujung atas; maksimum simetris. Rasio dengan
+    penyebut <= _ZERO diabaikan (titik itu memakai fallback, ditangani pemanggil).
+    """
+    def side(z, w_first, w_rest, take_min):
+        order = np.argsort(z if take_min else -z, axis=1, kind='stable')
+        z = np.take_along_axis(z, order, axis=1)
+        wf = np.take_along_axis(w_first, order, axis=1)
+        wr = np.take_along_axis(w_rest, order, axis=1)
+        k = z.shape[1]
+        zero = np.zeros((len(z), 1))
+        num_f = np.concatenate([zero, np.cumsum(wf * z, axis=1)], axis=1)
+        den_f = np.concatenate([zero, np.cumsum(wf, axis=1)], axis=1)
+        num_r = np.concatenate([np.cumsum((wr * z)[:, ::-1], axis=1)[:, ::-1], zero], axis=1)
+        den_r = np.concatenate([np.cumsum(wr[:, ::-1], axis=1)[:, ::-1], zero], axis=1)
+        num, den = num_f + num_r, den_f + den_r          # (m, k+1): j = 0..k bobot atas
+        ok = den > _ZERO
+        r = np.where(ok, num / np.where(ok, den, 1.0), np.inf if take_min else -np.inf)
+        return r.min(axis=1) if take_min else r.max(axis=1)
+    return side(z_lo, w_hi, w_lo, True), side(z_hi, w_hi, w_lo, False)
+
+def fallback_bounds(no_mana, lo, hi):
+    # _fallback_batch linear per input + loncatan saat hp_b < 30 -> batas eksak di sudut box
+    if no_mana:
+        coef = np.array([-0.25, 0.25, 0.0, 0.0, 1.5]); const = 50 + 25 - 12.5; drop = 40.0
+    else:
+        coef = np.array([-0.2, 0.2, 0.0, 0.1, 1.2]); const = 50 + 20 - 10 - 5; drop = 35.0
+    s_min = const + np.where(coef > 0, lo, hi) @ coef - np.where(lo[:, 1] < 30, drop, 0.0)
+    s_max = const + np.where(coef > 0, hi, lo) @ coef - np.where(hi[:, 1] < 30, drop, 0.0)
+    return np.clip(s_min, 0, 100), np.clip(s_max, 0, 100)
+
+_ACT = None
+
+def _act_terms():
+    # (array membership weak/mid/strong) sebagai float
+    global _ACT
+    if _ACT is None:
+        _ACT = [np.asarray(mf, dtype=float) for mf in (fuzzy.act_weak, fuzzy.act_mid, fuzzy.act_strong)]
+    return _ACT
+
+def _mu(cuts, xs):
+    out = np.zeros_like(xs)
+    for cut, mf in zip(cuts, _act_terms()):
+        np.maximum(out, np.minimum(cut, np.interp(xs, fuzzy.x_action, mf)), out=out)
+    return out
+
+def _crossings(cuts):
+    # titik x dengan mf(x) == cut (tekukan min(cut, mf)); tekukan lain ada di titik universe
+    x = fuzzy.x_action.astype(float)
+    pts = []
+    for cut, mf in zip(cuts, _act_terms()):
+        d0, d1 = mf[:-1] - cut, mf[1:] - cut
+        i = np.nonzero(d0 * d1 < 0)[0]
+        pts.append(x[i] + d0[i] / (d0[i] - d1[i]) * (x[i + 1] - x[i]))
+    return np.concatenate(pts)
+
+def _seg_moments(x0, x1, g0, g1):
+    # integral eksak g dan x*g untuk g linear pada [x0, x1]
+    h = x1 - x0
+    return h * (g0 + g1) / 2, h * (x0 * (2 * g0 + g1) + x1 * (g0 + 2 * g1)) / 6
+
+def _prefix(v):
+    out = np.zeros(len(v) + 1)
+    np.cumsum(v, out=out[1:])
+    return out
+
+@functools.lru_cache(maxsize=1 << 16)
+def centroid_bounds(cut_lo, cut_hi):
+    """
+    Batas centroid Mamdani untuk cut (weak, mid, strong) dalam [cut_lo, cut_hi]. Fungsi output
+    berada di antara mu(cut_lo) dan mu(cut_hi); centroid minimum memakai amplop atas di kiri
+    ambang t dan amplop bawah di kanan, dengan t = centroid itu sendiri (Dinkelbach, mulai dari
+    ambang terbaik di titik grid). None jika cut_hi semua nol (selalu fallback).
+    """
+    xs = np.union1d(fuzzy.x_action.astype(float), np.concatenate([_crossings(cut_lo), _crossings(cut_hi)]))
+    g_lo, g_hi = _mu(cut_lo, xs), _mu(cut_hi, xs)
+    if not g_hi.any():
+        return None
+    x0, x1 = xs[:-1], xs[1:]
+    out = []
+    for left, right, pick in ((g_hi, g_lo, np.argmin), (g_lo, g_hi, np.argmax)):
+        l0, l1 = _seg_moments(x0, x1, left[:-1], left[1:])
+        r0, r1 = _seg_moments(x0, x1, right[:-1], right[1:])
+        # ambang di titik grid k: segmen < k pakai left, >= k pakai right
+        pl0, pl1 = _prefix(l0), _prefix(l1)
+        sr0, sr1 = _prefix(r0[::-1])[::-1], _prefix(r1[::-1])[::-1]
+        c0, c1 = pl0 + sr0, pl1 + sr1
+        ok = c0 > 0
+        ratios = np.where(ok, c1 / np.where(ok, c0, 1.0), np.nan)
+        k = int(pick(np.where(ok, ratios, np.inf if pick is np.argmin else -np.inf)))
+        t = float(ratios[k])
+        for _ in range(100):
+            # rasio dengan ambang t di dalam segmen j (dua potongan linear)
+            j = min(max(int(np.searchsorted(xs, t)) - 1, 0), len(xs) - 2)
+            a, b = xs[j], xs[j + 1]
+            w = (t - a) / (b - a)
+            lt = left[j] + w * (left[j + 1] - left[j])
+            rt = right[j] + w * (right[j + 1] - right[j])
+            m0a, m1a = _seg_moments(a, t, left[j], lt)
+            m0b, m1b = _seg_moments(t, b, rt, right[j + 1])
+            den = pl0[j] + m0a + m0b + sr0[j + 1]
+            if den <= 0:
+                break
+            t_new = float((pl1[j] + m1a + m1b + sr1[j + 1]) / den)
+            done = abs(t_new - t) < 1e-12
+            t = t_new
+            if done:
+                break
+        out.append(t)
+    return out[0], out[1]
+
+def score_bounds(etype, lo, hi, intervals=None):
+    """dict metode -> (batas bawah, batas atas) skor untuk box lo..hi (array (m, 5))."""
+    no_mana = etype in ('Zombie', 'Skeleton')
+    specs = fuzzy.rule_specs_z if no_mana else fuzzy.rule_specs
+    table = _label_table(no_mana, intervals)
+    fb_lo, fb_hi = fallback_bounds(no_mana, lo, hi)
+
+    fir = firing_bounds(table, specs, lo, hi)
+    f_lo = np.column_stack([f[0] for f in fir])
+    f_hi = np.column_stack([f[1] for f in fir])
+    maybe_fb = f_lo.sum(axis=1) <= _ZERO          # ada titik di box yang mungkin tanpa rule aktif
+    all_fb = f_hi.sum(axis=1) <= _ZERO
+
+    centroids = {'weak': 20.0, 'mid': 50.0, 'strong': 80.0}
+    z = np.tile([centroids[f[2]] for f in fir], (len(lo), 1))
+    s_lo, s_hi = ratio_bounds(f_lo, f_hi, z, z)
+
+    # z Tsukamoto bergantung pada firing rule itu sendiri (monoton): ambil ujung intervalnya
+    tz = {'weak': lambda f: 40.0 * (1.0 - f), 'mid': lambda f: 40.0 + 20.0 * f, 'strong': lambda f: 60.0 + 40.0 * f}
+    za = np.column_stack([tz[f[2]](f[0]) for f in fir])
+    zb = np.column_stack([tz[f[2]](f[1]) for f in fir])
+    t_lo, t_hi = ratio_bounds(f_lo, f_hi, np.minimum(za, zb), np.maximum(za, zb))
+
+    if intervals is None:
+        mfir = firing_bounds(table, specs, lo, hi, fuzzy._MAMDANI_LABELS)
+        c_lo = {t: np.zeros(len(lo)) for t in fuzzy._TERMS}
+        c_hi = {t: np.zeros(len(lo)) for t in fuzzy._TERMS}
+        for a, b, res in mfir:
+            c_lo[res] = np.maximum(c_lo[res], a)
+            c_hi[res] = np.maximum(c_hi[res], b)
+        m_lo = np.empty(len(lo)); m_hi = np.empty(len(lo))
+        for i in range(len(lo)):
+            key_lo = tuple(float(c_lo[t][i]) for t in fuzzy._TERMS)
+            key_hi = tuple(float(c_hi[t][i]) for t in fuzzy._TERMS)
+            b = centroid_bounds(key_lo, key_hi)
+            if b is None:
+                m_lo[i], m_hi[i] = fb_lo[i], fb_hi[i]
+                continue
+            m_lo[i], m_hi[i] = b
+            if not any(key_lo):       # cut bisa nol semua -> defuzz gagal -> fallback
+                m_lo[i], m_hi[i] = min(m_lo[i], fb_lo[i]), max(m_hi[i], fb_hi[i])
+    else:
+        m_lo, m_hi = None, None
+
+    # titik tanpa rule aktif: Sugeno -> fallback, Tsukamoto -> Mamdani
+    s_lo = np.where(all_fb, fb_lo, np.where(maybe_fb, np.minimum(s_lo, fb_lo), s_lo))
+    s_hi = np.where(all_fb, fb_hi, np.where(maybe_fb, np.maximum(s_hi, fb_hi), s_hi))
+    if m_lo is None:
+        m_lo, m_hi = s_lo.copy(), s_hi.copy()
+    t_lo = np.where(all_fb, m_lo, np.where(maybe_fb, np.minimum(t_lo, m_lo), t_lo))
+    t_hi = np.where(all_fb, m_hi, np.where(maybe_fb, np.maximum(t_hi, m_hi), t_hi))
+    return {'mamdani': (m_lo - EPS, m_hi + EPS), 'sugeno': (s_lo - EPS, s_hi + EPS),
+            'tsukamoto': (t_lo - EPS, t_hi + EPS)}
+
+# --- branch and bound ---
+def behavior_codes(etype):
+    weak_cut, strong_cut = fuzzy.BEHAVIOR_CUTS.get(etype, (40, 70))
+    names = [fuzzy.map_fuzzy_score_to_behavior(s, etype) for s in (weak_cut - 1, weak_cut, strong_cut)]
+    labels = sorted(set(names))
+    return labels, np.array([labels.index(n) for n in names]), np.array([weak_cut, strong_cut], dtype=float)
+
+def possible_behaviors(lo, hi, strength_code, cuts):
+    """bitmask behavior yang mungkin untuk skor dalam [lo, hi] (array)."""
+    k_lo = np.digitize(lo, cuts)
+    k_hi = np.digitize(hi, cuts)
+    mask = np.zeros(len(lo), dtype=np.int64)
+    for k in range(3):
+        mask |= np.where((k_lo <= k) & (k <= k_hi), 1 << strength_code[k], 0)
+    return mask
+
+def _split_axis(lo, hi, free, span):
+    # sumbu bebas terlebar relatif terhadap rentangnya
+    return np.where(free, (hi - lo) / span, 0.0).argmax(axis=1)
+
+def _root(axes, fixed):
+    fixed = dict(FIXED, **(fixed or {}))
+    free = np.array([k in axes for k in INPUTS])
+    lo = np.array([[RANGES[i, 0] if free[i] else fixed[k] for i, k in enumerate(INPUTS)]])
+    hi = np.array([[RANGES[i, 1] if free[i] else fixed[k] for i, k in enumerate(INPUTS)]])
+    return free, lo, hi
+
+def branch_and_bound(etype, axes, fixed=None, precision=PRECISION, intervals=None, max_boxes=MAX_BOXES,
+                     record=False):
+    """
+    Return (box disagree, box undecided, statistik); box = (lo (5,), hi (5,), mask per metode).
+    record: simpan status tiap box daun di statistik['leaves'] (dipakai locate()).
+    """
+    free, lo, hi = _root(axes, fixed)
+    span = RANGES[:, 1] - RANGES[:, 0]
+    min_width = precision / 100.0 * span
+    labels, strength_code, cuts = behavior_codes(etype)
+    disagree, undecided = [], []
+    leaves = {} if record else None
+    stats = {'boxes': 0, 'pruned_agree': 0, 'levels': 0}
+    while len(lo):
+        stats['boxes'] += len(lo)
+        stats['levels'] += 1
+        if stats['boxes'] > max_boxes:
+            raise RuntimeError(f"lebih dari {max_boxes} box; perbesar --precision atau kurangi sumbu")
+        b = score_bounds(etype, lo, hi, intervals)
+        masks = np.column_stack([possible_behaviors(b[m][0], b[m][1], strength_code, cuts) for m in METHODS])
+        single = (masks & (masks - 1)) == 0
+        agree = single.all(axis=1) & (masks == masks[:, :1]).all(axis=1)
+        certain = single.all(axis=1) & ~agree
+        stats['pruned_agree'] += int(agree.sum())
+        for i in np.nonzero(certain)[0]:
+            disagree.append((lo[i], hi[i], masks[i]))
+        rest = ~agree & ~certain
+        axis = _split_axis(lo, hi, free, span)
+        width = (hi - lo)[np.arange(len(lo)), axis]
+        small = rest & (width <= min_width[axis])
+        for i in np.nonzero(small)[0]:
+            undecided.append((lo[i], hi[i], masks[i]))
+        if record:
+            for status, sel in (('agree', agree), ('disagree', certain), ('undecided', small)):
+                for i in np.nonzero(sel)[0]:
+                    leaves[lo[i].tobytes() + hi[i].tobytes()] = status
+        split = np.nonzero(rest & ~small)[0]
+        lo, hi, axis = lo[split], hi[split], axis[split]
+        mid = (lo[np.arange(len(lo)), axis] + hi[np.arange(len(lo)), axis]) / 2
+        left_hi = hi.copy(); left_hi[np.arange(len(lo)), axis] = mid
+        right_lo = lo.copy(); right_lo[np.arange(len(lo)), axis] = mid
+        lo, hi = np.concatenate([lo, right_lo]), np.concatenate([left_hi, hi])
+    stats['labels'] = labels
+    stats['leaves'] = leaves
+    return disagree, undecided, stats
+
+def locate(points, axes, fixed, leaves):
+    """Status box daun ('agree' / 'disagree' / 'undecided') yang memuat tiap titik (belahan sama dengan B&B)."""
+    free, root_lo, root_hi = _root(axes, fixed)
+    span = RANGES[:, 1] - RANGES[:, 0]
+    lo = np.repeat(root_lo, len(points), axis=0)
+    hi = np.repeat(root_hi, len(points), axis=0)
+    status = np.full(len(points), None, dtype=object)
+    active = np.arange(len(points))
+    while len(active):
+        found = np.array([leaves.get(lo[i].tobytes() + hi[i].tobytes()) for i in active], dtype=object)
+        hit = found != None   # noqa: E711 (perbandingan elemen array object)
+        status[active[hit]] = found[hit]
+        active = active[~hit]
+        if not len(active):
+            break
+        axis = _split_axis(lo[active], hi[active], free, span)
+        rows = np.arange(len(active))
+        mid = (lo[active, axis] + hi[active, axis]) / 2
+        left = points[active, axis] <= mid
+        new_lo, new_hi = lo[active], hi[active]
+        new_hi[rows[left], axis[left]] = mid[left]
+        new_lo[rows[~left], axis[~left]] = mid[~left]
+        lo[active], hi[active] = new_lo, new_hi
+    return status
+
+def brute_force(etype, axes, fixed=None, precision=PRECISION, intervals=None, limit=BRUTE_MAX, chunk=1 << 16):
+    """
+    Sweep rapat dengan langkah = precision pada sumbu bebas. Return (jumlah titik, titik beda
+    (array (k, 5)) atau None jika diekstrapolasi, detik; diekstrapolasi dari sampel jika > limit).
+    """
+    fixed = dict(FIXED, **(fixed or {}))
+    grids = []
+    for i, k in enumerate(INPUTS):
+        if k in axes:
+            grids.append(np.linspace(RANGES[i, 0], RANGES[i, 1], int(round(100.0 / precision)) + 1))
+        else:
+            grids.append(np.array([fixed[k]]))
+    shape = tuple(len(g) for g in grids)
+    total = int(np.prod(shape))
+    labels, strength_code, cuts = behavior_codes(etype)
+    n_eval = min(total, limit)
+    t0 = time.perf_counter()
+    bad = []
+    rng = np.random.default_rng(0)
+    for start in range(0, n_eval, chunk):
+        flat = np.arange(start, min(n_eval, start + chunk)) if total <= limit else \
+            rng.integers(0, total, min(chunk, n_eval - start))
+        idx = np.unravel_index(flat, shape)
+        pts = np.column_stack([g[i] for g, i in zip(grids, idx)])
+        sc = fuzzy.get_all_scores_batch(etype, *pts.T, intervals=intervals)
+        codes = np.column_stack([strength_code[np.digitize(sc[m], cuts)] for m in METHODS])
+        diff = (codes != codes[:, :1]).any(axis=1)
+        bad.append(pts[diff])
+    elapsed = time.perf_counter() - t0
+    if total > limit:
+        return total, None, elapsed * total / n_eval
+    return total, np.concatenate(bad) if bad else np.zeros((0, 5)), elapsed
+
+def parse_fix(items):
+    fixed = {}
+    for item in items or []:
+        key, _, val = item.partition('=')
+        if key not in INPUTS or not val:
+            raise ValueError(f"--fix harus berbentuk input=nilai dengan input salah satu dari {', '.join(INPUTS)}")
+        fixed[key] = float(val)
+    return fixed
+
+def main():
+    ap = argparse.ArgumentParser(description="Interval branch-and-bound for method disagreement regions")
+    ap.add_argument("--etype", required=True, choices=['Zombie', 'Skeleton', 'Enderman', 'Boss'])
+    ap.add_argument("--axes", default="hp_p,hp_b", help=f"sumbu bebas, subset dari {','.join(INPUTS)}")
+    ap.add_argument("--fix", action="append", default=None, metavar="INPUT=NILAI",
+                    help=f"nilai input yang tidak di-sweep (default {FIXED})")
+    ap.add_argument("--precision", type=float, default=PRECISION, help="lebar box minimum (persen rentang)")
+    ap.add_argument("--intervals", default=None, help="file JSON interval membership")
+    ap.add_argument("--brute", action="store_true", help="bandingkan dengan sweep rapat resolusi sama")
+    ap.add_argument("--name", default=None)
+    ap.add_argument("--out", default=OUT_DIR)
+    args = ap.parse_args()
+
+    if not fuzzy.SKFUZZY:
+        ap.error("butuh scikit-fuzzy (membership & defuzz Mamdani)")
+    axes = [a for a in args.axes.split(',') if a]
+    if not axes or set(axes) - set(INPUTS) or len(set(axes)) != len(axes):
+        ap.error(f"--axes harus subset unik dari {','.join(INPUTS)}")
+    try:
+        fixed = parse_fix(args.fix)
+    except ValueError as e:
+        ap.error(str(e))
+    intervals = None
+    if args.intervals:
+        with open(args.intervals) as f:
+            intervals = json.load(f)
+
+    t0 = time.perf_counter()
+    disagree, undecided, stats = branch_and_bound(args.etype, axes, fixed, args.precision, intervals,
+                                                  record=args.brute)
+    elapsed = time.perf_counter() - t0
+    labels = stats['labels']
+    free = [INPUTS.index(a) for a in axes]
+    span = RANGES[free, 1] - RANGES[free, 0]
+
+    def volume(boxes):
+        return sum(float(np.prod((hi[free] - lo[free]) / span)) for lo, hi, _ in boxes)
+
+    print(f"{args.etype} {' x '.join(axes)}: {stats['boxes']} box dievaluasi dalam {stats['levels']} level, "
+          f"{elapsed:.2f} s")
+    print(f"  disagree (pasti): {len(disagree)} box, {volume(disagree):.2%} volume; "
+          f"undecided (<= {args.precision}%): {len(undecided)} box, {volume(undecided):.2%} volume; "
+          f"{stats['pruned_agree']} box terbukti sepakat")
+
+    name = args.name or f"{args.etype.lower()}_{'_'.join(axes)}"
+    os.makedirs(args.out, exist_ok=True)
+
+    def names(mask):
+        return '|'.join(lab for i, lab in enumerate(labels) if mask >> i & 1)
+
+    header = ['status'] + [f'{INPUTS[i]}_{s}' for i in free for s in ('lo', 'hi')] + list(METHODS)
+    with tablewriter.open_table(args.out, name, header) as w:
+        for status, boxes in (('disagree', disagree), ('undecided', undecided)):
+            for lo, hi, masks in boxes:
+                w.writerow([status] + [float(v) for i in free for v in (lo[i], hi[i])] + [names(m) for m in masks])
+
+    meta = {'etype': args.etype, 'axes': axes, 'fixed': dict(FIXED, **fixed), 'precision': args.precision,
+            'intervals': intervals, 'boxes': stats['boxes'], 'disagree_boxes': len(disagree),
+            'undecided_boxes': len(undecided), 'disagree_volume': volume(disagree),
+            'undecided_volume': volume(undecided), 'seconds': elapsed}
+    if args.brute:
+        total, bad, brute_s = brute_force(args.etype, axes, fixed, args.precision, intervals)
+        meta.update({'brute_points': total, 'brute_seconds': brute_s})
+        line = f"  sweep rapat: {total} titik, {brute_s:.2f} s{' (ekstrapolasi)' if bad is None else ''}, " \
+               f"speedup {brute_s / elapsed:.1f}x"
+        if bad is not None:
+            missed = int((locate(bad, axes, fixed, stats['leaves']) == 'agree').sum())
+            meta.update({'brute_disagree_points': len(bad), 'brute_missed': missed})
+            line += f"; {len(bad)} titik beda ({len(bad) / total:.2%}), {missed} di luar box yang dilaporkan"
+        print(line)
+    with open(os.path.join(args.out, name + '.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    print(f"hasil -> {os.path.join(args.out, name)}.csv")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,16 @@
+import argparse
 import fuzzy
-import statistics
-import csv
+import resultstore
+import streamstats
+import tablewriter
+import copy
+import json
 import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 enemy_types = ['Zombie','Skeleton','Enderman','Boss']
 player_hp_values = [0, 2, 5, 8, 12, 16, 20]
@@ -9,121 +18,397 @@ enemy_hp_values  = [0, 3, 6, 10, 15, 20, 30]
 mana_values      = [0, 10, 30, 60, 80, 100]
 cd_val = 5
 
+methods_all = ['mamdani','sugeno','tsukamoto']
+
+# interval membership untuk scenario 3 (keys follow fuzzy.get_membership_with_mana/get_membership_no_mana)
+interval_sets = {
+    'default': None,
+    'aggro_player_hp': {
+        # make player-hp considered "low" earlier (aggressive AI towards low player hp)
+        'hp_p_low':[0,0,10,30], 'hp_p_med':[20,35,55,75], 'hp_p_high':[50,80,100,100],
+        # keep others default-ish
+    },
+    'defensive_enemy_hp': {
+        # consider enemy hp "high" only near full so AI more defensive earlier
+        'hp_b_low':[0,0,10,40], 'hp_b_med':[30,45,65,85], 'hp_b_high':[70,90,100,100],
+    }
+}
+
+# mode Monte Carlo (scenario 'monte_carlo'): state acak realistis atau replay turn log, dihitung
+# per batch sampai lebar CI mean & median semua metode <= width (atau max_samples tercapai)
+monte_carlo = {
+    'source': 'random',            # random | replay
+    'logs': [],                    # file turn log (.ftl) untuk source replay
+    'interval_set': 'default',     # key di interval_sets
+    'batch': 4096,
+    'width': 1.0,                  # lebar penuh CI (hi - lo) dalam satuan skor
+    'confidence': 0.95,
+    'min_batches': 2,
+    'max_samples': 1 << 20,
+    'seed': 0,
+    # state acak mengikuti game (main.py): HP integer 1..max, mana musuh kelipatan 5, mana player 0
+    'player_hp': 20,
+    'states': {'Zombie': [20, 0], 'Skeleton': [10, 0], 'Enderman': [15, 80], 'Boss': [30, 100]},
+}
+
 OUT_DIR = "experiments_out"
+OUT_FORMAT = "csv"          # csv | columnar | both (lihat tablewriter.py)
 os.makedirs(OUT_DIR, exist_ok=True)
+# skor grid disimpan/dibaca ulang di sini (lihat resultstore.py); None -> selalu hitung
+STORE_DIR = os.path.join(OUT_DIR, "store")
+
+# spec default = nilai di atas; file --spec (JSON) menimpa sebagian atau semua key.
+# Key tingkat atas yang berupa dict (grid, monte_carlo, output) di-merge per key, sisanya diganti utuh.
+DEFAULT_SPEC = {
+    'grid': {'enemy_types': enemy_types, 'player_hp': player_hp_values, 'enemy_hp': enemy_hp_values,
+             'mana': mana_values, 'cd': cd_val},
+    'methods': methods_all,
+    'interval_sets': interval_sets,
+    'scenarios': ['scenario_1', 'scenario_2', 'scenario_3'],
+    'monte_carlo': monte_carlo,
+    'output': {'dir': OUT_DIR, 'format': OUT_FORMAT},
+}
+
+def load_spec(path=None):
+    spec = copy.deepcopy(DEFAULT_SPEC)
+    if path is None:
+        return spec
+    with open(path) as f:
+        user = json.load(f)
+    unknown = set(user) - set(spec)
+    if unknown:
+        raise ValueError(f"{path}: key spec tidak dikenal: {', '.join(sorted(unknown))}")
+    for key, val in user.items():
+        if key in ('grid', 'monte_carlo', 'output'):
+            spec[key].update(val)
+        else:
+            spec[key] = val
+    return spec
+
+def apply_spec(spec):
+    # spec -> variabel modul yang dibaca scenario_* dan grid_stats
+    global enemy_types, player_hp_values, enemy_hp_values, mana_values, cd_val
+    global methods_all, interval_sets, monte_carlo, OUT_DIR, OUT_FORMAT
+    grid = spec['grid']
+    enemy_types = list(grid['enemy_types'])
+    player_hp_values = list(grid['player_hp'])
+    enemy_hp_values = list(grid['enemy_hp'])
+    mana_values = list(grid['mana'])
+    cd_val = grid['cd']
+    unknown = set(spec['methods']) - set(resultstore.METHODS)
+    if unknown:
+        raise ValueError(f"metode tidak dikenal: {', '.join(sorted(unknown))}")
+    methods_all = list(spec['methods'])
+    interval_sets = dict(spec['interval_sets'])
+    monte_carlo = dict(spec['monte_carlo'])
+    if monte_carlo['source'] not in MC_SOURCES:
+        raise ValueError(f"monte_carlo.source tidak dikenal: {monte_carlo['source']!r} (pilih {', '.join(MC_SOURCES)})")
+    OUT_DIR = spec['output']['dir']
+    OUT_FORMAT = spec['output']['format']
+    os.makedirs(OUT_DIR, exist_ok=True)
 
-def summarize_list(vals):
-    return (statistics.mean(vals), statistics.median(vals), statistics.pstdev(vals) if len(vals)>1 else 0.0)
+def open_table(name, header):
+    return tablewriter.open_table(OUT_DIR, name, header, OUT_FORMAT)
+
+# ProcessPoolExecutor saat --workers > 1 (lihat main); None -> serial
+EXECUTOR = None
+
+def _score_shard(etype, ph, ehs, manas, cd, intervals):
+    # satu shard: semua (eh, mana) untuk satu (etype, ph), urutan sama dengan loop serial
+    out = []
+    for eh in ehs:
+        for m in manas:
+            out.append(fuzzy.get_all_scores(etype, ph, eh, 0, m, cd, intervals=intervals))
+    return out
+
+def grid_axes():
+    return {'etype': enemy_types, 'ph': player_hp_values, 'eh': enemy_hp_values,
+            'mana': mana_values, 'cd': cd_val}
+
+_stores = {}   # store yang sudah dibuka di proses ini (juga saat --no-store, supaya scenario 2 memakai ulang)
+
+def open_store(intervals=None):
+    key = (STORE_DIR, json.dumps(intervals, sort_keys=True))
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = resultstore.ScoreStore(STORE_DIR, grid_axes(), intervals)
+    return store
+
+def grid_stats(intervals=None):
+    """
+    etype -> {metode: RunningStats} atas grid ph x eh x mana.
+    Shard (etype, ph) yang sudah ada di result store dibaca ulang; sisanya dihitung (di process
+    pool jika ada EXECUTOR) lalu ditulis ke store. Statistik dibangun per shard lalu di-merge,
+    jadi memori agregasi tidak tumbuh dengan ukuran grid. mean/pstdev identik dengan statistics;
+    median eksak sampai streamstats.EXACT_MAX titik, di atas itu estimasi t-digest.
+    """
+    store = open_store(intervals)
+    todo = [(i, etype, j, ph) for i, etype in enumerate(enemy_types)
+            for j, ph in enumerate(player_hp_values) if not store.has(i, j)]
+    if EXECUTOR is None:
+        parts = (_score_shard(etype, ph, enemy_hp_values, mana_values, cd_val, intervals)
+                 for i, etype, j, ph in todo)
+    else:
+        k = len(todo)
+        parts = EXECUTOR.map(_score_shard, [t[1] for t in todo], [t[3] for t in todo],
+                             [enemy_hp_values] * k, [mana_values] * k, [cd_val] * k, [intervals] * k)
+    for (i, etype, j, ph), part in zip(todo, parts):
+        store.write(i, j, part)
+    if todo:
+        store.flush()
+    out = {}
+    for i, etype in enumerate(enemy_types):
+        out[etype] = {m: streamstats.RunningStats() for m in resultstore.METHODS}
+        for j in range(len(player_hp_values)):
+            for meth, vals in store.read(i, j).items():
+                shard = streamstats.RunningStats()
+                shard.extend(vals)
+                out[etype][meth].merge(shard)
+    return out
+
+def summarize(acc):
+    return (acc.mean(), acc.median(), acc.pstdev() if acc.count>1 else 0.0)
 
 # Scenario 1: compare 3 inference methods per entity over sample grid
 def scenario_1():
     print("=== Scenario 1: compare inference methods per entity ===")
-    methods = ['mamdani','sugeno','tsukamoto']
-    results = { (etype, m): [] for etype in enemy_types for m in methods }
-
-    for etype in enemy_types:
-        for ph in player_hp_values:
-            for eh in enemy_hp_values:
-                for m in mana_values:
-                    scores = fuzzy.get_all_scores(etype, ph, eh, 0, m, cd_val)
-                    for meth, val in scores.items():
-                        results[(etype,meth)].append(float(val))
-
-    # aggregate and print
+    methods = methods_all
+    grid = grid_stats()
+
+    # aggregate and print; baris langsung dialirkan ke writer
     best_by_entity = {}
-    csv_rows = []
-    for etype in enemy_types:
-        stats = []
-        for meth in methods:
-            vals = results[(etype,meth)]
-            avg, med, sd = summarize_list(vals)
-            stats.append((meth, avg, med, sd))
-            csv_rows.append([etype, 'scenario1', meth, avg, med, sd])
-        stats_sorted = sorted(stats, key=lambda x: x[1], reverse=True)
-        print(f"== {etype} ==")
-        for meth, avg, med, sd in stats_sorted:
-            print(f"  {meth:10s} avg={avg:.3f} med={med:.3f} sd={sd:.3f}")
-        best_by_entity[etype] = stats_sorted[0][0]
-        print()
-    # save CSV
-    with open(os.path.join(OUT_DIR, "scenario1_summary.csv"), "w", newline='') as f:
-        w = csv.writer(f)
-        w.writerow(["entity","scenario","method","avg","median","pstd"])
-        w.writerows(csv_rows)
+    with open_table("scenario1_summary", ["entity","scenario","method","avg","median","pstd"]) as w:
+        for etype in enemy_types:
+            stats = []
+            for meth in methods:
+                avg, med, sd = summarize(grid[etype][meth])
+                stats.append((meth, avg, med, sd))
+                w.writerow([etype, 'scenario1', meth, avg, med, sd])
+            stats_sorted = sorted(stats, key=lambda x: x[1], reverse=True)
+            print(f"== {etype} ==")
+            for meth, avg, med, sd in stats_sorted:
+                print(f"  {meth:10s} avg={avg:.3f} med={med:.3f} sd={sd:.3f}")
+            best_by_entity[etype] = stats_sorted[0][0]
+            print()
     return best_by_entity
 
+def best_methods():
+    # pilihan "best" scenario 1 (rata-rata tertinggi) tanpa print/output, untuk scenario_2 saja
+    grid = grid_stats()
+    return {etype: max(methods_all, key=lambda m: grid[etype][m].mean()) for etype in enemy_types}
+
 # Scenario 2: compare best inference (from scenario1) vs no-fuzzy fallback heuristic
 def scenario_2(best_by_entity):
     print("=== Scenario 2: compare best inference vs no-fuzzy (fallback heuristic) ===")
     methods = ['best_inference','no_fuzzy']
-    csv_rows = []
-    for etype in enemy_types:
-        best = best_by_entity.get(etype)
-        vals_best = []
-        vals_fallback = []
-        for ph in player_hp_values:
-            for eh in enemy_hp_values:
-                for m in mana_values:
-                    scores = fuzzy.get_all_scores(etype, ph, eh, 0, m, cd_val)
-                    vals_best.append(float(scores.get(best, scores.get('mamdani'))))
-                    # use fallback scorers provided in module as "no-fuzzy" baseline
-                    if etype in ('Zombie','Skeleton'):
-                        fb = fuzzy.fallback_score_no_mana(ph, eh, cd_val)
-                    else:
-                        fb = fuzzy.fallback_score_with_mana(ph, eh, 0, m, cd_val)
-                    vals_fallback.append(float(fb))
-        b_avg, b_med, b_sd = summarize_list(vals_best)
-        f_avg, f_med, f_sd = summarize_list(vals_fallback)
-        csv_rows.append([etype, 'scenario2', best, b_avg, b_med, b_sd, 'fallback', f_avg, f_med, f_sd])
-        print(f"{etype}: best={best}  best_avg={b_avg:.3f}  fallback_avg={f_avg:.3f}  delta={b_avg-f_avg:.3f}")
-    with open(os.path.join(OUT_DIR,"scenario2_summary.csv"), "w", newline='') as f:
-        w = csv.writer(f)
-        w.writerow(["entity","scenario","best_method","best_avg","best_med","best_pstd","baseline_label","baseline_avg","baseline_med","baseline_pstd"])
-        w.writerows(csv_rows)
+    header = ["entity","scenario","best_method","best_avg","best_med","best_pstd","baseline_label","baseline_avg","baseline_med","baseline_pstd"]
+    with open_table("scenario2_summary", header) as w:
+        grid = grid_stats()
+        for etype in enemy_types:
+            best = best_by_entity.get(etype)
+            acc_best = grid[etype].get(best, grid[etype]['mamdani'])
+            acc_fallback = streamstats.RunningStats()
+            for ph in player_hp_values:
+                for eh in enemy_hp_values:
+                    for m in mana_values:
+                        # use fallback scorers provided in module as "no-fuzzy" baseline
+                        if etype in ('Zombie','Skeleton'):
+                            fb = fuzzy.fallback_score_no_mana(ph, eh, cd_val)
+                        else:
+                            fb = fuzzy.fallback_score_with_mana(ph, eh, 0, m, cd_val)
+                        acc_fallback.add(float(fb))
+            b_avg, b_med, b_sd = summarize(acc_best)
+            f_avg, f_med, f_sd = summarize(acc_fallback)
+            w.writerow([etype, 'scenario2', best, b_avg, b_med, b_sd, 'fallback', f_avg, f_med, f_sd])
+            print(f"{etype}: best={best}  best_avg={b_avg:.3f}  fallback_avg={f_avg:.3f}  delta={b_avg-f_avg:.3f}")
 
 # Scenario 3: test different membership interval configs (pass intervals to get_all_scores)
 def scenario_3():
     print("=== Scenario 3: effect of different membership intervals ===")
-    # define three example interval variants (keys follow fuzzy.get_membership_with_mana/get_membership_no_mana)
-    interval_sets = {
-        'default': None,
-        'aggro_player_hp': {
-            # make player-hp considered "low" earlier (aggressive AI towards low player hp)
-            'hp_p_low':[0,0,10,30], 'hp_p_med':[20,35,55,75], 'hp_p_high':[50,80,100,100],
-            # keep others default-ish
-        },
-        'defensive_enemy_hp': {
-            # consider enemy hp "high" only near full so AI more defensive earlier
-            'hp_b_low':[0,0,10,40], 'hp_b_med':[30,45,65,85], 'hp_b_high':[70,90,100,100],
-        }
-    }
-    csv_rows = []
-    for name, intervals in interval_sets.items():
-        print(f"-- intervals: {name} --")
+    # interval variants: interval_sets (modul / spec)
+    with open_table("scenario3_intervals", ["interval_set","entity","method","avg","median","pstd"]) as w:
+        for name, intervals in interval_sets.items():
+            print(f"-- intervals: {name} --")
+            grid = grid_stats(intervals)
+            for etype in enemy_types:
+                methods = methods_all
+                for meth in methods:
+                    avg, med, sd = summarize(grid[etype][meth])
+                    w.writerow([name, etype, meth, avg, med, sd])
+                    print(f" {etype:8s} {meth:10s} avg={avg:.3f} med={med:.3f} sd={sd:.3f}")
+            print()
+
+# Monte Carlo: sampel state per batch sampai CI mean & median stabil
+MC_SOURCES = ('random', 'replay')
+
+def mc_replay_pool(paths):
+    """etype -> array input (n, 5) dari semua record turn log."""
+    import turnlog
+    pool = {}
+    for path in paths:
+        recs, _, _ = turnlog.read_log(path)
+        for code, etype in enumerate(turnlog.ETYPES):
+            inp = recs['inputs'][recs['etype'] == code].astype(np.float64)
+            if len(inp):
+                pool.setdefault(etype, []).append(inp)
+    return {etype: np.concatenate(parts) for etype, parts in pool.items()}
+
+def mc_sampler(cfg, etype, rng, pool=None):
+    """
+    draw(n) -> 5 array input (hp_p, hp_b, mana_p, mana_b, cd); None jika replay tanpa record etype ini.
+    Untuk replay draw bisa mengembalikan kurang dari n titik (kosong = semua record sudah terpakai).
+    """
+    if cfg['source'] == 'replay':
+        inp = (pool or {}).get(etype)
+        if inp is None:
+            return None
+        # tanpa pengembalian: record diacak sekali lalu diambil berurutan sampai habis
+        order = rng.permutation(len(inp))
+        pos = [0]
+        def take(n):
+            idx = order[pos[0]:pos[0] + n]
+            pos[0] += len(idx)
+            return inp[idx].T
+        return take
+    max_hp, max_mana = cfg['states'][etype]
+    def draw(n):
+        return (rng.integers(1, cfg['player_hp'] + 1, n).astype(float),
+                rng.integers(1, max_hp + 1, n).astype(float),
+                np.zeros(n),
+                (rng.integers(0, max_mana // 5 + 1, n) * 5).astype(float),
+                np.full(n, float(cd_val)))
+    return draw
+
+def mc_intervals(st, z):
+    """
+    (mean, (lo, hi), median, (lo, hi), pstd) dari streamstats.RunningStats. CI mean dari jumlah
+    streaming; CI median dari order statistic (bebas distribusi), eksak sampai EXACT_MAX lalu t-digest.
+    """
+    n = st.count
+    mean = st.mean()
+    pstd = st.pstdev()
+    sd = pstd * np.sqrt(n / (n - 1)) if n > 1 else 0.0
+    half = z * sd / np.sqrt(n)
+    k = z * np.sqrt(n) / 2
+    lo = int(max(0, np.floor(n / 2 - k)))
+    hi = int(min(n - 1, np.ceil(n / 2 + k)))
+    return mean, (mean - half, mean + half), st.median(), (st.order_stat(lo), st.order_stat(hi)), pstd
+
+def scenario_monte_carlo(cfg=None):
+    cfg = dict(monte_carlo, **(cfg or {}))
+    print(f"=== Monte Carlo: source={cfg['source']}, target lebar CI {cfg['width']} "
+          f"({cfg['confidence']:.0%}), batch {cfg['batch']} ===")
+    z = statistics.NormalDist().inv_cdf(0.5 + cfg['confidence'] / 2)
+    intervals = interval_sets.get(cfg['interval_set'])
+    pool = mc_replay_pool(cfg['logs']) if cfg['source'] == 'replay' else None
+    rng = np.random.default_rng(cfg['seed'])
+    header = ["entity", "source", "method", "n", "avg", "avg_lo", "avg_hi", "median", "med_lo", "med_hi",
+              "pstd", "converged"]
+    with open_table("monte_carlo_summary", header) as w, \
+            open_table("monte_carlo_trace", ["entity", "n", "method", "avg_width", "med_width"]) as trace:
         for etype in enemy_types:
-            methods = ['mamdani','sugeno','tsukamoto']
-            vals_by_method = {m: [] for m in methods}
-            for ph in player_hp_values:
-                for eh in enemy_hp_values:
-                    for m in mana_values:
-                        scores = fuzzy.get_all_scores(etype, ph, eh, 0, m, cd_val, intervals=intervals)
-                        for meth, val in scores.items():
-                            vals_by_method[meth].append(float(val))
-            for meth in methods:
-                avg, med, sd = summarize_list(vals_by_method[meth])
-                csv_rows.append([name, etype, meth, avg, med, sd])
-                print(f" {etype:8s} {meth:10s} avg={avg:.3f} med={med:.3f} sd={sd:.3f}")
-        print()
-    with open(os.path.join(OUT_DIR,"scenario3_intervals.csv"), "w", newline='') as f:
-        w = csv.writer(f)
-        w.writerow(["interval_set","entity","method","avg","median","pstd"])
-        w.writerows(csv_rows)
-
-def main():
-    best = scenario_1()
-    scenario_2(best)
-    scenario_3()
+            draw = mc_sampler(cfg, etype, rng, pool)
+            if draw is None:
+                print(f"{etype}: tidak ada record di turn log, dilewati")
+                continue
+            t0 = time.perf_counter()
+            acc = {m: streamstats.RunningStats() for m in methods_all}
+            n = batches = 0
+            while True:
+                inputs = draw(min(cfg['batch'], cfg['max_samples'] - n))
+                size = len(inputs[0])
+                exhausted = size == 0
+                if exhausted:
+                    break
+                batch = fuzzy.get_all_scores_batch(etype, *inputs, intervals=intervals)
+                for m in methods_all:
+                    acc[m].extend(batch[m])
+                n += size
+                batches += 1
+                stats = {m: mc_intervals(acc[m], z) for m in methods_all}
+                widths = {m: (st[1][1] - st[1][0], st[3][1] - st[3][0]) for m, st in stats.items()}
+                for m, (wa, wm) in widths.items():
+                    trace.writerow([etype, n, m, wa, wm])
+                converged = batches >= cfg['min_batches'] and all(
+                    max(wd) <= cfg['width'] for wd in widths.values())
+                if converged or n >= cfg['max_samples']:
+                    break
+            if exhausted:
+                note = " (semua record turn log terpakai)"
+            elif not converged:
+                note = f" (belum konvergen, max_samples {cfg['max_samples']})"
+            else:
+                note = ""
+            print(f"== {etype} == {n} sampel, {time.perf_counter() - t0:.2f} s{note}")
+            for m in methods_all:
+                avg, (a_lo, a_hi), med, (m_lo, m_hi), sd = stats[m]
+                w.writerow([etype, cfg['source'], m, n, avg, a_lo, a_hi, med, m_lo, m_hi, sd, converged])
+                print(f"  {m:10s} avg={avg:.3f} [{a_lo:.3f}, {a_hi:.3f}]  med={med:.3f} [{m_lo:.3f}, {m_hi:.3f}]"
+                      f"  sd={sd:.3f}")
+            print()
+
+SCENARIOS = ('scenario_1', 'scenario_2', 'scenario_3', 'monte_carlo')
+
+def run_all(scenarios=SCENARIOS):
+    best = None
+    for name in scenarios:
+        if name == 'scenario_1':
+            best = scenario_1()
+        elif name == 'scenario_2':
+            scenario_2(best if best is not None else best_methods())
+        elif name == 'scenario_3':
+            scenario_3()
+        elif name == 'monte_carlo':
+            scenario_monte_carlo()
+        else:
+            raise ValueError(f"scenario tidak dikenal: {name!r} (pilih {', '.join(SCENARIOS)})")
     print("All scenarios finished. Results written to", OUT_DIR)
 
+def main(argv=None):
+    global EXECUTOR, STORE_DIR
+    ap = argparse.ArgumentParser(description="Fuzzy inference experiments")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="jumlah proses untuk menghitung grid skor (1 = serial)")
+    ap.add_argument("--profile", action="store_true",
+                    help="jalankan di bawah profiler; tulis profile_experiments.{pstats,collapsed} ke " + OUT_DIR)
+    ap.add_argument("--spec", default=None, help="file JSON spec eksperimen (grid, methods, interval_sets, "
+                                                 "scenarios, output); key yang tidak ada memakai default")
+    ap.add_argument("--dump-spec", action="store_true", help="print spec efektif (JSON) lalu keluar")
+    ap.add_argument("--format", choices=tablewriter.FORMATS, default=None, help="timpa output.format di spec")
+    ap.add_argument("--store", default=None, help="direktori result store skor grid (default: <output.dir>/store)")
+    ap.add_argument("--no-store", action="store_true", help="hitung ulang semua skor tanpa result store")
+    ap.add_argument("--monte-carlo", action="store_true", help="hanya jalankan scenario monte_carlo")
+    ap.add_argument("--mc-logs", nargs="+", default=None, metavar="FTL",
+                    help="sampel dari turn log ini (monte_carlo.source = replay)")
+    ap.add_argument("--mc-width", type=float, default=None, help="timpa monte_carlo.width (lebar CI target)")
+    args = ap.parse_args(argv)
+    spec = load_spec(args.spec)
+    if args.format:
+        spec['output']['format'] = args.format
+    if args.monte_carlo:
+        spec['scenarios'] = ['monte_carlo']
+    if args.mc_logs:
+        spec['monte_carlo'].update(source='replay', logs=args.mc_logs)
+    if args.mc_width is not None:
+        spec['monte_carlo']['width'] = args.mc_width
+    if args.dump_spec:
+        print(json.dumps(spec, indent=2))
+        return
+    apply_spec(spec)
+    STORE_DIR = None if args.no_store else (args.store or os.path.join(OUT_DIR, "store"))
+    scenarios = spec['scenarios']
+    if args.workers > 1:
+        EXECUTOR = ProcessPoolExecutor(max_workers=args.workers)
+    try:
+        if args.profile:
+            import profiling
+            profiling.run_profiled(lambda: run_all(scenarios), 'profile_experiments', OUT_DIR)
+        else:
+            run_all(scenarios)
+    finally:
+        if EXECUTOR is not None:
+            EXECUTOR.shutdown()
+            EXECUTOR = None
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
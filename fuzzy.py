@@ -3,6 +3,8 @@ Fuzzy AI — tambah 3 metode inferensi (Mamdani, Sugeno, Tsukamoto-approx)
 - Tetap kompatibel API sebelumnya
 - Tambah fungsi untuk mengembalikan ketiga skor (untuk perbandingan di main)
 """
+import functools
+
 try:
     import numpy as np
     import skfuzzy as fuzz
@@ -84,6 +86,14 @@ if SKFUZZY:
         (['hp_bot_high','mana_b_high'], 'strong'),
     ]
 
+    # rule specs untuk sistem tanpa mana (Zombie/Skeleton), mirror rules_z
+    rule_specs_z = [
+        (['hp_b_high','cd_long'], 'strong'),
+        (['hp_p_low'], 'strong'),
+        (['hp_b_low'], 'weak'),
+        (['cd_ready','hp_b_med'], 'mid'),
+    ]
+
     # Build Mamdani ControlSystem (existing)
     rules = [
         ctrl.Rule(hp_bot['low'] & hp_p['high'], action['weak']),
@@ -161,6 +171,32 @@ def fallback_score_no_mana(hp_p, hp_b, cd_p):
     return max(0, min(100, score))
 
 # --- Helper: get membership functions based on intervals ---
+# interval default (sama dengan membership di atas); key yang tidak ada di dict intervals memakai ini
+DEFAULT_INTERVALS_WITH_MANA = {
+    'hp_p_low': [0,0,20,50], 'hp_p_med': [20,40,60,80], 'hp_p_high': [50,80,100,100],
+    'hp_b_low': [0,0,30,60], 'hp_b_med': [30,50,70,90], 'hp_b_high': [70,90,100,100],
+    'mana_p_low': [0,0,40], 'mana_p_med': [20,50,80], 'mana_p_high': [60,100,100],
+    'mana_b_low': [0,0,30], 'mana_b_med': [30,50,70], 'mana_b_high': [70,100,100],
+    'cd_ready': [0,0,1,3], 'cd_mid': [2,4,6,8], 'cd_long': [6,9,10,10],
+}
+DEFAULT_INTERVALS_NO_MANA = {
+    'hp_l': [0,0,20,50], 'hp_m': [20,40,60,80], 'hp_h': [50,80,100,100],
+    'cd_r': [0,0,1,3], 'cd_m': [2,4,6,8], 'cd_l': [6,9,10,10],
+}
+
+def universe_for(key):
+    # universe sumbu yang dipakai suatu key interval
+    if key.startswith('mana'):
+        return x_mana
+    if key.startswith('cd'):
+        return x_cd
+    return x_hp
+
+def _membership(key, params):
+    if len(params) == 3:
+        return fuzz.trimf(universe_for(key), params)
+    return fuzz.trapmf(universe_for(key), params)
+
 def get_membership_with_mana(intervals=None):
     # intervals: dict with keys for each membership, values are interval lists
     # fallback to default intervals if not provided
@@ -172,23 +208,10 @@ def get_membership_with_mana(intervals=None):
             'mana_b_low': mana_b_low, 'mana_b_med': mana_b_med, 'mana_b_high': mana_b_high,
             'cd_ready': cd_ready, 'cd_mid': cd_mid, 'cd_long': cd_long
         }
-    # build membership arrays from intervals
+    # build membership arrays from intervals (list 4 titik -> trapmf, 3 titik -> trimf)
     memb = {}
-    memb['hp_p_low'] = fuzz.trapmf(x_hp, intervals.get('hp_p_low', [0,0,20,50]))
-    memb['hp_p_med'] = fuzz.trapmf(x_hp, intervals.get('hp_p_med', [20,40,60,80]))
-    memb['hp_p_high'] = fuzz.trapmf(x_hp, intervals.get('hp_p_high', [50,80,100,100]))
-    memb['hp_b_low'] = fuzz.trapmf(x_hp, intervals.get('hp_b_low', [0,0,30,60]))
-    memb['hp_b_med'] = fuzz.trapmf(x_hp, intervals.get('hp_b_med', [30,50,70,90]))
-    memb['hp_b_high'] = fuzz.trapmf(x_hp, intervals.get('hp_b_high', [70,90,100,100]))
-    memb['mana_p_low'] = fuzz.trimf(x_mana, intervals.get('mana_p_low', [0,0,40]))
-    memb['mana_p_med'] = fuzz.trimf(x_mana, intervals.get('mana_p_med', [20,50,80]))
-    memb['mana_p_high'] = fuzz.trimf(x_mana, intervals.get('mana_p_high', [60,100,100]))
-    memb['mana_b_low'] = fuzz.trimf(x_mana, intervals.get('mana_b_low', [0,0,30]))
-    memb['mana_b_med'] = fuzz.trimf(x_mana, intervals.get('mana_b_med', [30,50,70]))
-    memb['mana_b_high'] = fuzz.trimf(x_mana, intervals.get('mana_b_high', [70,100,100]))
-    memb['cd_ready'] = fuzz.trapmf(x_cd, intervals.get('cd_ready', [0,0,1,3]))
-    memb['cd_mid'] = fuzz.trapmf(x_cd, intervals.get('cd_mid', [2,4,6,8]))
-    memb['cd_long'] = fuzz.trapmf(x_cd, intervals.get('cd_long', [6,9,10,10]))
+    for k, default in DEFAULT_INTERVALS_WITH_MANA.items():
+        memb[k] = _membership(k, intervals.get(k, default))
     return memb
 
 def get_membership_no_mana(intervals=None):
@@ -198,12 +221,8 @@ def get_membership_no_mana(intervals=None):
             'cd_r': cd_r, 'cd_m': cd_m, 'cd_l': cd_l
         }
     memb = {}
-    memb['hp_l'] = fuzz.trapmf(x_hp, intervals.get('hp_l', [0,0,20,50]))
-    memb['hp_m'] = fuzz.trapmf(x_hp, intervals.get('hp_m', [20,40,60,80]))
-    memb['hp_h'] = fuzz.trapmf(x_hp, intervals.get('hp_h', [50,80,100,100]))
-    memb['cd_r'] = fuzz.trapmf(x_cd, intervals.get('cd_r', [0,0,1,3]))
-    memb['cd_m'] = fuzz.trapmf(x_cd, intervals.get('cd_m', [2,4,6,8]))
-    memb['cd_l'] = fuzz.trapmf(x_cd, intervals.get('cd_l', [6,9,10,10]))
+    for k, default in DEFAULT_INTERVALS_NO_MANA.items():
+        memb[k] = _membership(k, intervals.get(k, default))
     return memb
 
 # --- Modified degree computation to use custom intervals ---
@@ -254,6 +273,9 @@ def mamdani_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p, intervals=None):
             bot_simulasi.input['Mana_Player'] = mana_p
             bot_simulasi.input['Mana_Bot'] = mana_b
             bot_simulasi.input['CD_Player'] = cd_p
+            # cache skfuzzy tidak mengosongkan output jika tidak ada rule yang aktif: tanpa ini
+            # input yang sudah pernah dihitung memakai output dari panggilan sebelumnya
+            bot_simulasi.output.clear()
             bot_simulasi.compute()
             return float(bot_simulasi.output['Action_Strength'])
         except Exception:
@@ -270,6 +292,9 @@ def mamdani_no_mana(hp_p, hp_b, cd_p, intervals=None):
             sim_z.input['HP_Player_Z'] = hp_p
             sim_z.input['HP_Bot_Z'] = hp_b
             sim_z.input['CD_Player_Z'] = cd_p
+            # cache skfuzzy tidak mengosongkan output jika tidak ada rule yang aktif: tanpa ini
+            # input yang sudah pernah dihitung memakai output dari panggilan sebelumnya
+            sim_z.output.clear()
             sim_z.compute()
             return float(sim_z.output['Action_Strength_Z'])
         except Exception:
@@ -299,12 +324,6 @@ def sugeno_no_mana(hp_p, hp_b, cd_p, intervals=None):
         return max(0, min(100, base * 0.95))
     deg = _compute_degrees_no_mana(hp_p, hp_b, cd_p, intervals)
     centroids = {'weak': 20.0, 'mid': 50.0, 'strong': 80.0}
-    rule_specs_z = [
-        (['hp_b_high','cd_long'], 'strong'),
-        (['hp_p_low'], 'strong'),
-        (['hp_b_low'], 'weak'),
-        (['cd_ready','hp_b_med'], 'mid'),
-    ]
     num = 0.0; den = 0.0
     for conds, out in rule_specs_z:
         vals = [deg.get(c, 0.0) for c in conds]
@@ -337,12 +356,6 @@ def tsukamoto_no_mana(hp_p, hp_b, cd_p, intervals=None):
         base = fallback_score_no_mana(hp_p, hp_b, cd_p)
         return max(0, min(100, base * 1.05))
     deg = _compute_degrees_no_mana(hp_p, hp_b, cd_p, intervals)
-    rule_specs_z = [
-        (['hp_b_high','cd_long'], 'strong'),
-        (['hp_p_low'], 'strong'),
-        (['hp_b_low'], 'weak'),
-        (['cd_ready','hp_b_med'], 'mid'),
-    ]
     num = 0.0; den = 0.0
     for conds, out in rule_specs_z:
         vals = [deg.get(c, 0.0) for c in conds]
@@ -374,6 +387,222 @@ def get_all_scores(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p, intervals=None):
         t = tsukamoto_with_mana(hp_p,hp_b,mana_p,mana_b,cd_p,intervals)
     return {'mamdani': float(m), 'sugeno': float(s), 'tsukamoto': float(t)}
 
+# -------------------- batched inference --------------------
+# Versi vektor dari get_all_scores: input berupa array (atau list) dengan panjang sama,
+# hasil per metode berupa np.ndarray. Nilainya identik dengan versi skalar:
+# - Sugeno/Tsukamoto: urutan operasi sama persis, hanya dijalankan per kolom numpy
+# - Mamdani: output skfuzzy hanya bergantung pada tingkat "cut" tiap term output
+#   (weak/mid/strong), jadi cut dihitung secara vektor lalu defuzz dilakukan sekali
+#   per kombinasi cut unik (di-cache) dengan fungsi skfuzzy yang sama.
+
+# label rule_specs -> label derajat yang dipakai rules Mamdani (ControlSystem)
+_MAMDANI_LABELS = {'hp_bot_low': 'hp_b_low', 'hp_bot_med': 'hp_b_med', 'hp_bot_high': 'hp_b_high'}
+_TERMS = ('weak', 'mid', 'strong')
+
+def _interp_batch(x, mf, vals):
+    # sama dengan fuzz.interp_membership (np.interp, nol di luar universe)
+    return np.interp(vals, x, mf, left=0.0, right=0.0)
+
+def _degrees_with_mana_batch(hp_p, hp_b, mana_p, mana_b, cd_p, intervals=None):
+    memb = get_membership_with_mana(intervals)
+    deg = {}
+    for k in ('hp_p_low', 'hp_p_med', 'hp_p_high'):
+        deg[k] = _interp_batch(x_hp, memb[k], hp_p)
+    for k in ('hp_b_low', 'hp_b_med', 'hp_b_high'):
+        deg[k] = _interp_batch(x_hp, memb[k], hp_b)
+    for k in ('mana_p_low', 'mana_p_med', 'mana_p_high'):
+        deg[k] = _interp_batch(x_mana, memb[k], mana_p)
+    for k in ('mana_b_low', 'mana_b_med', 'mana_b_high'):
+        deg[k] = _interp_batch(x_mana, memb[k], mana_b)
+    for k in ('cd_ready', 'cd_mid', 'cd_long'):
+        deg[k] = _interp_batch(x_cd, memb[k], cd_p)
+    return deg
+
+def _degrees_no_mana_batch(hp_p, hp_b, cd_p, intervals=None):
+    memb = get_membership_no_mana(intervals)
+    deg = {}
+    deg['hp_p_low'] = _interp_batch(x_hp, memb['hp_l'], hp_p)
+    deg['hp_p_med'] = _interp_batch(x_hp, memb['hp_m'], hp_p)
+    deg['hp_p_high'] = _interp_batch(x_hp, memb['hp_h'], hp_p)
+    deg['hp_b_low'] = _interp_batch(x_hp, memb['hp_l'], hp_b)
+    deg['hp_b_med'] = _interp_batch(x_hp, memb['hp_m'], hp_b)
+    deg['hp_b_high'] = _interp_batch(x_hp, memb['hp_h'], hp_b)
+    deg['cd_ready'] = _interp_batch(x_cd, memb['cd_r'], cd_p)
+    deg['cd_mid'] = _interp_batch(x_cd, memb['cd_m'], cd_p)
+    deg['cd_long'] = _interp_batch(x_cd, memb['cd_l'], cd_p)
+    return deg
+
+def _firing_batch(deg, specs, n, labels=None):
+    # firing tiap rule = min derajat kondisi; label yang tidak ada -> 0 (sama seperti deg.get(c, 0.0))
+    zero = np.zeros(n)
+    out = []
+    for conds, res in specs:
+        f = None
+        for c in conds:
+            if labels:
+                c = labels.get(c, c)
+            v = deg.get(c, zero)
+            f = v if f is None else np.minimum(f, v)
+        out.append((f if f is not None else zero, res))
+    return out
+
+def _sugeno_batch(firings, n):
+    centroids = {'weak': 20.0, 'mid': 50.0, 'strong': 80.0}
+    num = np.zeros(n); den = np.zeros(n)
+    for f, out in firings:
+        num = num + f * centroids[out]
+        den = den + f
+    return num, den
+
+def _tsukamoto_batch(firings, n):
+    num = np.zeros(n); den = np.zeros(n)
+    for f, out in firings:
+        if out == 'weak':
+            z = 40.0 * (1.0 - f)
+        elif out == 'mid':
+            z = 40.0 + 20.0 * f
+        else:
+            z = 60.0 + 40.0 * f
+        num = num + f * z
+        den = den + f
+    return num, den
+
+def _safe_ratio(num, den):
+    out = np.zeros_like(num)
+    ok = den > 1e-9
+    np.divide(num, den, out=out, where=ok)
+    return out, ok
+
+def _cut_crossings(x, mf, cut):
+    # titik universe (interpolasi linear) tempat mf melewati level cut; rumus & urutan operasi
+    # sama dengan yang dipakai skfuzzy untuk Consequent, tanpa bergantung fungsi privat skfuzzy.
+    # cut == 0 memakai '>' (level nol tidak boleh menandai semua titik nol)
+    above = mf > cut if cut == 0. else mf >= cut
+    idx = np.nonzero(np.diff(above))[0]
+    return x[idx] + (cut - mf[idx]) * (x[idx + 1] - x[idx]) / (mf[idx + 1] - mf[idx])
+
+@functools.lru_cache(maxsize=1 << 16)
+def _mamdani_defuzz_cuts(cut_weak, cut_mid, cut_strong):
+    # replika CrispValueCalculator.find_memberships + defuzz untuk Consequent Action_Strength
+    # (universe & term sama untuk sistem with-mana dan no-mana). None -> skfuzzy akan gagal.
+    cuts = (cut_weak, cut_mid, cut_strong)
+    mfs = (act_weak, act_mid, act_strong)
+    new_values = []
+    for cut, mf in zip(cuts, mfs):
+        new_values.extend(_cut_crossings(x_action, mf, cut).tolist())
+    universe = np.union1d(x_action, new_values)
+    output_mf = np.zeros_like(universe, dtype=np.float64)
+    for cut, mf in zip(cuts, mfs):
+        upsampled = fuzz.interp_membership(x_action, mf, universe)
+        np.maximum(output_mf, np.minimum(cut, upsampled), out=output_mf)
+    try:
+        return float(fuzz.defuzz(universe, output_mf, 'centroid'))
+    except Exception:
+        return None
+
+def _fallback_batch(no_mana, hp_p, hp_b, mana_p, mana_b, cd_p):
+    # versi vektor fallback_score_*: urutan operasi float sama, jadi hasil identik per elemen
+    hp_p, hp_b, mana_b, cd_p = [np.asarray(v, dtype=float) for v in (hp_p, hp_b, mana_b, cd_p)]
+    score = np.full(hp_p.shape, 50.0)
+    if no_mana:
+        score += (100 - hp_p) * 0.25
+        score += (hp_b - 50) * 0.25
+        score += cd_p * 1.5
+        score -= np.where(hp_b < 30, 40.0, 0.0)
+    else:
+        score += (100 - hp_p) * 0.2
+        score += (hp_b - 50) * 0.2
+        score += (mana_b - 50) * 0.1
+        score += cd_p * 1.2
+        score -= np.where(hp_b < 30, 35.0, 0.0)
+    return np.maximum(0.0, np.minimum(100.0, score))
+
+def _mamdani_batch(specs, deg, n, fallback):
+    # defuzz sekali per kombinasi cut unik; fallback(idx) dipanggil untuk titik yang gagal defuzz
+    firings = _firing_batch(deg, specs, n, _MAMDANI_LABELS)
+    cuts = {t: np.zeros(n) for t in _TERMS}
+    for f, out in firings:
+        cuts[out] = np.maximum(cuts[out], f)
+    # kelompokkan titik dengan (weak, mid, strong) sama: lexsort 3 kolom, batas grup = baris berubah
+    w, m, s = cuts['weak'], cuts['mid'], cuts['strong']
+    order = np.lexsort((s, m, w))
+    ws, ms, ss = w[order], m[order], s[order]
+    first = np.r_[True, (ws[1:] != ws[:-1]) | (ms[1:] != ms[:-1]) | (ss[1:] != ss[:-1])]
+    group = np.empty(n, dtype=np.intp)
+    group[order] = np.cumsum(first) - 1
+    vals = [_mamdani_defuzz_cuts(*key) for key in zip(ws[first].tolist(), ms[first].tolist(), ss[first].tolist())]
+    res = np.array([np.nan if v is None else v for v in vals], dtype=float)[group]
+    bad = np.nonzero(np.isnan(res))[0]
+    if len(bad):
+        res[bad] = fallback(bad)
+    return res
+
+def get_all_scores_batch(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p, intervals=None, specs=None):
+    """
+    Versi batch dari get_all_scores untuk satu bot_type.
+    Semua input boleh skalar atau array 1D (di-broadcast ke panjang yang sama).
+    specs: pengganti rule_specs/rule_specs_z (mis. ablation rule di sensitivity.py).
+    Return dict {'mamdani': ndarray, 'sugeno': ndarray, 'tsukamoto': ndarray}.
+    """
+    arrs = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v)) for v in (hp_p, hp_b, mana_p, mana_b, cd_p)])
+    hp_p, hp_b, mana_p, mana_b, cd_p = [np.ascontiguousarray(a) for a in arrs]
+    n = hp_p.shape[0]
+    no_mana = bot_type in ('Zombie','Skeleton')
+
+    if no_mana:
+        def fb(i):
+            return fallback_score_no_mana(hp_p[i].item(), hp_b[i].item(), cd_p[i].item())
+    else:
+        def fb(i):
+            return fallback_score_with_mana(hp_p[i].item(), hp_b[i].item(), mana_p[i].item(), mana_b[i].item(), cd_p[i].item())
+
+    def fb_many(idx):
+        # fallback untuk banyak indeks sekaligus (idx: array indeks)
+        return _fallback_batch(no_mana, hp_p[idx], hp_b[idx], mana_p[idx], mana_b[idx], cd_p[idx])
+
+    if not SKFUZZY:
+        base = np.array([fb(i) for i in range(n)], dtype=float)
+        return {'mamdani': base,
+                'sugeno': np.array([max(0, min(100, b * 0.95)) for b in base.tolist()], dtype=float),
+                'tsukamoto': np.array([max(0, min(100, b * 1.05)) for b in base.tolist()], dtype=float)}
+
+    if no_mana:
+        deg = _degrees_no_mana_batch(hp_p, hp_b, cd_p, intervals)
+        specs = rule_specs_z if specs is None else specs
+    else:
+        deg = _degrees_with_mana_batch(hp_p, hp_b, mana_p, mana_b, cd_p, intervals)
+        specs = rule_specs if specs is None else specs
+    firings = _firing_batch(deg, specs, n)
+
+    s_num, s_den = _sugeno_batch(firings, n)
+    sugeno, s_ok = _safe_ratio(s_num, s_den)
+    bad = np.nonzero(~s_ok)[0]
+    if len(bad):
+        sugeno[bad] = fb_many(bad)
+
+    if intervals is None:
+        # ControlSystemSimulation meng-clip input ke batas universe sebelum fuzzifikasi
+        if no_mana:
+            m_deg = _degrees_no_mana_batch(np.clip(hp_p, 0, 100), np.clip(hp_b, 0, 100), np.clip(cd_p, 0, 10))
+        else:
+            m_deg = _degrees_with_mana_batch(np.clip(hp_p, 0, 100), np.clip(hp_b, 0, 100),
+                                             np.clip(mana_p, 0, 100), np.clip(mana_b, 0, 100), np.clip(cd_p, 0, 10))
+        mamdani = _mamdani_batch(specs, m_deg, n, fb_many)
+    else:
+        # sama seperti mamdani_*(intervals=...): pakai Sugeno
+        mamdani = sugeno.copy()
+
+    t_num, t_den = _tsukamoto_batch(firings, n)
+    tsukamoto, t_ok = _safe_ratio(t_num, t_den)
+    bad = ~t_ok
+    tsukamoto[bad] = mamdani[bad]
+
+    return {'mamdani': mamdani, 'sugeno': sugeno, 'tsukamoto': tsukamoto}
+
+def mamdani_cache_info():
+    # statistik cache defuzz Mamdani (hits/misses/currsize)
+    return _mamdani_defuzz_cuts.cache_info()
+
 # Backwards-compatible wrappers (keep default behaviour using Mamdani scorers)
 def get_bot_action_score(hp_p_val, hp_b_val, mana_p_val, mana_b_val, cd_p_val, intervals=None):
     return mamdani_with_mana(hp_p_val, hp_b_val, mana_p_val, mana_b_val, cd_p_val, intervals)
@@ -381,12 +610,16 @@ def get_bot_action_score(hp_p_val, hp_b_val, mana_p_val, mana_b_val, cd_p_val, i
 def get_zombie_action_score(hp_p_val, hp_b_val, cd_p_val, intervals=None):
     return mamdani_no_mana(hp_p_val, hp_b_val, cd_p_val, intervals)
 
+# batas skor Weak/Mid dan Mid/Strong per tipe musuh (bisa di-override, mis. hasil selfplay.py)
+BEHAVIOR_CUTS = {'Zombie': (40, 70), 'Skeleton': (40, 70), 'Enderman': (40, 70), 'Boss': (40, 70)}
+
 # map fuzzy numeric score to high-level behavior strings used by main.py
 def map_fuzzy_score_to_behavior(score, bot_type):
 	# score: 0-100
-	if score < 40:
+	weak_cut, strong_cut = BEHAVIOR_CUTS.get(bot_type, (40, 70))
+	if score < weak_cut:
 		strength = "Weak"
-	elif score < 70:
+	elif score < strong_cut:
 		strength = "Mid"
 	else:
 		strength = "Strong"
@@ -440,21 +673,22 @@ def pick_adjacent_for_farther(zpos, ppos, occupied, grid_w, grid_h):
     return best
 
 # --- Heal-priority interrupt (Enderman / Boss) ---
+# (HP maksimum, mana minimum) untuk heal; tipe yang tidak ada di sini tidak pernah heal
+# Enderman: heal when quite low and have moderate mana
+# Boss: require lower HP and reasonable mana so boss won't heal too often
+HEAL_THRESHOLDS = {'Enderman': (40, 30), 'Boss': (45, 40)}
+
 def heal_priority_check(bot_type, hp_b_val, mana_b_val):
-	# Enderman: heal when quite low and have moderate mana
-	if bot_type == "Enderman":
-		if hp_b_val <= 40 and mana_b_val >= 30:
-			return ("HEAL", True)
-	# Boss: be more willing to retreat/heal — tighten condition to avoid frequent heals
-	if bot_type == "Boss":
-		# changed: require lower HP and reasonable mana so boss won't heal too often
-		if hp_b_val <= 45 and mana_b_val >= 40:
+	if bot_type in HEAL_THRESHOLDS:
+		max_hp, min_mana = HEAL_THRESHOLDS[bot_type]
+		if hp_b_val <= max_hp and mana_b_val >= min_mana:
 			return ("HEAL", True)
 	return (None, False)
 
 # keep get_final_action / wrappers from previous file (unchanged)
 def get_final_action(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p,
-                     pos, player_pos, occupied, grid_w=8, grid_h=6):
+                     pos, player_pos, occupied, grid_w=8, grid_h=6, score=None):
+    # score: skor Mamdani yang sudah dihitung (mis. lewat get_all_scores_batch); None -> hitung di sini
     if hp_b <= 0:
         return ("WAIT", None)
     heal_act, do_heal = heal_priority_check(bot_type, hp_b, mana_b)
@@ -465,10 +699,11 @@ def get_final_action(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p,
         return ("ATTACK", player_pos)
 
     # default uses Mamdani mapping (keeps previous behavior)
-    if bot_type in ('Zombie','Skeleton'):
-        score = mamdani_no_mana(hp_p, hp_b, cd_p)
-    else:
-        score = mamdani_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p)
+    if score is None:
+        if bot_type in ('Zombie','Skeleton'):
+            score = mamdani_no_mana(hp_p, hp_b, cd_p)
+        else:
+            score = mamdani_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p)
 
     behavior = map_fuzzy_score_to_behavior(score, bot_type)
 
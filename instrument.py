@@ -0,0 +1,249 @@
+"""
+Instrumentasi hot path — jumlah panggilan + histogram latency, plus frekuensi firing rule
+- Mati secara default dan tanpa biaya: fungsi asli tidak disentuh sampai enable() dipanggil
+- enable() membungkus fungsi inference/derajat di fuzzy dan (opsional) method Game/renderer
+  dari modul game yang diberikan; disable() mengembalikan fungsi aslinya
+- Data: snapshot() / rule_stats(), dump_json() dan dump_csv()
+
+Contoh:
+  import instrument, experiments
+  instrument.enable()
+  experiments.scenario_1()
+  instrument.dump_json("experiments_out/instrument.json")
+"""
+import csv
+import functools
+import json
+import time
+
+import fuzzy
+
+N_BUCKETS = 32     # bucket k: durasi < 2**k * 1.024 us (bucket 0: < 1 us)
+
+# (nama fungsi di modul fuzzy, nama stat)
+FUZZY_TARGETS = [
+    ('mamdani_with_mana', 'fuzzy.mamdani_with_mana'),
+    ('mamdani_no_mana', 'fuzzy.mamdani_no_mana'),
+    ('sugeno_with_mana', 'fuzzy.sugeno_with_mana'),
+    ('sugeno_no_mana', 'fuzzy.sugeno_no_mana'),
+    ('tsukamoto_with_mana', 'fuzzy.tsukamoto_with_mana'),
+    ('tsukamoto_no_mana', 'fuzzy.tsukamoto_no_mana'),
+    ('get_all_scores', 'fuzzy.get_all_scores'),
+    ('get_all_scores_batch', 'fuzzy.get_all_scores_batch'),
+    ('get_final_action', 'fuzzy.get_final_action'),
+    ('_compute_degrees_with_mana', 'fuzzy._compute_degrees_with_mana'),
+    ('_compute_degrees_no_mana', 'fuzzy._compute_degrees_no_mana'),
+]
+# (nama class di modul game, method, nama stat)
+GAME_TARGETS = [
+    ('Game', 'find_path', 'game.find_path'),
+    ('Game', 'enemy_action', 'game.enemy_action'),
+    ('Game', 'enemy_turn', 'game.enemy_turn'),
+    ('Game', 'draw_frame', 'draw.frame'),
+    ('Game', 'unit_ops', 'draw.unit_ops'),
+    ('Game', 'cursor_ops', 'draw.cursor_ops'),
+    ('Game', 'ui_ops', 'draw.ui_ops'),
+    ('Game', 'debug_ops', 'draw.debug_ops'),
+    ('Game', 'draw_main_menu', 'draw.main_menu'),
+    ('Game', 'draw_infer_menu', 'draw.infer_menu'),
+    ('Game', 'draw_use_fuzzy_menu', 'draw.use_fuzzy_menu'),
+    ('Game', 'draw_interval_menu', 'draw.interval_menu'),
+    ('Game', 'draw_result', 'draw.result'),
+    ('DirtyRenderer', 'render', 'draw.render'),
+]
+
+class Stat:
+    __slots__ = ('count', 'total_ns', 'max_ns', 'hist')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.hist = [0] * N_BUCKETS
+
+    def add(self, dt):
+        self.count += 1
+        self.total_ns += dt
+        if dt > self.max_ns:
+            self.max_ns = dt
+        self.hist[min(N_BUCKETS - 1, (dt >> 10).bit_length())] += 1
+
+    def percentile_us(self, q):
+        # estimasi dari histogram: batas atas bucket tempat persentil jatuh
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        seen = 0
+        for k, c in enumerate(self.hist):
+            seen += c
+            if seen >= target:
+                return min((1 << k) * 1.024, self.max_ns / 1000.0)
+        return self.max_ns / 1000.0
+
+stats = {}
+# ruleset -> {'evals': n, 'fired': [..], 'strength': [..]}; ruleset: with_mana / no_mana / *_batch
+rules = {}
+_patched = []    # (owner, attr, fungsi asli)
+
+def enabled():
+    return bool(_patched)
+
+def _stat(name):
+    st = stats.get(name)
+    if st is None:
+        st = stats[name] = Stat()
+    return st
+
+def _timed(name, fn):
+    st = _stat(name)
+    clock = time.perf_counter_ns
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            st.add(clock() - t0)
+    return wrapper
+
+def _rule_entry(ruleset, specs):
+    entry = rules.get(ruleset)
+    if entry is None:
+        entry = rules[ruleset] = {'specs': specs, 'evals': 0, 'fired': [0] * len(specs),
+                                  'strength': [0.0] * len(specs)}
+    return entry
+
+def _count_rules(ruleset, specs, deg):
+    # firing = min derajat kondisi, sama seperti loop di sugeno_*/tsukamoto_*
+    if deg is None:
+        return
+    entry = _rule_entry(ruleset, specs)
+    entry['evals'] += 1
+    for i, (conds, out) in enumerate(specs):
+        vals = [deg.get(c, 0.0) for c in conds]
+        firing = min(vals) if vals else 0.0
+        if firing > 0:
+            entry['fired'][i] += 1
+            entry['strength'][i] += float(firing)
+
+def _degrees_hook(ruleset, specs_name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        deg = fn(*args, **kwargs)
+        _count_rules(ruleset, getattr(fuzzy, specs_name), deg)
+        return deg
+    return wrapper
+
+def _firing_batch_hook(fn):
+    @functools.wraps(fn)
+    def wrapper(deg, specs, n, labels=None):
+        firings = fn(deg, specs, n, labels)
+        # hanya rule base game; specs lain (mis. ablation sensitivity.py) tidak dihitung
+        if specs is fuzzy.rule_specs:
+            ruleset = 'with_mana'
+        elif specs is fuzzy.rule_specs_z:
+            ruleset = 'no_mana'
+        else:
+            return firings
+        entry = _rule_entry(ruleset + ('_batch_mamdani' if labels else '_batch'), specs)
+        entry['evals'] += n
+        for i, (f, out) in enumerate(firings):
+            fired = f > 0
+            entry['fired'][i] += int(fired.sum())
+            entry['strength'][i] += float(f[fired].sum())
+        return firings
+    return wrapper
+
+def _patch(owner, attr, wrapper):
+    _patched.append((owner, attr, getattr(owner, attr)))
+    setattr(owner, attr, wrapper)
+
+def enable(game_module=None):
+    """
+    Pasang wrapper. game_module: modul yang berisi Game/DirtyRenderer (mis. main, atau
+    sys.modules['__main__'] saat main.py dijalankan langsung); None -> hanya fuzzy.
+    """
+    if _patched:
+        return
+    for attr, name in FUZZY_TARGETS:
+        if hasattr(fuzzy, attr):
+            _patch(fuzzy, attr, _timed(name, getattr(fuzzy, attr)))
+    # hitung firing rule di luar timer supaya latency _compute_degrees_* tidak ikut overhead-nya
+    if getattr(fuzzy, 'SKFUZZY', False):
+        _patch(fuzzy, '_compute_degrees_with_mana',
+               _degrees_hook('with_mana', 'rule_specs', fuzzy._compute_degrees_with_mana))
+        _patch(fuzzy, '_compute_degrees_no_mana',
+               _degrees_hook('no_mana', 'rule_specs_z', fuzzy._compute_degrees_no_mana))
+        _patch(fuzzy, '_firing_batch', _firing_batch_hook(fuzzy._firing_batch))
+    if game_module is not None:
+        for cls_name, attr, name in GAME_TARGETS:
+            cls = getattr(game_module, cls_name, None)
+            if cls is not None and attr in cls.__dict__:
+                _patch(cls, attr, _timed(name, cls.__dict__[attr]))
+
+def disable():
+    # kembalikan fungsi asli (urutan terbalik supaya wrapper bertumpuk terurai benar)
+    while _patched:
+        owner, attr, orig = _patched.pop()
+        setattr(owner, attr, orig)
+
+def reset():
+    for st in stats.values():
+        st.__init__()
+    rules.clear()
+
+def snapshot():
+    """dict nama -> ringkasan timing (us); hanya stat yang pernah dipanggil."""
+    out = {}
+    for name, st in sorted(stats.items()):
+        if not st.count:
+            continue
+        out[name] = {
+            'count': st.count,
+            'total_ms': st.total_ns / 1e6,
+            'mean_us': st.total_ns / st.count / 1000.0,
+            'p50_us': st.percentile_us(50),
+            'p99_us': st.percentile_us(99),
+            'max_us': st.max_ns / 1000.0,
+            'hist': list(st.hist),
+        }
+    return out
+
+def rule_label(conds, out):
+    return ' & '.join(conds) + ' -> ' + out
+
+def rule_stats():
+    """dict ruleset -> list per rule: label, fired, fire_rate, mean_strength."""
+    out = {}
+    for ruleset, entry in sorted(rules.items()):
+        rows = []
+        for i, (conds, res) in enumerate(entry['specs']):
+            fired = entry['fired'][i]
+            rows.append({
+                'rule': i,
+                'label': rule_label(conds, res),
+                'fired': fired,
+                'fire_rate': fired / entry['evals'] if entry['evals'] else 0.0,
+                'mean_strength': entry['strength'][i] / fired if fired else 0.0,
+            })
+        out[ruleset] = {'evals': entry['evals'], 'rules': rows}
+    return out
+
+def dump_json(path):
+    with open(path, 'w') as f:
+        json.dump({'timings': snapshot(), 'rules': rule_stats(), 'bucket_us': 1.024}, f, indent=2)
+
+def dump_csv(path_prefix):
+    # dua file: <prefix>_timings.csv dan <prefix>_rules.csv
+    with open(path_prefix + '_timings.csv', 'w', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(['name', 'count', 'total_ms', 'mean_us', 'p50_us', 'p99_us', 'max_us'])
+        for name, s in snapshot().items():
+            w.writerow([name, s['count'], s['total_ms'], s['mean_us'], s['p50_us'], s['p99_us'], s['max_us']])
+    with open(path_prefix + '_rules.csv', 'w', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(['ruleset', 'evals', 'rule', 'label', 'fired', 'fire_rate', 'mean_strength'])
+        for ruleset, entry in rule_stats().items():
+            for r in entry['rules']:
+                w.writerow([ruleset, entry['evals'], r['rule'], r['label'], r['fired'], r['fire_rate'], r['mean_strength']])
@@ -1,13 +1,24 @@
 import pygame
+import numpy as np
+import argparse
+import os
 import sys
+import json
+import math
+import time
 import fuzzy
-from collections import deque
+import turnlog
+import instrument
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 
 # ---------- Konfigurasi ----------
 GRID_W, GRID_H = 8, 6
 TILE = 80
 WIDTH, HEIGHT = GRID_W * TILE, GRID_H * TILE + 120   # beri ruang hasil menu
 FPS = 60
+# idle mode: loop tidur di pygame.event.wait sampai ada input atau frame animasi berikutnya
+IDLE_WAIT = True
 
 MOVE_RANGE = 1
 PLAYER_MAX_HP = 20
@@ -20,6 +31,56 @@ RANGED_COST = 20
 
 ENEMY_MAX_HP = 20
 ENEMY_ATK = 1
+# statistik awal per tipe musuh: (HP maks, atk, mana, range)
+ENEMY_STATS = {
+    'Zombie': (20, 3, 0, 1),
+    'Skeleton': (10, 1, 0, 3),    # damage varies by distance (handled in enemy_action)
+    'Enderman': (15, 4, 80, 3),
+    'Boss': (30, 4, 100, 2),
+}
+
+# Wave stage: komposisi musuh per wave (nama stage -> {etype: jumlah})
+# unit yang tidak muat di papan masuk antrian dan muncul sebagai bala bantuan
+WAVES = {
+    'Wave': {'Zombie': 20, 'Skeleton': 15, 'Enderman': 10, 'Boss': 5},
+}
+WAVE_SPAWN_MIN_DIST = 3     # jarak minimal spawn dari player
+AI_FRAME_BUDGET_MS = 1000.0 / 60
+# inference musuh dijalankan di thread worker; loop render tetap jalan selama AI "berpikir"
+AI_ASYNC = True
+AI_TIMEOUT_S = 2.0          # lewat dari ini: pakai skor fallback heuristik
+AI_DONE_EVENT = pygame.USEREVENT + 1
+THINK_DOT_TICKS = 15        # indikator "berpikir" berganti tiap 15 tick
+# rekam tiap keputusan musuh ke log biner (lihat turnlog.py); None -> tidak merekam
+TURN_LOG_DIR = None
+# interval membership per tipe musuh untuk inference di game (etype -> dict intervals, lihat
+# fuzzy.get_membership_*); kosong -> membership default. Diisi apply_ai_params / --ai-params
+AI_INTERVALS = {}
+AI_PARAMS_VERSION = 0       # naik tiap parameter AI berubah (ai_params_changed); turn log menulis ulang jika beda
+# tipe yang jalur non-fuzzy-nya (use_fuzzy False) tidak pernah membaca skor -> tidak perlu inference
+NON_FUZZY_TYPES = ('Zombie', 'Skeleton', 'Enderman')
+# layar interval (INPUT_INTERVAL): heatmap skor HEAT_N x HEAT_N titik di HP 0..100, input lain tetap
+HEAT_N = 51
+HEAT_FIXED = {'mana_p': 0, 'mana_b': 50, 'cd': 5}
+HEAT_METHODS = ('mamdani', 'sugeno', 'tsukamoto')
+HEAT_PX = 300
+SLIDER_X, SLIDER_W, SLIDER_ROW_H = 440, 180, 28
+# instrumentasi hot path (lihat instrument.py); F4 menulis hasil ke INSTRUMENT_OUT_*.{json,csv}
+INSTRUMENT = False
+INSTRUMENT_OUT = os.path.join("experiments_out", "instrument")
+# overlay performa (F3): jendela frame untuk persentil & interval refresh teks overlay
+FRAME_WINDOW = 240
+DEBUG_REFRESH_S = 0.25
+# battle bawaan untuk --script tanpa file (lihat ScriptedInput): Boss + Mamdani, lalu Wave + Sugeno.
+# Pilihan menu utama tidak di-reset oleh R, jadi langkah kedua relatif terhadap Boss.
+DEFAULT_SCRIPT = [
+    'down', 'down', 'down', 'return', 'return', 'return',
+    {'repeat': 40, 'steps': ['e', {'wait': 6}]},
+    'r',
+    'down', 'return', 'return', 'down', 'return',
+    {'repeat': 10, 'steps': ['e', {'wait': 6}]},
+    'r',
+]
 
 # vertical offset untuk sprite zombie
 ZOMBIE_Y_OFFSET = 27
@@ -29,6 +90,24 @@ SKELETON_Y_OFFSET = 27
 ENDERMAN_Y_OFFSET = 22
 ENDERMAN_X_OFFSET = 20
 BOSS_Y_OFFSET = 1
+# offset gambar sprite relatif ke pusat tile, per tipe musuh
+SPRITE_OFFSETS = {
+    'Zombie': (0, -ZOMBIE_Y_OFFSET),
+    'Skeleton': (0, -SKELETON_Y_OFFSET),
+    'Enderman': (ENDERMAN_X_OFFSET, -ENDERMAN_Y_OFFSET),
+    'Boss': (0, -BOSS_Y_OFFSET),
+}
+
+# sprite-sheet musuh: etype -> (path, jumlah frame horizontal, ukuran target, anim speed)
+ENEMY_SPRITES = {
+    'Zombie':   ("assets/zombie/Idle.png", 6, (TILE+30, TILE+30), 8),
+    'Skeleton': ("assets/skeleton/Idle.png", 7, (TILE+30, TILE+30), 8),
+    'Enderman': ("assets/enderman/Idle.png", 14, (TILE+30, TILE+30), 6),
+    'Boss':     ("assets/boss/Idle.png", 8, (TILE+100, TILE+100), 7),
+}
+# cache atlas frame yang sudah di-scale (dibuat ulang jika mtime/size sumber berubah)
+ASSET_CACHE_DIR = ".asset_cache"
+ATLAS_VERSION = 1
 
 # Warna
 WHITE = (255,255,255)
@@ -41,6 +120,11 @@ BLUE = (60,120,200)
 YELLOW = (230,200,60)
 PURPLE = (160, 80, 200)
 LIGHT_BLUE = (140, 200, 255)
+# warna kotak pengganti jika sprite musuh tidak tersedia
+ENEMY_COLORS = {'Zombie': GREEN, 'Skeleton': WHITE, 'Enderman': PURPLE, 'Boss': LIGHT_BLUE}
+# warna heatmap skor 0..100 di layar interval: biru (lemah) -> kuning -> merah (kuat)
+HEAT_LUT = np.stack([np.interp(np.arange(101), [0, 50, 100], [c0, c1, c2])
+                     for c0, c1, c2 in zip(BLUE, YELLOW, RED)], axis=1).astype(np.uint8)
 
 # ---------- Helper functions ----------
 def in_bounds(x,y):
@@ -88,6 +172,15 @@ def scale_preserve(surface, target_size):
     out.blit(scaled, (x, y))
     return out
 
+# helper: outline rect dari 4 strip fill. pygame.draw.rect(width>1) menggambar berbeda
+# saat surface di-clip, sedangkan DirtyRenderer menggambar ulang op secara ter-clip
+def draw_outline(surface, color, rect, width):
+    r = pygame.Rect(rect)
+    surface.fill(color, (r.x, r.y, r.w, width))
+    surface.fill(color, (r.x, r.bottom - width, r.w, width))
+    surface.fill(color, (r.x, r.y, width, r.h))
+    surface.fill(color, (r.right - width, r.y, width, r.h))
+
 # ---------- Unit & AnimatedSprite (unchanged) ----------
 class Unit:
     def __init__(self, x, y, hp, atk, team, mana=0, mana_regen=0):
@@ -111,11 +204,14 @@ class Unit:
             self.alive = False
 
 class AnimatedSprite:
-    def __init__(self, image_files, size):
-        self.frames = []
-        for img_path in image_files:
-            img = pygame.image.load(img_path).convert_alpha()
-            self.frames.append(scale_preserve(img, size))
+    def __init__(self, image_files, size, atlas=None):
+        if atlas is not None:
+            self.frames = atlas.load('player_idle', image_files, len(image_files), size)
+        else:
+            self.frames = []
+            for img_path in image_files:
+                img = pygame.image.load(img_path).convert_alpha()
+                self.frames.append(scale_preserve(img, size))
         self.index = 0
         self.timer = 0
         self.speed = 8
@@ -129,6 +225,520 @@ class AnimatedSprite:
     def get_frame(self):
         return self.frames[self.index]
 
+# ---------- Animation manager: satu array untuk semua sprite aktif ----------
+class AnimationManager:
+    """
+    Clip (frames + speed) didaftarkan per nama; tiap sprite aktif punya satu slot.
+    Index frame, timer, speed dan jumlah frame semua slot disimpan di array numpy
+    sehingga advance() memajukan semuanya dalam satu pass, berapapun jumlah unit.
+    Satu tick sama dengan AnimatedSprite.update(): timer+1, ganti frame saat timer >= speed.
+    """
+    def __init__(self, capacity=16):
+        self.clip_names = []
+        self.clip_frames = []
+        self.clip_speed = []
+        self.slot_clip = np.zeros(capacity, dtype=np.int32)
+        self.index = np.zeros(capacity, dtype=np.int32)
+        self.timer = np.zeros(capacity, dtype=np.int32)
+        self.speed = np.ones(capacity, dtype=np.int32)
+        self.n_frames = np.ones(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def set_clip(self, name, frames, speed):
+        # daftar/ganti frame clip (mis. saat sprite-sheet dimuat atau dilepas)
+        if name in self.clip_names:
+            cid = self.clip_names.index(name)
+            self.clip_frames[cid] = frames
+            self.clip_speed[cid] = speed
+        else:
+            cid = len(self.clip_names)
+            self.clip_names.append(name)
+            self.clip_frames.append(frames)
+            self.clip_speed.append(speed)
+        slots = self.slot_clip == cid
+        self.n_frames[slots] = max(1, len(frames))
+        self.speed[slots] = speed
+        self.index[slots] %= max(1, len(frames))
+        return cid
+
+    def _grow(self):
+        old = len(self.active)
+        for name in ('slot_clip', 'index', 'timer', 'speed', 'n_frames', 'active'):
+            arr = getattr(self, name)
+            grown = np.zeros(old * 2, dtype=arr.dtype)
+            grown[:old] = arr
+            setattr(self, name, grown)
+        self.speed[old:] = 1
+        self.n_frames[old:] = 1
+        self.free.extend(range(old * 2 - 1, old - 1, -1))
+
+    def add(self, name):
+        if name not in self.clip_names:
+            self.set_clip(name, [], 8)
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        cid = self.clip_names.index(name)
+        self.slot_clip[slot] = cid
+        self.index[slot] = 0
+        self.timer[slot] = 0
+        self.speed[slot] = self.clip_speed[cid]
+        self.n_frames[slot] = max(1, len(self.clip_frames[cid]))
+        self.active[slot] = True
+        return slot
+
+    def remove(self, slot):
+        if slot is not None and self.active[slot]:
+            self.active[slot] = False
+            self.free.append(slot)
+
+    def clear(self):
+        self.active[:] = False
+        self.free = list(range(len(self.active) - 1, -1, -1))
+
+    def advance(self, ticks=1):
+        # setara dengan memanggil update() sebanyak ticks kali untuk setiap slot aktif
+        if ticks <= 0:
+            return
+        a = self.active
+        total = self.timer[a] + ticks
+        steps = total // self.speed[a]
+        self.timer[a] = total % self.speed[a]
+        self.index[a] = (self.index[a] + steps) % self.n_frames[a]
+
+    def ticks_until_next(self):
+        # None jika tidak ada slot aktif yang punya lebih dari satu frame
+        a = self.active & (self.n_frames > 1)
+        if not a.any():
+            return None
+        return int((self.speed[a] - self.timer[a]).min())
+
+    def frame(self, slot):
+        if slot is None:
+            return None
+        frames = self.clip_frames[self.slot_clip[slot]]
+        return frames[self.index[slot]] if frames else None
+
+# helper: gambar daftar draw op; op blit (surface, rect) berurutan dikirim dalam satu Surface.blits
+def draw_ops(surface, ops):
+    batch = []
+    for key, rect, sig, draw in ops:
+        if isinstance(draw, tuple):
+            batch.append(draw)
+            continue
+        if batch:
+            surface.blits(batch, doreturn=False)
+            batch = []
+        draw(surface)
+    if batch:
+        surface.blits(batch, doreturn=False)
+
+# ---------- Sprite atlas: frame pre-scaled, di-cache di disk ----------
+class SpriteAtlas:
+    """
+    Frame yang sudah di-scale_preserve dipak berjajar ke satu surface atlas,
+    disimpan sebagai PNG + JSON meta di ASSET_CACHE_DIR. Meta berisi mtime &
+    ukuran file sumber serta parameter slicing; jika cocok, atlas dimuat
+    langsung tanpa slicing/scaling ulang. Frame dikembalikan sebagai
+    subsurface dari atlas (satu blok pixel per tipe sprite).
+    """
+    def __init__(self, cache_dir=ASSET_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.builds = 0
+        self.cache_loads = 0
+
+    def _meta(self, sources, n_frames, size):
+        files = []
+        for path in sources:
+            st = os.stat(path)
+            files.append([path, st.st_mtime_ns, st.st_size])
+        return {'version': ATLAS_VERSION, 'sources': files, 'n_frames': n_frames, 'size': list(size)}
+
+    def _build(self, sources, n_frames, size):
+        # satu sumber -> sprite-sheet horizontal; banyak sumber -> satu file per frame
+        if len(sources) == 1:
+            sheet = pygame.image.load(sources[0]).convert_alpha()
+            fw, fh = sheet.get_width() // n_frames, sheet.get_height()
+            frames = [sheet.subsurface((i*fw, 0, fw, fh)) for i in range(n_frames)]
+        else:
+            frames = [pygame.image.load(path).convert_alpha() for path in sources]
+        atlas = pygame.Surface((size[0] * len(frames), size[1]), pygame.SRCALPHA)
+        for i, frame in enumerate(frames):
+            atlas.blit(scale_preserve(frame, size), (i * size[0], 0))
+        return atlas
+
+    def load(self, name, sources, n_frames, size):
+        meta = self._meta(sources, n_frames, size)
+        png_path = os.path.join(self.cache_dir, name + '.png')
+        meta_path = os.path.join(self.cache_dir, name + '.json')
+        atlas = None
+        try:
+            with open(meta_path) as f:
+                if json.load(f) == meta:
+                    atlas = pygame.image.load(png_path).convert_alpha()
+                    self.cache_loads += 1
+        except (OSError, ValueError, pygame.error):
+            atlas = None
+        if atlas is None:
+            atlas = self._build(sources, n_frames, size)
+            self.builds += 1
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                pygame.image.save(atlas, png_path)
+                with open(meta_path, 'w') as f:
+                    json.dump(meta, f)
+            except (OSError, pygame.error):
+                pass   # cache disk opsional; atlas di memori tetap dipakai
+        w, h = size
+        return [atlas.subsurface((i*w, 0, w, h)) for i in range(atlas.get_width() // w)]
+
+# ---------- Cache surface teks (HUD & menu) ----------
+class TextCache:
+    """
+    Cache LRU untuk hasil font.render, key (font, text, color, antialias).
+    Teks HUD/menu jarang berubah antar frame, jadi render ulang hanya saat
+    teksnya baru. renders/hits dipakai oleh debug overlay.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.renders = 0
+        self.hits = 0
+        self.evictions = 0
+        self.frame_renders = 0
+        self.last_frame_renders = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surf
+        surf = font.render(text, antialias, color)
+        self.renders += 1
+        self.frame_renders += 1
+        self.entries[key] = surf
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def new_frame(self):
+        self.last_frame_renders = self.frame_renders
+        self.frame_renders = 0
+
+# ---------- Dirty-rectangle renderer untuk state IN_GAME ----------
+class DirtyRenderer:
+    """
+    Papan statis (background + grid) di-render sekali ke surface terpisah.
+    Tiap frame, draw op yang sig/rect-nya berubah (gerak unit, frame animasi,
+    HP bar, panel pesan) ditandai dirty; hanya area itu yang digambar ulang
+    lalu dikirim lewat display.update(rects).
+    """
+    def __init__(self, screen, draw_background):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(DARK)
+        draw_background(self.background)
+        self.prev = {}
+        self.full_redraw = True
+
+    def invalidate(self):
+        # dipanggil saat keluar dari IN_GAME (menu menimpa seluruh layar)
+        self.full_redraw = True
+
+    def _merge(self, rects):
+        bounds = self.screen.get_rect()
+        merged = []
+        for r in rects:
+            r = r.clip(bounds)
+            if r.width <= 0 or r.height <= 0:
+                continue
+            i = r.collidelist(merged)
+            while i != -1:
+                r.union_ip(merged.pop(i))
+                i = r.collidelist(merged)
+            merged.append(r)
+        return merged
+
+    def render(self, ops):
+        current = {}
+        for key, rect, sig, draw in ops:
+            current[key] = (tuple(rect), sig)
+        if self.full_redraw:
+            dirty = [self.screen.get_rect()]
+            self.full_redraw = False
+        else:
+            dirty = []
+            for key, state in current.items():
+                old = self.prev.get(key)
+                if old != state:
+                    dirty.append(pygame.Rect(state[0]))
+                    if old is not None:
+                        dirty.append(pygame.Rect(old[0]))
+            for key, old in self.prev.items():
+                if key not in current:
+                    dirty.append(pygame.Rect(old[0]))
+        self.prev = current
+        dirty = self._merge(dirty)
+        for area in dirty:
+            # clip supaya sprite beralpha tidak di-blend dua kali di luar area dirty
+            self.screen.set_clip(area)
+            self.screen.blit(self.background, area, area)
+            draw_ops(self.screen, [op for op in ops if area.colliderect(op[1])])
+        self.screen.set_clip(None)
+        return dirty
+
+# ---------- Enemy AI (snapshot -> skor, aman dijalankan di thread lain) ----------
+def score_snapshot(snapshot):
+    # snapshot: {'player_hp': int, 'units': [(etype, hp, mana), ...]}
+    # hasil: list dict skor {'mamdani','sugeno','tsukamoto'} sejajar dengan snapshot['units'].
+    # Hanya memakai get_all_scores_batch (tidak menyentuh ControlSystemSimulation global),
+    # jadi tidak bentrok dengan get_all_scores di thread render.
+    units = snapshot['units']
+    results = [None] * len(units)
+    by_type = {}
+    for i, (etype, hp, mana) in enumerate(units):
+        by_type.setdefault(etype, []).append(i)
+    for etype, idx in by_type.items():
+        batch = fuzzy.get_all_scores_batch(etype, snapshot['player_hp'], [units[i][1] for i in idx],
+                                           0, [units[i][2] for i in idx], 5, intervals=AI_INTERVALS.get(etype))
+        for j, i in enumerate(idx):
+            results[i] = {meth: float(vals[j]) for meth, vals in batch.items()}
+    return results
+
+def fallback_snapshot_scores(snapshot):
+    # dipakai jika worker timeout/gagal: heuristik non-fuzzy yang sama dengan experiments.py
+    hp_p = snapshot['player_hp']
+    results = []
+    for etype, hp, mana in snapshot['units']:
+        if etype in ('Zombie','Skeleton'):
+            fb = float(fuzzy.fallback_score_no_mana(hp_p, hp, 5))
+        else:
+            fb = float(fuzzy.fallback_score_with_mana(hp_p, hp, 0, mana, 5))
+        results.append({'mamdani': fb, 'sugeno': fb, 'tsukamoto': fb})
+    return results
+
+def snapshot_backend(snapshot, method):
+    # backend yang benar-benar menghasilkan skor `method` lewat score_snapshot (overlay F3)
+    if not fuzzy.SKFUZZY:
+        return 'heuristic'
+    if method != 'mamdani':
+        return 'numpy batch'
+    # get_all_scores_batch: Mamdani dengan interval kustom dijawab Sugeno
+    custom = sorted({etype for etype, _, _ in snapshot['units'] if AI_INTERVALS.get(etype)})
+    if not custom:
+        return 'numpy batch'
+    if len(custom) == len({etype for etype, _, _ in snapshot['units']}):
+        return 'sugeno (interval kustom)'
+    return 'numpy batch + sugeno ' + '/'.join(custom)
+
+def ai_params_changed():
+    # panggil setelah mengubah AI_INTERVALS / fuzzy.HEAL_THRESHOLDS / fuzzy.BEHAVIOR_CUTS
+    global AI_PARAMS_VERSION
+    AI_PARAMS_VERSION += 1
+
+def apply_ai_params(params):
+    # params: etype -> {'intervals': dict, 'heal': [hp maks, mana min], 'cuts': [weak, strong]}
+    # (format best.json dari selfplay.py); key yang tidak ada dibiarkan
+    for etype, p in params.items():
+        if p.get('intervals'):
+            AI_INTERVALS[etype] = p['intervals']
+        if 'heal' in p:
+            fuzzy.HEAL_THRESHOLDS[etype] = tuple(p['heal'])
+        if 'cuts' in p:
+            fuzzy.BEHAVIOR_CUTS[etype] = tuple(p['cuts'])
+    ai_params_changed()
+
+def ai_params_snapshot():
+    # parameter AI yang sedang aktif, format sama dengan apply_ai_params (dicatat turn log)
+    params = {}
+    for etype in ENEMY_SPRITES:
+        p = {'cuts': list(fuzzy.BEHAVIOR_CUTS.get(etype, (40, 70)))}
+        if etype in fuzzy.HEAL_THRESHOLDS:
+            p['heal'] = list(fuzzy.HEAL_THRESHOLDS[etype])
+        if AI_INTERVALS.get(etype):
+            p['intervals'] = AI_INTERVALS[etype]
+        params[etype] = p
+    return params
+
+class IntervalEditor:
+    """
+    Model layar INPUT_INTERVAL: interval membership satu tipe musuh + heatmap skor ketiga metode
+    di grid (HP_Bot baris, HP_Player kolom), input lain tetap (HEAT_FIXED).
+    Saat satu set membership berubah, hanya baris/kolom yang derajat membership-nya berubah
+    yang dihitung ulang (satu get_all_scores_batch); set mana/cd menghitung ulang semua sel
+    hanya jika derajat di nilai tetapnya berubah.
+    """
+    def __init__(self, etype, intervals=None):
+        self.axis = np.linspace(0.0, 100.0, HEAT_N)
+        self.version = 0
+        self.set_etype(etype, intervals)
+
+    def set_etype(self, etype, intervals=None):
+        self.etype = etype
+        self.no_mana = etype in ('Zombie', 'Skeleton')
+        self.defaults = fuzzy.DEFAULT_INTERVALS_NO_MANA if self.no_mana else fuzzy.DEFAULT_INTERVALS_WITH_MANA
+        self.intervals = {k: list((intervals or {}).get(k, v)) for k, v in self.defaults.items()}
+        self.keys = list(self.defaults)
+        self.sel = 0
+        self.point = 0
+        self.scores = np.zeros((len(HEAT_METHODS), HEAT_N, HEAT_N))
+        self.update_all()
+
+    def current(self):
+        # None jika sama dengan default: sama seperti game (AI_INTERVALS kosong -> Mamdani skfuzzy)
+        if all(self.intervals[k] == list(v) for k, v in self.defaults.items()):
+            return None
+        return {k: list(v) for k, v in self.intervals.items()}
+
+    def bounds(self, key):
+        universe = fuzzy.universe_for(key)
+        return float(universe[0]), float(universe[-1])
+
+    def _recompute(self, rows, cols):
+        # rows, cols: index sel (HP_Bot, HP_Player) yang dihitung ulang
+        t0 = time.perf_counter()
+        if len(rows):
+            batch = fuzzy.get_all_scores_batch(self.etype, self.axis[cols], self.axis[rows],
+                                               HEAT_FIXED['mana_p'], HEAT_FIXED['mana_b'], HEAT_FIXED['cd'],
+                                               intervals=self.current())
+            for i, meth in enumerate(HEAT_METHODS):
+                self.scores[i, rows, cols] = batch[meth]
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        self.last_cells = len(rows)
+        self.version += 1
+
+    def update_all(self):
+        rows, cols = np.nonzero(np.ones((HEAT_N, HEAT_N), dtype=bool))
+        self._recompute(rows, cols)
+
+    def _degree(self, key, params, vals):
+        mf = fuzzy._membership(key, params)
+        return np.interp(vals, fuzzy.universe_for(key), mf, left=0.0, right=0.0)
+
+    def set_params(self, key, params):
+        """Ganti interval satu set membership lalu hitung ulang sel yang terpengaruh saja."""
+        old = self.intervals[key]
+        if list(params) == old:
+            return
+        was_default = self.current() is None
+        self.intervals[key] = list(params)
+        if was_default != (self.current() is None):
+            # Mamdani skfuzzy <-> Sugeno (lihat get_all_scores_batch): semua sel berubah
+            self.update_all()
+            return
+        if key.startswith('hp'):
+            changed = self._degree(key, old, self.axis) != self._degree(key, params, self.axis)
+            none = np.zeros(HEAT_N, dtype=bool)
+            if self.no_mana:
+                row_mask = col_mask = changed        # hp_l/hp_m/hp_h dipakai kedua sumbu
+            elif key.startswith('hp_b'):
+                row_mask, col_mask = changed, none
+            else:
+                row_mask, col_mask = none, changed
+            self._recompute(*np.nonzero(row_mask[:, None] | col_mask[None, :]))
+            return
+        fixed = HEAT_FIXED['cd'] if key.startswith('cd') else HEAT_FIXED[key.rsplit('_', 1)[0]]
+        if self._degree(key, old, fixed) != self._degree(key, params, fixed):
+            self.update_all()
+        else:
+            self._recompute(np.zeros(0, dtype=int), np.zeros(0, dtype=int))
+
+    def set_value(self, key, point, value):
+        # titik di-clamp ke tetangganya & universe supaya interval tetap terurut
+        params = list(self.intervals[key])
+        lo, hi = self.bounds(key)
+        if point > 0:
+            lo = params[point - 1]
+        if point < len(params) - 1:
+            hi = params[point + 1]
+        params[point] = int(round(min(hi, max(lo, value))))
+        self.set_params(key, params)
+
+    def nudge(self, delta):
+        key = self.keys[self.sel]
+        self.set_value(key, self.point, self.intervals[key][self.point] + delta)
+
+    def reset_selected(self):
+        key = self.keys[self.sel]
+        self.set_params(key, self.defaults[key])
+
+class AIWorker:
+    """
+    Satu thread worker untuk inference musuh. submit() mengembalikan Future;
+    saat selesai, AI_DONE_EVENT di-post supaya loop idle langsung bangun.
+    """
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='enemy-ai')
+
+    def _run(self, snapshot):
+        t0 = time.perf_counter()
+        scores = score_snapshot(snapshot)
+        return scores, (time.perf_counter() - t0) * 1000.0
+
+    def _notify(self, future):
+        try:
+            pygame.event.post(pygame.event.Event(AI_DONE_EVENT))
+        except pygame.error:
+            pass   # display sudah ditutup
+
+    def submit(self, snapshot):
+        future = self.pool.submit(self._run, snapshot)
+        future.add_done_callback(self._notify)
+        return future
+
+    def abandon(self, future):
+        # future.cancel() tidak menghentikan job yang sudah jalan; supaya giliran berikutnya tidak
+        # antri di belakang job macet, thread lama dilepas (selesai sendiri) dan dibuat pool baru
+        if future.cancel() or future.done():
+            return
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='enemy-ai')
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class ScriptedInput:
+    """
+    Input terjadwal supaya satu battle bisa dijalankan ulang tanpa keyboard (profiling, perbandingan).
+    steps: nama tombol pygame ('down', 'return', 'e', ...), {'wait': n} (n frame tanpa input)
+    atau {'repeat': n, 'steps': [...]}. Satu tombol = satu frame.
+    """
+    def __init__(self, steps):
+        self.frames = []   # per frame: key code atau None
+        self._expand(steps)
+        self.pos = 0
+
+    def _expand(self, steps):
+        for step in steps:
+            if isinstance(step, str):
+                self.frames.append(pygame.key.key_code(step))
+            elif 'wait' in step:
+                self.frames.extend([None] * int(step['wait']))
+            elif 'repeat' in step:
+                for _ in range(int(step['repeat'])):
+                    self._expand(step['steps'])
+            else:
+                raise ValueError(f'langkah script tidak dikenal: {step!r}')
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def done(self):
+        return self.pos >= len(self.frames)
+
+    def next_events(self):
+        key = self.frames[self.pos]
+        self.pos += 1
+        if key is None:
+            return []
+        return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0)]
+
 # ---------- Game class with Menu ----------
 class Game:
     def __init__(self):
@@ -138,95 +748,41 @@ class Game:
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont(None, 22)
         self.bigfont = pygame.font.SysFont(None, 28)
+        self.renderer = DirtyRenderer(self.screen, self.draw_grid)
+        self.text_cache = TextCache()
+        self.show_debug = False   # F3: debug overlay
+        self.frame_times = deque(maxlen=FRAME_WINDOW)   # ms kerja per frame (tanpa waktu idle)
+        self.debug_cache = (0.0, None)                  # (waktu, lines) supaya overlay tidak berubah tiap frame
+        self.ai_worker = AIWorker() if AI_ASYNC else None
+        self.ai_pending = None    # (future, waktu submit, unit aktif, snapshot) selama AI berpikir
+        self.recorder = None
+        if TURN_LOG_DIR:
+            os.makedirs(TURN_LOG_DIR, exist_ok=True)
+            name = time.strftime('game_%Y%m%d_%H%M%S') + turnlog.LOG_EXT
+            self.recorder = turnlog.TurnRecorder(os.path.join(TURN_LOG_DIR, name), GRID_W, GRID_H)
+        self.turn_no = 0
+        if INSTRUMENT:
+            instrument.enable(sys.modules[type(self).__module__])
         idle_frames = [
             "assets/player/idle1.png","assets/player/idle2.png","assets/player/idle3.png",
             "assets/player/idle4.png","assets/player/idle5.png","assets/player/idle6.png",
             "assets/player/idle7.png","assets/player/idle8.png",
         ]
-        self.player_idle_anim = AnimatedSprite(idle_frames, (TILE+30, TILE+30))
+        self.atlas = SpriteAtlas()
+        self.player_idle_anim = AnimatedSprite(idle_frames, (TILE+30, TILE+30), atlas=self.atlas)
         self.player_mana = 100
 
-        # --- load zombie sprite-sheet (6 horizontal frames) ---
-        try:
-            sheet = pygame.image.load("assets/zombie/Idle.png").convert_alpha()
-            # known frames: 6 horizontal frames
-            n_frames = 6
-            frame_w = sheet.get_width() // n_frames
-            frame_h = sheet.get_height()
-            self.zombie_frames = []
-            for i in range(n_frames):
-                sub = sheet.subsurface((i*frame_w, 0, frame_w, frame_h))
-                # scale zombie frames preserving aspect ratio & center into target box
-                self.zombie_frames.append(scale_preserve(sub, (TILE+30, TILE+30)))
-            self.zombie_anim_index = 0
-            self.zombie_anim_timer = 0
-            self.zombie_anim_speed = 8   # lower -> faster
-        except Exception:
-            self.zombie_frames = []
-            self.zombie_anim_index = 0
-            self.zombie_anim_timer = 0
-            self.zombie_anim_speed = 8
-
-        # --- load skeleton sprite-sheet (assume 8 horizontal frames) ---
-        try:
-            skel_sheet = pygame.image.load("assets/skeleton/Idle.png").convert_alpha()
-            n_skel = 7
-            skel_fw = skel_sheet.get_width() // n_skel
-            skel_fh = skel_sheet.get_height()
-            self.skeleton_frames = []
-            for i in range(n_skel):
-                sub = skel_sheet.subsurface((i*skel_fw, 0, skel_fw, skel_fh))
-                self.skeleton_frames.append(scale_preserve(sub, (TILE+30, TILE+30)))
-            self.skeleton_anim_index = 0
-            self.skeleton_anim_timer = 0
-            self.skeleton_anim_speed = 8
-        except Exception:
-            self.skeleton_frames = []
-            self.skeleton_anim_index = 0
-            self.skeleton_anim_timer = 0
-            self.skeleton_anim_speed = 8
-
-        # --- load enderman sprite-sheet (14 horizontal frames) ---
-        try:
-            end_sheet = pygame.image.load("assets/enderman/Idle.png").convert_alpha()
-            n_end = 14
-            end_fw = end_sheet.get_width() // n_end
-            end_fh = end_sheet.get_height()
-            self.enderman_frames = []
-            for i in range(n_end):
-                sub = end_sheet.subsurface((i*end_fw, 0, end_fw, end_fh))
-                self.enderman_frames.append(scale_preserve(sub, (TILE+30, TILE+30)))
-            self.enderman_anim_index = 0
-            self.enderman_anim_timer = 0
-            self.enderman_anim_speed = 6
-        except Exception:
-            self.enderman_frames = []
-            self.enderman_anim_index = 0
-            self.enderman_anim_timer = 0
-            self.enderman_anim_speed = 6
-
-        # --- load boss sprite-sheet (8 horizontal frames) ---
-        try:
-            boss_sheet = pygame.image.load("assets/boss/Idle.png").convert_alpha()
-            n_boss = 8
-            boss_fw = boss_sheet.get_width() // n_boss
-            boss_fh = boss_sheet.get_height()
-            self.boss_frames = []
-            for i in range(n_boss):
-                sub = boss_sheet.subsurface((i*boss_fw, 0, boss_fw, boss_fh))
-                self.boss_frames.append(scale_preserve(sub, (TILE+100, TILE+100)))
-            self.boss_anim_index = 0
-            self.boss_anim_timer = 0
-            self.boss_anim_speed = 7
-        except Exception:
-            self.boss_frames = []
-            self.boss_anim_index = 0
-            self.boss_anim_timer = 0
-            self.boss_anim_speed = 7
+        # semua animasi (player + musuh) dimajukan oleh satu AnimationManager
+        self.anim = AnimationManager()
+        self.anim.set_clip('player', self.player_idle_anim.frames, self.player_idle_anim.speed)
+        # enemy sprite-sheet dimuat lazy per stage (lihat load_enemy_sprites)
+        for etype, (path, n_frames, size, speed) in ENEMY_SPRITES.items():
+            setattr(self, f'{etype.lower()}_frames', [])
+            self.anim.set_clip(etype, [], speed)   # speed: lower -> faster
 
         # Menu / selection state
         self.menu_state = 'MAIN'   # MAIN -> SELECT_INFERENCE -> IN_GAME -> RESULT
-        self.enemy_options = ['Zombie','Skeleton','Enderman','Boss']
+        self.enemy_options = ['Zombie','Skeleton','Enderman','Boss'] + list(WAVES)
         self.inference_options = ['mamdani','sugeno','tsukamoto']
         self.menu_sel_enemy = 0
         self.menu_sel_infer = 0
@@ -244,17 +800,28 @@ class Game:
     def reset(self, init_from_menu=False):
         # Basic units
         self.player = Unit(1, GRID_H//2, PLAYER_MAX_HP, PLAYER_ATK, 'PLAYER', mana=PLAYER_MANA, mana_regen=PLAYER_MANA_REGEN)
+        self.anim.clear()
+        self.player.anim = self.anim.add('player')
 
         # stages fixed but start stage will be set from menu selection
-        self.stages = ['Zombie', 'Skeleton', 'Enderman', 'Boss']
+        self.stages = ['Zombie', 'Skeleton', 'Enderman', 'Boss'] + list(WAVES)
         self.stage_index = 0
         self.max_stages = len(self.stages)
         self.victory = False
+        self.enemies = []
+        self.wave_queue = []
+        self.last_ai_ms = 0.0
+        self.last_action_ms = 0.0      # durasi enemy_action terakhir
+        self.last_ai_source = '-'      # sync / worker / fallback (timeout|gagal)
+        self.last_ai_backend = '-'     # numpy batch / sugeno (interval kustom) / heuristic (lihat snapshot_backend)
+        # hasil worker dari giliran sebelum reset diabaikan
+        if self.ai_pending is not None and self.ai_worker is not None:
+            self.ai_worker.abandon(self.ai_pending[0])
+        self.ai_pending = None
 
         if not init_from_menu:
             # spawn first enemy normally
             self.spawn_enemy(self.stage_index)
-            self.units = [self.player, self.enemy]
             self.turn = 'PLAYER'
             self.cursor = [0,0]
             self.mode = 'IDLE'
@@ -263,6 +830,7 @@ class Game:
             self.message = f'Starting Stage 1: {self.stages[0]}. Giliran PLAYER. Tekan M untuk move, A untuk attack, E untuk end turn.'
         else:
             # entering from menu, clear gameplay state but don't spawn until selected
+            self.load_enemy_sprites(set())
             self.units = [self.player]
             self.turn = 'PLAYER'
             self.cursor = [0,0]
@@ -270,38 +838,113 @@ class Game:
             self.move_targets = set()
             self.message = 'Menu: pilih lawan dan metode inference. Gunakan UP/DOWN, Enter untuk pilih.'
 
+    @classmethod
+    def headless(cls):
+        # Game tanpa display/asset: cukup untuk make_enemy + enemy_action (replay turnlog.py)
+        game = cls.__new__(cls)
+        game.anim = AnimationManager()
+        game.recorder = None
+        game.use_fuzzy = True
+        game.forced_inference = None
+        game.message = ''
+        game.units = []
+        return game
+
+    def make_enemy(self, etype, ex, ey):
+        ehp, eatk, emana, erange = ENEMY_STATS.get(etype, (ENEMY_MAX_HP, ENEMY_ATK, 50, 1))
+        enemy = Unit(ex, ey, ehp, eatk, 'ENEMY', mana=emana, mana_regen=5 if etype in ('Enderman','Boss') else 0)
+        enemy.etype = etype
+        enemy.anim = self.anim.add(etype)
+        enemy.max_hp = ehp
+        enemy.mana = emana
+        enemy.range = erange
+        # extra boss attributes
+        if etype == 'Boss':
+            enemy.ranged_atk = 2
+            enemy.heal_amount = 10
+            enemy.heal_cost = 50
+        # --- NEW: init heal cooldown so AI won't spam heal/teleport ---
+        enemy.heal_cooldown = 0
+        return enemy
+
+    def load_enemy_sprites(self, etypes):
+        # muat frame tipe yang dibutuhkan stage ini; lepas frame tipe lain agar memori turun
+        for etype, (path, n_frames, size, speed) in ENEMY_SPRITES.items():
+            name = etype.lower()
+            if etype not in etypes:
+                setattr(self, f'{name}_frames', [])
+                self.anim.set_clip(etype, [], speed)
+                continue
+            if getattr(self, f'{name}_frames', None):
+                continue
+            try:
+                frames = self.atlas.load(name, [path], n_frames, size)
+            except Exception:
+                frames = []
+            setattr(self, f'{name}_frames', frames)
+            self.anim.set_clip(etype, frames, speed)
+
     def spawn_enemy(self, index):
         etype = self.stages[index]
         self.enemy_type = etype
-        ex, ey = GRID_W-2, GRID_H//2
-        if etype == 'Zombie':
-            ehp, eatk, emana, erange = 20, 3, 0, 1
-        elif etype == 'Skeleton':
-            ehp, eatk, emana, erange = 10, 1, 0, 3  # damage varies by distance (handled in enemy_action)
-        elif etype == 'Enderman':
-            ehp, eatk, emana, erange = 15, 4, 80, 3
-        elif etype == 'Boss':
-            ehp, eatk, emana, erange = 30, 4, 100, 2
+        self.wave_queue = []
+        for old in getattr(self, 'enemies', []):
+            self.anim.remove(getattr(old, 'anim', None))
+        self.load_enemy_sprites(set(WAVES[etype]) if etype in WAVES else {etype})
+        if etype in WAVES:
+            # wave: isi antrian sesuai komposisi, lalu tempatkan sebanyak yang muat
+            for wtype, count in WAVES[etype].items():
+                self.wave_queue.extend([wtype] * count)
+            self.enemies = []
+            self.spawn_reinforcements()
+            self.enemy = self.enemies[0]
         else:
-            ehp, eatk, emana, erange = ENEMY_MAX_HP, ENEMY_ATK, 50, 1
-        self.enemy = Unit(ex, ey, ehp, eatk, 'ENEMY', mana=emana, mana_regen=5 if etype in ('Enderman','Boss') else 0)
-        self.enemy.max_hp = ehp
-        self.enemy.mana = emana
-        self.enemy.range = erange
-        # extra boss attributes
-        if etype == 'Boss':
-            self.enemy.ranged_atk = 2
-            self.enemy.heal_amount = 10
-            self.enemy.heal_cost = 50
-        # --- NEW: init heal cooldown so AI won't spam heal/teleport ---
-        self.enemy.heal_cooldown = 0
+            ex, ey = GRID_W-2, GRID_H//2
+            self.enemy = self.make_enemy(etype, ex, ey)
+            self.enemies = [self.enemy]
         if hasattr(self, 'player'):
-            self.units = [self.player, self.enemy]
+            self.units = [self.player] + self.enemies
         else:
-            self.units = [self.enemy]
+            self.units = list(self.enemies)
         self.turn = 'PLAYER'
         self.mode = 'IDLE'
 
+    def spawn_reinforcements(self, occupied=None):
+        # tempatkan unit dari wave_queue ke petak kosong terjauh dari player
+        if not self.wave_queue:
+            return
+        ppos = self.player.pos() if hasattr(self, 'player') else (0, GRID_H//2)
+        if occupied is None:
+            occupied = {ppos} | {e.pos() for e in self.alive_enemies()}
+        cells = [(x, y) for x in range(GRID_W) for y in range(GRID_H)
+                 if (x, y) not in occupied and manhattan((x, y), ppos) >= WAVE_SPAWN_MIN_DIST]
+        cells.sort(key=lambda c: (-manhattan(c, ppos), c[1], c[0]))
+        for cell in cells:
+            if not self.wave_queue:
+                break
+            self.enemies.append(self.make_enemy(self.wave_queue.pop(0), cell[0], cell[1]))
+            occupied.add(cell)
+
+    def release_dead_animations(self):
+        # slot animasi unit yang sudah mati dikembalikan ke AnimationManager
+        for enemy in self.enemies:
+            if not enemy.alive and getattr(enemy, 'anim', None) is not None:
+                self.anim.remove(enemy.anim)
+                enemy.anim = None
+
+    def dump_instrumentation(self):
+        os.makedirs(os.path.dirname(INSTRUMENT_OUT), exist_ok=True)
+        instrument.dump_json(INSTRUMENT_OUT + '.json')
+        instrument.dump_csv(INSTRUMENT_OUT)
+        self.message = f'Instrumentasi ditulis ke {INSTRUMENT_OUT}.json / _timings.csv / _rules.csv'
+
+    def alive_enemies(self):
+        return [e for e in self.enemies if e.alive]
+
+    def enemies_remaining(self):
+        # musuh hidup di papan + yang masih di antrian wave
+        return len(self.alive_enemies()) + len(self.wave_queue)
+
     def unit_at(self, pos):
         for u in self.units:
             if u.alive and u.pos() == pos:
@@ -309,15 +952,33 @@ class Game:
         return None
 
     # --- INPUT HANDLING extended to menu ---
-    def handle_input(self):
-        for event in pygame.event.get():
+    def handle_input(self, events=None):
+        # events: sudah diambil oleh wait_events (idle mode); default ambil dari queue
+        for event in (events if events is not None else pygame.event.get()):
             if event.type == pygame.QUIT:
+                self.shutdown()
                 pygame.quit(); sys.exit()
 
+            # F3: toggle debug overlay di semua state
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_debug = not self.show_debug
+                continue
+            # F4: tulis data instrumentasi (jika aktif)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                if instrument.enabled():
+                    self.dump_instrumentation()
+                continue
+
+            if self.menu_state == 'INPUT_INTERVAL':
+                self.handle_interval_input(event)
+                continue
+
             # Menu input
             if self.menu_state == 'MAIN':
                 if event.type == pygame.KEYDOWN:
-                    if event.key in (pygame.K_UP,):
+                    if event.key == pygame.K_i:
+                        self.open_interval_menu()
+                    elif event.key in (pygame.K_UP,):
                         self.menu_sel_enemy = (self.menu_sel_enemy - 1) % len(self.enemy_options)
                     elif event.key in (pygame.K_DOWN,):
                         self.menu_sel_enemy = (self.menu_sel_enemy + 1) % len(self.enemy_options)
@@ -346,7 +1007,6 @@ class Game:
                         else:
                             # langsung spawn enemy dan mulai game, NON-FUZZY
                             self.spawn_enemy(self.stage_index)
-                            self.units = [self.player, self.enemy]
                             self.turn = 'PLAYER'
                             self.cursor = [0,0]
                             self.mode = 'IDLE'
@@ -368,7 +1028,6 @@ class Game:
                         self.forced_inference = self.inference_options[self.menu_sel_infer]
                         self.stage_index = self.selected_enemy_index
                         self.spawn_enemy(self.stage_index)
-                        self.units = [self.player, self.enemy]
                         self.turn = 'PLAYER'
                         self.cursor = [0,0]
                         self.mode = 'IDLE'
@@ -390,7 +1049,7 @@ class Game:
                 if event.key in (pygame.K_m,):
                     if self.turn == 'PLAYER' and self.menu_state == 'IN_GAME':
                         self.mode = 'MOVE'
-                        self.move_targets = bfs_reachable(self.player.pos(), MOVE_RANGE, {self.enemy.pos()})
+                        self.move_targets = bfs_reachable(self.player.pos(), MOVE_RANGE, {e.pos() for e in self.alive_enemies()})
                         self.message = 'Mode MOVE. Klik tile tujuan untuk memindahkan.'
                 if event.key in (pygame.K_a,):
                     if self.turn == 'PLAYER' and self.menu_state == 'IN_GAME':
@@ -402,14 +1061,7 @@ class Game:
                         self.message = f'Mode RANGED. Biaya {RANGED_COST} mana. Pilih tile arah untuk menyerang 2 tile.'
                 if event.key in (pygame.K_h,):
                     if self.turn == 'PLAYER' and self.menu_state == 'IN_GAME':
-                        # instant heal if have mana
-                        if getattr(self.player, 'mana', 0) >= PLAYER_HEAL_COST:
-                            self.player.mana -= PLAYER_HEAL_COST
-                            self.player.hp = min(self.player.max_hp, self.player.hp + PLAYER_HEAL_AMOUNT)
-                            self.message = f'Player heal +{PLAYER_HEAL_AMOUNT}. HP sekarang {self.player.hp}.'
-                            self.end_turn()
-                        else:
-                            self.message = 'Mana tidak cukup untuk HEAL.'
+                        self.player_heal()
                 if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
                     self.confirm_action()
 
@@ -458,6 +1110,139 @@ class Game:
                         else:
                             self.message = 'Aksi tidak valid.'
 
+    # --- layar interval (INPUT_INTERVAL) ---
+    def open_interval_menu(self):
+        opt = self.enemy_options[self.menu_sel_enemy]
+        etype = opt if opt in ENEMY_SPRITES else 'Zombie'
+        self.interval_editor = IntervalEditor(etype, AI_INTERVALS.get(etype))
+        self.interval_method = 0
+        self.interval_drag = False
+        self.heat_cache = (None, None)
+        self.menu_state = 'INPUT_INTERVAL'
+        # drag slider butuh MOUSEMOTION (di-block idle mode selama in-game)
+        pygame.event.set_allowed(pygame.MOUSEMOTION)
+
+    def close_interval_menu(self, apply):
+        ed = self.interval_editor
+        if apply:
+            intervals = ed.current()
+            if intervals is None:
+                AI_INTERVALS.pop(ed.etype, None)
+            else:
+                AI_INTERVALS[ed.etype] = intervals
+            ai_params_changed()
+            self.message = f'Interval {ed.etype} dipakai untuk battle berikutnya.'
+        if IDLE_WAIT:
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+        self.interval_drag = False
+        self.menu_state = 'MAIN'
+
+    def slider_row_rect(self, i):
+        return pygame.Rect(SLIDER_X, 60 + i * SLIDER_ROW_H, SLIDER_W, SLIDER_ROW_H - 6)
+
+    def slider_x(self, key, value):
+        lo, hi = self.interval_editor.bounds(key)
+        return SLIDER_X + (value - lo) / (hi - lo) * SLIDER_W
+
+    def slider_value(self, key, x):
+        lo, hi = self.interval_editor.bounds(key)
+        return lo + (x - SLIDER_X) / SLIDER_W * (hi - lo)
+
+    def handle_interval_input(self, event):
+        ed = self.interval_editor
+        if event.type == pygame.KEYDOWN:
+            step = 5 if event.mod & pygame.KMOD_SHIFT else 1
+            if event.key in (pygame.K_ESCAPE, pygame.K_r):
+                self.close_interval_menu(apply=False)
+            elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                self.close_interval_menu(apply=True)
+            elif event.key == pygame.K_UP:
+                ed.sel = (ed.sel - 1) % len(ed.keys)
+                ed.point = min(ed.point, len(ed.intervals[ed.keys[ed.sel]]) - 1)
+            elif event.key == pygame.K_DOWN:
+                ed.sel = (ed.sel + 1) % len(ed.keys)
+                ed.point = min(ed.point, len(ed.intervals[ed.keys[ed.sel]]) - 1)
+            elif event.key == pygame.K_TAB:
+                ed.point = (ed.point + 1) % len(ed.intervals[ed.keys[ed.sel]])
+            elif event.key == pygame.K_LEFT:
+                ed.nudge(-step)
+            elif event.key == pygame.K_RIGHT:
+                ed.nudge(step)
+            elif event.key == pygame.K_m:
+                self.interval_method = (self.interval_method + 1) % len(HEAT_METHODS)
+            elif event.key == pygame.K_e:
+                etypes = list(ENEMY_SPRITES)
+                etype = etypes[(etypes.index(ed.etype) + 1) % len(etypes)]
+                ed.set_etype(etype, AI_INTERVALS.get(etype))
+            elif event.key == pygame.K_d:
+                ed.reset_selected()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            for i, key in enumerate(ed.keys):
+                if self.slider_row_rect(i).inflate(12, 0).collidepoint(event.pos):
+                    # pilih titik terdekat di baris ini lalu mulai drag
+                    ed.sel = i
+                    xs = [self.slider_x(key, v) for v in ed.intervals[key]]
+                    ed.point = min(range(len(xs)), key=lambda j: abs(xs[j] - event.pos[0]))
+                    ed.set_value(key, ed.point, self.slider_value(key, event.pos[0]))
+                    self.interval_drag = True
+                    break
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.interval_drag = False
+        elif event.type == pygame.MOUSEMOTION and self.interval_drag:
+            key = ed.keys[ed.sel]
+            ed.set_value(key, ed.point, self.slider_value(key, event.pos[0]))
+
+    def heat_surface(self):
+        # surface heatmap dibuat ulang hanya jika skor (version) atau metode berubah
+        ed = self.interval_editor
+        stamp = (id(ed), ed.version, self.interval_method)
+        if self.heat_cache[0] == stamp:
+            return self.heat_cache[1]
+        idx = np.clip(ed.scores[self.interval_method], 0, 100).astype(np.intp)
+        rgb = HEAT_LUT[idx][::-1]                        # HP_Bot naik ke atas
+        surf = pygame.transform.scale(pygame.surfarray.make_surface(rgb.transpose(1, 0, 2)), (HEAT_PX, HEAT_PX))
+        self.heat_cache = (stamp, surf)
+        return surf
+
+    def draw_interval_menu(self):
+        ed = self.interval_editor
+        method = HEAT_METHODS[self.interval_method]
+        self.screen.fill(DARK)
+        title = self.text(self.bigfont, f'Interval {ed.etype} - skor {method}', WHITE)
+        self.screen.blit(title, (20, 16))
+        heat = pygame.Rect(30, 60, HEAT_PX, HEAT_PX)
+        self.screen.blit(self.heat_surface(), heat.topleft)
+        draw_outline(self.screen, GRAY, heat.inflate(2, 2), 1)
+        self.screen.blit(self.text(self.font, 'HP_Player 0..100 ->', GRAY), (heat.x, heat.bottom + 6))
+        self.screen.blit(self.text(self.font, 'HP_Bot ^', GRAY), (heat.x, heat.y - 18))
+        fixed = ', '.join(f'{k}={v}' for k, v in HEAT_FIXED.items() if not (ed.no_mana and k.startswith('mana')))
+        self.screen.blit(self.text(self.font, f'tetap: {fixed}', GRAY), (heat.x, heat.bottom + 26))
+        info = f'update {ed.last_ms:.2f} ms ({ed.last_cells}/{HEAT_N * HEAT_N} sel)'
+        self.screen.blit(self.text(self.font, info, GRAY), (heat.x, heat.bottom + 46))
+        if method == 'mamdani' and ed.current() is not None:
+            note = 'interval custom: mamdani = sugeno'
+            self.screen.blit(self.text(self.font, note, GRAY), (heat.x, heat.bottom + 66))
+        for i, key in enumerate(ed.keys):
+            row = self.slider_row_rect(i)
+            selected = i == ed.sel
+            color = YELLOW if selected else WHITE
+            self.screen.blit(self.text(self.font, key, color), (row.x - 100, row.y + 4))
+            base = row.bottom
+            pts = [(self.slider_x(key, v), base) for v in ed.intervals[key]]
+            # bentuk membership: titik tengah (puncak/plateau) di atas, ujung di baseline
+            shape = [pts[0]] + [(x, row.y + 2) for x, _ in pts[1:-1]] + [pts[-1]]
+            pygame.draw.line(self.screen, GRAY, (row.x, base), (row.right, base), 1)
+            pygame.draw.lines(self.screen, color, False, shape, 2 if selected else 1)
+            if selected:
+                for j, (x, y) in enumerate(pts):
+                    pygame.draw.circle(self.screen, RED if j == ed.point else YELLOW, (int(x), y), 4)
+                vals = ' '.join(str(v) for v in ed.intervals[key])
+                self.screen.blit(self.text(self.font, vals, YELLOW), (row.x, 60 + len(ed.keys) * SLIDER_ROW_H))
+        hint = self.text(self.font, 'UP/DOWN set, TAB titik, LEFT/RIGHT geser (Shift x5) atau drag mouse', GRAY)
+        self.screen.blit(hint, (8, HEIGHT - 48))
+        hint = self.text(self.font, 'M metode, E musuh, D default, Enter pakai untuk battle, Esc/R batal.', GRAY)
+        self.screen.blit(hint, (8, HEIGHT - 28))
+
     def confirm_action(self):
         if self.menu_state != 'IN_GAME': return
         cx,cy = self.cursor
@@ -515,66 +1300,205 @@ class Game:
         else:
             self.message = 'Tidak ada aksi dipilih. Tekan M, A, F, atau H.'
 
+    def player_heal(self):
+        # instant heal if have mana
+        if getattr(self.player, 'mana', 0) >= PLAYER_HEAL_COST:
+            self.player.mana -= PLAYER_HEAL_COST
+            self.player.hp = min(self.player.max_hp, self.player.hp + PLAYER_HEAL_AMOUNT)
+            self.message = f'Player heal +{PLAYER_HEAL_AMOUNT}. HP sekarang {self.player.hp}.'
+            self.end_turn()
+        else:
+            self.message = 'Mana tidak cukup untuk HEAL.'
+
     def end_turn(self):
         if self.menu_state != 'IN_GAME': return
+        if self.ai_pending is not None:
+            return   # AI masih berpikir: abaikan E/Space sampai giliran musuh selesai
+        self.release_dead_animations()
         if self.turn == 'PLAYER':
             self.turn = 'ENEMY'
             self.mode = 'IDLE'
             self.move_targets = set()
             self.message = 'Giliran ENEMY.'
-            # immediate enemy action
-            self.enemy_action()
-            # after enemy action, check results
-            if not self.player.alive or not self.enemy.alive:
-                # prepare result info (scores etc.)
-                self.prepare_result()
-                self.menu_state = 'RESULT'
-            else:
-                # regen mana for player and enemy if applicable
-                if hasattr(self.player, 'mana_regen'):
-                    self.player.mana = min(self.player.max_mana, self.player.mana + getattr(self.player,'mana_regen',0))
-                if hasattr(self.enemy, 'mana_regen') and getattr(self.enemy,'mana_regen',0)>0:
-                    self.enemy.mana = min(self.enemy.max_mana, self.enemy.mana + getattr(self.enemy,'mana_regen',0))
-                # --- NEW: decrement heal cooldown after enemy acted ---
-                if hasattr(self.enemy, 'heal_cooldown') and self.enemy.heal_cooldown > 0:
-                    self.enemy.heal_cooldown -= 1
-                self.turn = 'PLAYER'
-                self.message = 'Giliran PLAYER. Tekan M untuk move, A untuk attack, F untuk ranged, H untuk heal, E untuk end turn.'
+            active, snapshot = self.scoring_snapshot()
+            if self.ai_worker is not None and active and self.player.alive:
+                # inference di worker; aksi diterapkan di poll_ai saat future selesai
+                self.ai_pending = (self.ai_worker.submit(snapshot), time.perf_counter(), active, snapshot)
+                self.message = 'Giliran ENEMY: berpikir...'
+                return
+            # immediate enemy action (wave stage: semua unit diproses sekaligus)
+            t0 = time.perf_counter()
+            self.last_ai_source = 'sync'    # sebelum enemy_turn: dicatat turn log (source)
+            self.enemy_turn()
+            self.last_ai_ms = (time.perf_counter() - t0) * 1000.0
+            self.finish_enemy_turn()
+        else:
+            self.turn = 'PLAYER'
+
+    def battle_snapshot(self):
+        # salinan state yang dibutuhkan inference (nilai saja, tanpa referensi ke Unit)
+        active = self.alive_enemies()
+        snapshot = {
+            'player_hp': self.player.hp,
+            'units': [(getattr(e, 'etype', self.enemy_type), e.hp, getattr(e, 'mana', 0)) for e in active],
+        }
+        return active, snapshot
+
+    def scoring_snapshot(self):
+        # seperti battle_snapshot, tapi hanya unit yang skornya dipakai enemy_action: tanpa fuzzy,
+        # tipe NON_FUZZY_TYPES memakai aturan deterministik (Boss tetap jatuh ke jalur fuzzy)
+        active, snapshot = self.battle_snapshot()
+        if getattr(self, 'use_fuzzy', True):
+            return active, snapshot
+        keep = [i for i, (etype, _, _) in enumerate(snapshot['units']) if etype not in NON_FUZZY_TYPES]
+        return [active[i] for i in keep], dict(snapshot, units=[snapshot['units'][i] for i in keep])
+
+    def enemy_turn(self, scores_by_unit=None, backend=None):
+        # scores_by_unit: id(enemy) -> dict skor dari worker; None -> hitung di tempat (batch)
+        # backend: asal skor untuk overlay (None -> snapshot_backend)
+        if scores_by_unit is None:
+            active, snapshot = self.scoring_snapshot()
+            scores_by_unit = {id(e): sc for e, sc in zip(active, score_snapshot(snapshot))}
+            backend = snapshot_backend(snapshot, self.forced_inference or 'mamdani') if active else 'non-fuzzy'
+        self.last_ai_backend = backend or '-'
+        self.turn_no += 1
+        self.turn_unit = 0
+        if self.enemy_type in WAVES:
+            self.enemy_wave_action(scores_by_unit)
+        else:
+            self.act_enemy(self.enemy, scores_by_unit.get(id(self.enemy)))
+
+    def act_enemy(self, enemy, scores=None, occupied=None):
+        # enemy_action + rekam state sebelum/sesudah ke turn log (jika aktif)
+        t0 = time.perf_counter()
+        if self.recorder is None or not enemy.alive or not self.player.alive:
+            self.enemy_action(enemy, scores=scores, occupied=occupied)
+        else:
+            if occupied is None:
+                occupied = {u.pos() for u in self.units if u.alive}
+            if self.recorder.params_version != AI_PARAMS_VERSION:
+                self.recorder.set_params(ai_params_snapshot(), AI_PARAMS_VERSION)
+            before = turnlog.capture(self, enemy, scores, occupied)
+            self.enemy_action(enemy, scores=scores, occupied=occupied)
+            self.recorder.record(turnlog.make_record(self, enemy, before))
+            self.turn_unit += 1
+        self.last_action_ms = (time.perf_counter() - t0) * 1000.0
+
+    def poll_ai(self):
+        # dipanggil tiap update: terapkan keputusan jika future selesai atau sudah timeout
+        if self.ai_pending is None:
+            return
+        future, started, active, snapshot = self.ai_pending
+        note = None
+        if future.done():
+            try:
+                scores, infer_ms = future.result()
+            except Exception:
+                scores, infer_ms, note = fallback_snapshot_scores(snapshot), 0.0, 'gagal'
+        elif time.perf_counter() - started > AI_TIMEOUT_S:
+            self.ai_worker.abandon(future)
+            scores, infer_ms, note = fallback_snapshot_scores(snapshot), 0.0, 'timeout'
+        else:
+            return
+        self.ai_pending = None
+        self.last_ai_source = f'fallback ({note})' if note else 'worker'
+        backend = 'heuristic fallback' if note else snapshot_backend(snapshot, self.forced_inference or 'mamdani')
+        t0 = time.perf_counter()
+        self.enemy_turn({id(e): sc for e, sc in zip(active, scores)}, backend)
+        self.last_ai_ms = infer_ms + (time.perf_counter() - t0) * 1000.0
+        self.finish_enemy_turn()
+        if note:
+            self.message += f' (AI {note}, pakai skor fallback)'
+
+    def finish_enemy_turn(self):
+        # after enemy action, check results
+        if not self.player.alive or self.enemies_remaining() == 0:
+            # prepare result info (scores etc.)
+            self.prepare_result()
+            self.menu_state = 'RESULT'
         else:
+            # regen mana for player and enemy if applicable
+            if hasattr(self.player, 'mana_regen'):
+                self.player.mana = min(self.player.max_mana, self.player.mana + getattr(self.player,'mana_regen',0))
+            for enemy in self.alive_enemies():
+                if hasattr(enemy, 'mana_regen') and getattr(enemy,'mana_regen',0)>0:
+                    enemy.mana = min(enemy.max_mana, enemy.mana + getattr(enemy,'mana_regen',0))
+                # --- NEW: decrement heal cooldown after enemy acted ---
+                if hasattr(enemy, 'heal_cooldown') and enemy.heal_cooldown > 0:
+                    enemy.heal_cooldown -= 1
             self.turn = 'PLAYER'
+            self.message = 'Giliran PLAYER. Tekan M untuk move, A untuk attack, F untuk ranged, H untuk heal, E untuk end turn.'
+
+    # --- wave turn: skor fuzzy di-batch per tipe, gerakan di-resolve berurutan tanpa bentrok ---
+    def enemy_wave_action(self, scores_by_unit=None):
+        active, snapshot = self.battle_snapshot()
+        if not active or not self.player.alive:
+            return
+
+        # 1) batched scoring: satu panggilan inference per tipe musuh (sudah dihitung worker jika async)
+        if scores_by_unit is None:
+            scores_by_unit = {id(e): sc for e, sc in zip(active, score_snapshot(snapshot))}
+
+        # 2) conflict-free movement: unit terdekat ke player bergerak lebih dulu dan
+        #    petak tujuan langsung direservasi di occupied sehingga tidak ada dua unit di petak sama
+        ppos = self.player.pos()
+        occupied = {u.pos() for u in self.units if u.alive}
+        acted = 0
+        for enemy in sorted(active, key=lambda e: (manhattan(e.pos(), ppos), e.y, e.x)):
+            if not self.player.alive:
+                break
+            self.act_enemy(enemy, scores_by_unit.get(id(enemy)), occupied)
+            occupied.add(enemy.pos())
+            acted += 1
+
+        # 3) bala bantuan dari antrian wave + buang unit yang sudah mati
+        self.spawn_reinforcements(occupied)
+        self.enemies = self.alive_enemies()
+        if self.enemies:
+            self.enemy = self.enemies[0]
+        self.units = [self.player] + self.enemies
+        if self.player.alive:
+            self.message = f'Wave: {acted} musuh bergerak, {len(self.enemies)} di papan, {len(self.wave_queue)} antri. Player HP: {max(0,self.player.hp)}.'
 
     # --- enemy_action: now supports deterministic behaviors when use_fuzzy == False ---
-    def enemy_action(self):
-        if not self.enemy.alive or not self.player.alive:
+    def enemy_action(self, enemy=None, scores=None, occupied=None):
+        # enemy/scores/occupied diisi oleh enemy_wave_action; default: musuh tunggal stage ini
+        enemy = enemy or self.enemy
+        if not enemy.alive or not self.player.alive:
             return
 
-        etype = getattr(self, 'enemy_type', 'Zombie')
+        etype = getattr(enemy, 'etype', getattr(self, 'enemy_type', 'Zombie'))
 
         # common occupied set
-        occupied = {u.pos() for u in self.units if u.alive}
-        occupied.discard(self.enemy.pos())
-        dist = manhattan(self.enemy.pos(), self.player.pos())
+        if occupied is None:
+            occupied = {u.pos() for u in self.units if u.alive}
+        occupied.discard(enemy.pos())
+        dist = manhattan(enemy.pos(), self.player.pos())
+
+        # last_behavior: keputusan terakhir (dicatat turnlog)
+        self.last_behavior = 'WAIT'
 
         # If user disabled fuzzy, use deterministic rules per enemy
         if not getattr(self, 'use_fuzzy', True):
+            self.last_behavior = 'NON_FUZZY'
             # ZOMBIE: BFS -> move toward; if adjacent attack
             if etype == 'Zombie':
                 if dist == 1:
-                    self.player.take_damage(self.enemy.atk)
+                    self.player.take_damage(enemy.atk)
                     self.message = f'Zombie menyerang! Player HP: {max(0,self.player.hp)}.'
                     return
-                path = self.find_path(self.enemy.pos(), self.player.pos(), occupied)
+                path = self.find_path(enemy.pos(), self.player.pos(), occupied)
                 if path and len(path) > 1:
                     next_step = path[1]
                     if self.unit_at(next_step) is None:
-                        self.enemy.x, self.enemy.y = next_step
+                        enemy.x, enemy.y = next_step
                         self.message = f'Zombie (NON-FUZZY) bergerak ke {next_step}.'
                     else:
                         self.message = 'Zombie (NON-FUZZY) terhalang.'
                 else:
-                    tgt = fuzzy.pick_adjacent_for_closer(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+                    tgt = fuzzy.pick_adjacent_for_closer(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
                     if tgt:
-                        self.enemy.x, self.enemy.y = tgt
+                        enemy.x, enemy.y = tgt
                         self.message = f'Zombie (NON-FUZZY) bergerak (fallback) ke {tgt}.'
                     else:
                         self.message = 'Zombie (NON-FUZZY) memilih untuk diam.'
@@ -582,16 +1506,16 @@ class Game:
 
             # SKELETON: prioritaskan ranged. If adjacent -> try to retreat; else if within range -> ranged attack; else approach.
             if etype == 'Skeleton':
-                rng = getattr(self.enemy, 'range', 3)
+                rng = getattr(enemy, 'range', 3)
                 if dist == 1:
                     # try to retreat to maintain distance for ranged attack
-                    tgt = fuzzy.pick_adjacent_for_farther(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+                    tgt = fuzzy.pick_adjacent_for_farther(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
                     if tgt and self.unit_at(tgt) is None:
-                        self.enemy.x, self.enemy.y = tgt
+                        enemy.x, enemy.y = tgt
                         self.message = f'Skeleton mundur untuk jarak jauh ke {tgt}.'
                         return
                     # fallback: melee attack
-                    self.player.take_damage(self.enemy.atk)
+                    self.player.take_damage(enemy.atk)
                     self.message = f'Skeleton menyerang melee! Player HP: {max(0,self.player.hp)}.'
                     return
                 if dist <= rng:
@@ -601,16 +1525,16 @@ class Game:
                     elif dist >= 3:
                         dmg = 5
                     else:
-                        dmg = getattr(self.enemy, 'atk', 1)
+                        dmg = getattr(enemy, 'atk', 1)
                     self.player.take_damage(dmg)
                     self.message = f'Skeleton melakukan serangan jarak jauh! Player HP: {max(0,self.player.hp)}.'
                     return
                 # else approach
-                path = self.find_path(self.enemy.pos(), self.player.pos(), occupied)
+                path = self.find_path(enemy.pos(), self.player.pos(), occupied)
                 if path and len(path) > 1:
                     next_step = path[1]
                     if self.unit_at(next_step) is None:
-                        self.enemy.x, self.enemy.y = next_step
+                        enemy.x, enemy.y = next_step
                         self.message = f'Skeleton (NON-FUZZY) bergerak mendekat ke {next_step}.'
                         return
                 self.message = 'Skeleton (NON-FUZZY) tidak bisa mendekat.'
@@ -619,29 +1543,29 @@ class Game:
             # ENDERMAN: approach and attack; if low hp -> teleport/mundur + heal, then resume attacking
             if etype == 'Enderman':
                 # heal-priority: only if cooldown expired
-                heal_act, do_heal = fuzzy.heal_priority_check('Enderman', self.enemy.hp, getattr(self.enemy,'mana',0))
-                if do_heal and getattr(self.enemy, 'heal_cooldown', 0) <= 0:
-                    tgt = fuzzy.pick_adjacent_for_farther(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+                heal_act, do_heal = fuzzy.heal_priority_check('Enderman', enemy.hp, getattr(enemy,'mana',0))
+                if do_heal and getattr(enemy, 'heal_cooldown', 0) <= 0:
+                    tgt = fuzzy.pick_adjacent_for_farther(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
                     if tgt and self.unit_at(tgt) is None:
-                        self.enemy.x, self.enemy.y = tgt
-                    heal_amt = getattr(self.enemy, 'heal_amount', max(1, int(self.enemy.max_hp * 0.25)))
-                    mana_cost = getattr(self.enemy, 'heal_cost', 20)
-                    self.enemy.hp = min(self.enemy.max_hp, self.enemy.hp + heal_amt)
-                    if hasattr(self.enemy, 'mana'):
-                        self.enemy.mana = max(0, getattr(self.enemy,'mana',0) - mana_cost)
+                        enemy.x, enemy.y = tgt
+                    heal_amt = getattr(enemy, 'heal_amount', max(1, int(enemy.max_hp * 0.25)))
+                    mana_cost = getattr(enemy, 'heal_cost', 20)
+                    enemy.hp = min(enemy.max_hp, enemy.hp + heal_amt)
+                    if hasattr(enemy, 'mana'):
+                        enemy.mana = max(0, getattr(enemy,'mana',0) - mana_cost)
                     # set cooldown so Enderman won't teleport/heal again immediately
-                    self.enemy.heal_cooldown = 2
-                    self.message = f'Enderman (NON-FUZZY) teleport & heal +{heal_amt}. HP sekarang {self.enemy.hp}.'
+                    enemy.heal_cooldown = 2
+                    self.message = f'Enderman (NON-FUZZY) teleport & heal +{heal_amt}. HP sekarang {enemy.hp}.'
                     return
                 # Normal behavior: only melee if adjacent; otherwise approach (no ranged)
                 if dist == 1:
-                    self.player.take_damage(self.enemy.atk)
+                    self.player.take_damage(enemy.atk)
                     self.message = f'Enderman menyerang melee! Player HP: {max(0,self.player.hp)}.'
                     return
                 # approach via BFS
-                path = self.find_path(self.enemy.pos(), self.player.pos(), occupied)
+                path = self.find_path(enemy.pos(), self.player.pos(), occupied)
                 if path and len(path) > 1 and self.unit_at(path[1]) is None:
-                    self.enemy.x, self.enemy.y = path[1]
+                    enemy.x, enemy.y = path[1]
                     self.message = f'Enderman (NON-FUZZY) bergerak mendekat ke {path[1]}.'
                 else:
                     self.message = 'Enderman (NON-FUZZY) tidak bisa mendekat.'
@@ -650,57 +1574,62 @@ class Game:
             # BOSS: can ranged, heal by moving backward (no teleport). Similar heal-priority as before.
             if etype == 'Boss':
                 # heal only if cooldown expired
-                heal_act, do_heal = fuzzy.heal_priority_check('Boss', self.enemy.hp, getattr(self.enemy,'mana',0))
-                if do_heal and getattr(self.enemy, 'heal_cooldown', 0) <= 0:
-                    tgt = fuzzy.pick_adjacent_for_farther(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+                heal_act, do_heal = fuzzy.heal_priority_check('Boss', enemy.hp, getattr(enemy,'mana',0))
+                if do_heal and getattr(enemy, 'heal_cooldown', 0) <= 0:
+                    tgt = fuzzy.pick_adjacent_for_farther(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
                     if tgt and self.unit_at(tgt) is None:
-                        self.enemy.x, self.enemy.y = tgt
-                    heal_amt = getattr(self.enemy, 'heal_amount', 10)
-                    mana_cost = getattr(self.enemy, 'heal_cost', 50)
-                    self.enemy.hp = min(self.enemy.max_hp, self.enemy.hp + heal_amt)
-                    if hasattr(self.enemy, 'mana'):
-                        self.enemy.mana = max(0, getattr(self.enemy,'mana',0) - mana_cost)
+                        enemy.x, enemy.y = tgt
+                    heal_amt = getattr(enemy, 'heal_amount', 10)
+                    mana_cost = getattr(enemy, 'heal_cost', 50)
+                    enemy.hp = min(enemy.max_hp, enemy.hp + heal_amt)
+                    if hasattr(enemy, 'mana'):
+                        enemy.mana = max(0, getattr(enemy,'mana',0) - mana_cost)
                     # set longer cooldown to avoid frequent heals
-                    self.enemy.heal_cooldown = 4
-                    self.message = f'Boss (NON-FUZZY) mundur & heal +{heal_amt}. HP sekarang {self.enemy.hp}.'
+                    enemy.heal_cooldown = 4
+                    self.message = f'Boss (NON-FUZZY) mundur & heal +{heal_amt}. HP sekarang {enemy.hp}.'
                     return
 
         # --- fallback: FUZZY behavior (existing path) ---
         # use module-level 'fuzzy' (imported at top); occupied already computed earlier
 
         # 1) heal-priority
-        heal_act, do_heal = getattr(fuzzy, 'heal_priority_check')(etype, self.enemy.hp, getattr(self.enemy,'mana',0))
+        heal_act, do_heal = getattr(fuzzy, 'heal_priority_check')(etype, enemy.hp, getattr(enemy,'mana',0))
         if do_heal:
-            tgt = getattr(fuzzy, 'pick_adjacent_for_farther')(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+            tgt = getattr(fuzzy, 'pick_adjacent_for_farther')(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
             # perform heal: use per-type heal values if present
             if tgt and self.unit_at(tgt) is None:
-                self.enemy.x, self.enemy.y = tgt
-            heal_amt = getattr(self.enemy, 'heal_amount', max(1, int(self.enemy.max_hp * 0.25)))
-            mana_cost = getattr(self.enemy, 'heal_cost', 20)
-            self.enemy.hp = min(self.enemy.max_hp, self.enemy.hp + heal_amt)
-            if hasattr(self.enemy, 'mana'):
-                self.enemy.mana = max(0, getattr(self.enemy,'mana',0) - mana_cost)
-            self.message = f'{etype} melakukan HEAL (+{heal_amt}). HP sekarang {self.enemy.hp}.'
+                enemy.x, enemy.y = tgt
+            heal_amt = getattr(enemy, 'heal_amount', max(1, int(enemy.max_hp * 0.25)))
+            mana_cost = getattr(enemy, 'heal_cost', 20)
+            enemy.hp = min(enemy.max_hp, enemy.hp + heal_amt)
+            if hasattr(enemy, 'mana'):
+                enemy.mana = max(0, getattr(enemy,'mana',0) - mana_cost)
+            self.message = f'{etype} melakukan HEAL (+{heal_amt}). HP sekarang {enemy.hp}.'
+            self.last_behavior = 'HEAL'
             return
 
         # 2) if adjacent prefer melee
-        if manhattan(self.enemy.pos(), self.player.pos()) == 1:
-            self.player.take_damage(self.enemy.atk)
+        if manhattan(enemy.pos(), self.player.pos()) == 1:
+            self.player.take_damage(enemy.atk)
             self.message = f'{etype} menyerang! Player HP: {max(0,self.player.hp)}.'
+            self.last_behavior = 'MELEE'
             return
 
         # 3) compute scores and pick inference
-        scores = getattr(fuzzy, 'get_all_scores')(etype, self.player.hp, self.enemy.hp, 0, getattr(self.enemy,'mana',0), 5)
+        if scores is None:
+            scores = getattr(fuzzy, 'get_all_scores')(etype, self.player.hp, enemy.hp, 0, getattr(enemy,'mana',0), 5)
+            self.last_ai_backend = 'skfuzzy' if getattr(fuzzy, 'SKFUZZY', False) else 'heuristic'
         infer_choice = self.forced_inference or 'mamdani'
         infer_choice = infer_choice if infer_choice in scores else 'mamdani'
         score = scores[infer_choice]
 
         behavior = getattr(fuzzy, 'map_fuzzy_score_to_behavior')(score, etype)
+        self.last_behavior = behavior
 
         # RANGED behavior
         if behavior == "RANGED_ATTACK":
-            rng = getattr(self.enemy, 'range', 2)
-            dist = manhattan(self.enemy.pos(), self.player.pos())
+            rng = getattr(enemy, 'range', 2)
+            dist = manhattan(enemy.pos(), self.player.pos())
             if dist <= rng:
                 # damage rules per type
                 if etype == 'Skeleton':
@@ -711,43 +1640,64 @@ class Game:
                     else:
                         dmg = 5
                 elif etype == 'Boss':
-                    dmg = getattr(self.enemy, 'ranged_atk', 2)
+                    dmg = getattr(enemy, 'ranged_atk', 2)
                 else:
-                    dmg = getattr(self.enemy, 'atk', 1)
+                    dmg = getattr(enemy, 'atk', 1)
                 self.player.take_damage(dmg)
                 self.message = f'{etype} melakukan serangan jarak jauh! Player HP: {max(0,self.player.hp)}.'
             else:
-                tgt = getattr(fuzzy, 'pick_adjacent_for_closer')(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+                tgt = getattr(fuzzy, 'pick_adjacent_for_closer')(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
                 if tgt:
-                    self.enemy.x, self.enemy.y = tgt
+                    enemy.x, enemy.y = tgt
                     self.message = f'{etype} bergerak mendekat ke {tgt}.'
                 else:
                     self.message = f'{etype} ingin serang jarak jauh tapi target terlalu jauh.'
             return
 
+        # TELEPORT (Enderman): ke petak kosong di samping player, atau satu petak menjauh
+        if behavior == "TELEPORT_CLOSE":
+            for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
+                tx, ty = self.player.x + dx, self.player.y + dy
+                if 0 <= tx < GRID_W and 0 <= ty < GRID_H and (tx, ty) not in occupied:
+                    enemy.x, enemy.y = tx, ty
+                    self.message = f'{etype} teleport ke samping player ({tx}, {ty}).'
+                    return
+            self.message = f'{etype} ingin teleport tapi semua petak terisi.'
+            return
+
+        if behavior == "TELEPORT_FAR":
+            tgt = getattr(fuzzy, 'pick_adjacent_for_farther')(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+            if tgt:
+                enemy.x, enemy.y = tgt
+                self.message = f'{etype} teleport menjauh ke {tgt}.'
+            else:
+                self.message = f'{etype} ingin teleport menjauh tapi terhalang.'
+            return
+
         # Movement / other behaviors: handle approach / retreat / fallback
-        if behavior in ("MOVE_TOWARDS","APPROACH","AGGRESSIVE","ATTACK_MELEE","MELEE"):
-            tgt = getattr(fuzzy, 'pick_adjacent_for_closer')(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+        # (MOVE_CLOSE / MOVE_RETREAT: nama dari fuzzy.map_fuzzy_score_to_behavior)
+        if behavior in ("MOVE_CLOSE","MOVE_TOWARDS","APPROACH","AGGRESSIVE","ATTACK_MELEE","MELEE"):
+            tgt = getattr(fuzzy, 'pick_adjacent_for_closer')(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
             if tgt:
-                self.enemy.x, self.enemy.y = tgt
+                enemy.x, enemy.y = tgt
                 self.message = f'{etype} bergerak mendekat ke {tgt}.'
             else:
                 self.message = f'{etype} ingin mendekat tapi terhalang.'
             return
 
-        if behavior in ("MOVE_AWAY","RETREAT","FAR","DEFENSIVE"):
-            tgt = getattr(fuzzy, 'pick_adjacent_for_farther')(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+        if behavior in ("MOVE_RETREAT","MOVE_AWAY","RETREAT","FAR","DEFENSIVE"):
+            tgt = getattr(fuzzy, 'pick_adjacent_for_farther')(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
             if tgt:
-                self.enemy.x, self.enemy.y = tgt
+                enemy.x, enemy.y = tgt
                 self.message = f'{etype} mundur ke {tgt}.'
             else:
                 self.message = f'{etype} ingin mundur tapi terhalang.'
             return
 
         # Default fallback: coba mendekat agar AI tidak diam
-        tgt = getattr(fuzzy, 'pick_adjacent_for_closer')(self.enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
+        tgt = getattr(fuzzy, 'pick_adjacent_for_closer')(enemy.pos(), self.player.pos(), occupied, GRID_W, GRID_H)
         if tgt:
-            self.enemy.x, self.enemy.y = tgt
+            enemy.x, enemy.y = tgt
             self.message = f'{etype} bergerak (fallback) ke {tgt}.'
         else:
             self.message = f'{etype} memilih untuk diam.'
@@ -756,7 +1706,7 @@ class Game:
     def prepare_result(self):
         import fuzzy
         etype = getattr(self, 'enemy_type', 'Unknown')
-        scores = getattr(fuzzy, 'get_all_scores')(etype,
+        scores = getattr(fuzzy, 'get_all_scores')(getattr(self.enemy, 'etype', etype),
                                                   self.player.hp if self.player else 0,
                                                   self.enemy.hp if self.enemy else 0,
                                                   0, getattr(self.enemy,'mana',0), 5)
@@ -769,30 +1719,34 @@ class Game:
             'score': selected_score,
             'player_hp': self.player.hp,
             'enemy_hp': self.enemy.hp,
-            'winner': 'PLAYER' if self.enemy and not self.enemy.alive else ('ENEMY' if self.player and not self.player.alive else 'DRAW')
+            'winner': 'PLAYER' if self.enemy and self.enemies_remaining() == 0 else ('ENEMY' if self.player and not self.player.alive else 'DRAW')
         }
 
     # --- Drawing functions: menu + game + result ---
+    def text(self, font, text, color):
+        # semua teks menu/HUD lewat cache (render ulang hanya jika teks/warna berubah)
+        return self.text_cache.render(font, text, color)
+
     def draw_main_menu(self):
         self.screen.fill(DARK)
-        title = self.bigfont.render('MAIN MENU - Pilih Lawan (UP/DOWN, Enter)', True, WHITE)
+        title = self.text(self.bigfont, 'MAIN MENU - Pilih Lawan (UP/DOWN, Enter)', WHITE)
         self.screen.blit(title, (WIDTH//2 - 220, 20))
         for i, opt in enumerate(self.enemy_options):
             color = YELLOW if i == self.menu_sel_enemy else WHITE
-            txt = self.bigfont.render(opt, True, color)
+            txt = self.text(self.bigfont, opt, color)
             self.screen.blit(txt, (WIDTH//2 - 60, 80 + i*36))
-        hint = self.font.render('Tekan R untuk kembali kapan saja.', True, GRAY)
+        hint = self.text(self.font, 'Tekan I untuk atur interval membership. R untuk kembali kapan saja.', GRAY)
         self.screen.blit(hint, (8, HEIGHT-28))
 
     def draw_infer_menu(self):
         self.screen.fill(DARK)
-        title = self.bigfont.render(f'Pilih Inference untuk {self.enemy_options[self.selected_enemy_index]}', True, WHITE)
+        title = self.text(self.bigfont, f'Pilih Inference untuk {self.enemy_options[self.selected_enemy_index]}', WHITE)
         self.screen.blit(title, (WIDTH//2 - 260, 20))
         for i, opt in enumerate(self.inference_options):
             color = YELLOW if i == self.menu_sel_infer else WHITE
-            txt = self.bigfont.render(opt, True, color)
+            txt = self.text(self.bigfont, opt, color)
             self.screen.blit(txt, (WIDTH//2 - 80, 100 + i*36))
-        hint = self.font.render('Enter untuk mulai. R untuk kembali.', True, GRAY)
+        hint = self.text(self.font, 'Enter untuk mulai. R untuk kembali.', GRAY)
         self.screen.blit(hint, (8, HEIGHT-28))
 
     def draw_use_fuzzy_menu(self):
@@ -801,20 +1755,20 @@ class Game:
         Di-handle setelah MAIN ketika user memilih 'Zombie'.
         """
         self.screen.fill(DARK)
-        title = self.bigfont.render('Gunakan Fuzzy untuk Zombie?', True, WHITE)
+        title = self.text(self.bigfont, 'Gunakan Fuzzy untuk Zombie?', WHITE)
         self.screen.blit(title, (WIDTH//2 - 200, 20))
         opts = ['Yes','No']
         sel = getattr(self, 'menu_sel_use_fuzzy', 0)
         for i, opt in enumerate(opts):
             color = YELLOW if i == sel else WHITE
-            txt = self.bigfont.render(opt, True, color)
+            txt = self.text(self.bigfont, opt, color)
             self.screen.blit(txt, (WIDTH//2 - 40, 100 + i*36))
-        hint = self.font.render('UP/DOWN pilih, Enter untuk konfirmasi. Jika No, Zombie pakai BFS+Manhattan.', True, GRAY)
+        hint = self.text(self.font, 'UP/DOWN pilih, Enter untuk konfirmasi. Jika No, Zombie pakai BFS+Manhattan.', GRAY)
         self.screen.blit(hint, (8, HEIGHT-28))
 
     def draw_result(self):
         self.screen.fill(DARK)
-        title = self.bigfont.render('Hasil Pertarungan', True, WHITE)
+        title = self.text(self.bigfont, 'Hasil Pertarungan', WHITE)
         self.screen.blit(title, (WIDTH//2 - 120, 16))
         if not self.result_info:
             return
@@ -822,120 +1776,179 @@ class Game:
         # show selected inference name + single numeric score
         sel = self.result_info.get('selected_inference', 'mamdani')
         sc = self.result_info.get('score', 0.0)
-        txt = self.font.render(f'Inference selected: {sel}  |  Score: {sc:.1f}', True, YELLOW)
+        txt = self.text(self.font, f'Inference selected: {sel}  |  Score: {sc:.1f}', YELLOW)
         self.screen.blit(txt, (40, y)); y += 28
         # other summary fields
         other_keys = ['enemy','player_hp','enemy_hp','winner']
         for k in other_keys:
             if k in self.result_info:
-                txt = self.font.render(f'{k}: {self.result_info[k]}', True, WHITE)
+                txt = self.text(self.font, f'{k}: {self.result_info[k]}', WHITE)
                 self.screen.blit(txt, (40, y)); y += 24
-        hint = self.font.render('Tekan R untuk kembali ke menu utama.', True, GRAY)
+        hint = self.text(self.font, 'Tekan R untuk kembali ke menu utama.', GRAY)
         self.screen.blit(hint, (8, HEIGHT-28))
 
     # draw_grid, draw_units, draw_cursor, draw_ui (unchanged except small adapt)
-    def draw_grid(self):
+    # Setiap elemen in-game dijadikan "draw op": (key, rect, sig, draw). DirtyRenderer
+    # membandingkan sig antar frame dan hanya menggambar ulang rect yang berubah.
+    def draw_grid(self, surface=None):
+        surface = surface or self.screen
         for x in range(GRID_W):
             for y in range(GRID_H):
                 rect = pygame.Rect(x*TILE, y*TILE, TILE, TILE)
-                pygame.draw.rect(self.screen, GRAY, rect, 1)
+                pygame.draw.rect(surface, GRAY, rect, 1)
 
-    def draw_units(self):
+    def unit_ops(self):
+        # sprite dulu (satu batch Surface.blits), lalu HP bar di atasnya
+        sprites = []
+        bars = []
         for u in self.units:
             if not u.alive:
                 continue
             cx = u.x * TILE + TILE//2
             cy = u.y * TILE + TILE//2
-            if u.team == 'PLAYER':
-                self.player_idle_anim.update()
-                img = self.player_idle_anim.get_frame()
-                rect = img.get_rect(center=(cx, cy))
-                self.screen.blit(img, rect)
+            etype = None if u.team == 'PLAYER' else getattr(u, 'etype', getattr(self, 'enemy_type', None))
+            frame = self.anim.frame(getattr(u, 'anim', None))
+            if frame is not None:
+                ox, oy = SPRITE_OFFSETS.get(etype, (0, 0))
+                rect = frame.get_rect(center=(cx + ox, cy + oy))
+                sprites.append((('unit', id(u)), rect, id(frame), (frame, rect)))
             else:
-                etype = getattr(self, 'enemy_type', None)
-                if etype == 'Zombie' and getattr(self, 'zombie_frames', None):
-                    frame = self.zombie_frames[self.zombie_anim_index % len(self.zombie_frames)]
-                    # naikkan sprite sedikit agar tidak menyentuh tanah (sesuaikan ZOMBIE_Y_OFFSET jika perlu)
-                    rect = frame.get_rect(center=(cx, cy - ZOMBIE_Y_OFFSET))
-                    self.screen.blit(frame, rect)
-                elif etype == 'Skeleton' and getattr(self, 'skeleton_frames', None):
-                    frame = self.skeleton_frames[self.skeleton_anim_index % len(self.skeleton_frames)]
-                    # naikkan sprite sedikit agar tidak menyentuh tanah (sesuaikan SKELETON_Y_OFFSET jika perlu)
-                    rect = frame.get_rect(center=(cx, cy - SKELETON_Y_OFFSET))
-                    self.screen.blit(frame, rect)
-                elif etype == 'Enderman' and getattr(self, 'enderman_frames', None):
-                    frame = self.enderman_frames[self.enderman_anim_index % len(self.enderman_frames)]
-                    # naikkan sedikit agar posisi ground terlihat benar
-                    # geser sedikit ke kanan menggunakan ENDERMAN_X_OFFSET
-                    rect = frame.get_rect(center=(cx + ENDERMAN_X_OFFSET, cy - ENDERMAN_Y_OFFSET))
-                    self.screen.blit(frame, rect)
-                elif etype == 'Boss' and getattr(self, 'boss_frames', None):
-                    frame = self.boss_frames[self.boss_anim_index % len(self.boss_frames)]
-                    # Boss berada di tengah; sedikit angkat untuk jaga-jaga
-                    rect = frame.get_rect(center=(cx, cy - BOSS_Y_OFFSET))
-                    self.screen.blit(frame, rect)
-                else:
-                     if etype == 'Zombie':
-                         ecolor = GREEN
-                     elif etype == 'Skeleton':
-                         ecolor = WHITE
-                     elif etype == 'Enderman':
-                         ecolor = PURPLE
-                     elif etype == 'Boss':
-                         ecolor = LIGHT_BLUE
-                     else:
-                         ecolor = RED
-                     pygame.draw.rect(self.screen, ecolor, (u.x*TILE+12, u.y*TILE+12, TILE-24, TILE-24))
+                ecolor = ENEMY_COLORS.get(etype, RED)
+                rect = pygame.Rect(u.x*TILE+12, u.y*TILE+12, TILE-24, TILE-24)
+                sprites.append((('unit', id(u)), rect, ecolor,
+                                lambda scr, c=ecolor, r=rect: pygame.draw.rect(scr, c, r)))
             hp_ratio = max(0, u.hp) / u.max_hp
             bar_w = int(TILE * 0.8)
             bx = u.x*TILE + (TILE-bar_w)//2
             by = u.y*TILE + TILE - 12
-            pygame.draw.rect(self.screen, DARK, (bx,by,bar_w,6))
-            pygame.draw.rect(self.screen, GREEN, (bx,by,int(bar_w*hp_ratio),6))
+            fill_w = int(bar_w*hp_ratio)
+            bars.append((('hp', id(u)), pygame.Rect(bx, by, bar_w, 6), fill_w,
+                         lambda scr, bx=bx, by=by, bar_w=bar_w, fill_w=fill_w: (
+                             pygame.draw.rect(scr, DARK, (bx,by,bar_w,6)),
+                             pygame.draw.rect(scr, GREEN, (bx,by,fill_w,6)))))
+        return sprites + bars
 
-    def draw_cursor(self):
+    def draw_units(self):
+        draw_ops(self.screen, self.unit_ops())
+
+    def cursor_ops(self):
+        ops = []
         cx,cy = self.cursor
         rect = pygame.Rect(cx*TILE, cy*TILE, TILE, TILE)
-        pygame.draw.rect(self.screen, YELLOW, rect, 3)
+        ops.append(('cursor', rect, None, lambda scr, r=rect: draw_outline(scr, YELLOW, r, 3)))
         if self.mode == 'MOVE':
             for (mx,my) in self.move_targets:
                 r = pygame.Rect(mx*TILE+6, my*TILE+6, TILE-12, TILE-12)
-                pygame.draw.rect(self.screen, (180,240,180), r, 2)
+                ops.append((('move', mx, my), r, None, lambda scr, r=r: draw_outline(scr, (180,240,180), r, 2)))
         if self.mode == 'ATTACK':
             for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
                 nx,ny = self.player.x+dx, self.player.y+dy
                 if in_bounds(nx,ny) and self.unit_at((nx,ny)) and self.unit_at((nx,ny)).team == 'ENEMY':
                     r = pygame.Rect(nx*TILE+6, ny*TILE+6, TILE-12, TILE-12)
-                    pygame.draw.rect(self.screen, (255,180,180), r, 2)
+                    ops.append((('attack', nx, ny), r, None, lambda scr, r=r: draw_outline(scr, (255,180,180), r, 2)))
+        return ops
 
-    def draw_ui(self):
-        panel = pygame.Rect(0, GRID_H*TILE, WIDTH, 120)
-        pygame.draw.rect(self.screen, DARK, panel)
+    def draw_cursor(self):
+        for key, rect, sig, draw in self.cursor_ops():
+            draw(self.screen)
+
+    def ui_lines(self):
+        # (font, text, color, pos) untuk panel bawah
+        lines = []
         info = f'State: {self.menu_state} | Turn: {self.turn} | Mode: {self.mode} | Cursor: {self.cursor[0]},{self.cursor[1]}'
-        txt = self.font.render(info, True, WHITE)
-        self.screen.blit(txt, (8, GRID_H*TILE+6))
-        msg = self.bigfont.render(self.message, True, YELLOW)
-        self.screen.blit(msg, (8, GRID_H*TILE+30))
+        lines.append((self.font, info, WHITE, (8, GRID_H*TILE+6)))
+        lines.append((self.bigfont, self.message, YELLOW, (8, GRID_H*TILE+30)))
         if self.menu_state == 'IN_GAME' and hasattr(self, 'enemy'):
-            inf = self.font.render(f'Enemy: {self.enemy_type} | Inference: {self.forced_inference}', True, WHITE)
-            self.screen.blit(inf, (WIDTH-320, GRID_H*TILE+8))
+            lines.append((self.font, f'Enemy: {self.enemy_type} | Inference: {self.forced_inference}', WHITE, (WIDTH-320, GRID_H*TILE+8)))
             # tambahkan status fuzzy yes/no
             fuzzy_txt = 'Fuzzy: Yes' if getattr(self, 'use_fuzzy', True) else 'Fuzzy: No'
-            f_txt = self.font.render(fuzzy_txt, True, WHITE)
-            self.screen.blit(f_txt, (WIDTH-320, GRID_H*TILE+32))
+            lines.append((self.font, fuzzy_txt, WHITE, (WIDTH-320, GRID_H*TILE+32)))
         # mana bars/text
         if hasattr(self, 'player'):
             pm = getattr(self.player,'mana',0)
-            pm_txt = self.font.render(f'Player Mana: {pm}/{getattr(self.player,"max_mana",0)}', True, WHITE)
-            self.screen.blit(pm_txt, (8, GRID_H*TILE+58))
+            lines.append((self.font, f'Player Mana: {pm}/{getattr(self.player,"max_mana",0)}', WHITE, (8, GRID_H*TILE+58)))
         if hasattr(self,'enemy') and hasattr(self.enemy,'mana'):
             em = getattr(self.enemy,'mana',0)
-            em_txt = self.font.render(f'Enemy Mana: {em}/{getattr(self.enemy,"max_mana",0)}', True, WHITE)
-            self.screen.blit(em_txt, (WIDTH-320, GRID_H*TILE+32))
+            lines.append((self.font, f'Enemy Mana: {em}/{getattr(self.enemy,"max_mana",0)}', WHITE, (WIDTH-320, GRID_H*TILE+32)))
+        if self.menu_state == 'IN_GAME' and hasattr(self, 'enemy'):
+            # latency AI giliran terakhir (merah jika melewati budget satu frame)
+            ai_color = RED if self.last_ai_ms > AI_FRAME_BUDGET_MS else WHITE
+            lines.append((self.font, f'Enemies: {self.enemies_remaining()} | AI: {self.last_ai_ms:.1f} ms', ai_color, (WIDTH-320, GRID_H*TILE+56)))
+        if self.ai_pending is not None:
+            waited_ticks = int((time.perf_counter() - self.ai_pending[1]) * FPS)
+            dots = '.' * (waited_ticks // THINK_DOT_TICKS % 4)
+            lines.append((self.font, f'AI berpikir{dots}', YELLOW, (WIDTH-320, GRID_H*TILE+80)))
+        return lines
+
+    def ui_ops(self):
+        panel = pygame.Rect(0, GRID_H*TILE, WIDTH, 120)
+        lines = self.ui_lines()
+        sig = tuple((text, color, pos) for font, text, color, pos in lines)
+        return [('ui', panel, sig, lambda scr: self.draw_ui(lines))]
 
-    def update(self):
+    def draw_ui(self, lines=None):
+        panel = pygame.Rect(0, GRID_H*TILE, WIDTH, 120)
+        pygame.draw.rect(self.screen, DARK, panel)
+        for font, text, color, pos in (lines if lines is not None else self.ui_lines()):
+            self.screen.blit(self.text(font, text, color), pos)
+
+    def debug_lines(self):
+        # teks overlay di-refresh tiap DEBUG_REFRESH_S agar terbaca dan tidak memaksa redraw tiap frame
+        now = time.perf_counter()
+        stamp, lines = self.debug_cache
+        if lines is not None and now - stamp < DEBUG_REFRESH_S:
+            return lines
+        tc = self.text_cache
+        if self.frame_times:
+            p50, p95, p99 = np.percentile(np.fromiter(self.frame_times, float), (50, 95, 99))
+            frame_txt = f'Frame: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f} ms  (n={len(self.frame_times)})'
+        else:
+            frame_txt = 'Frame: -'
+        ci = fuzzy.mamdani_cache_info()
+        lookups = ci.hits + ci.misses
+        hit_rate = f'{100.0 * ci.hits / lookups:.1f}%' if lookups else '-'
+        backend = getattr(self, 'last_ai_backend', '-')
+        method = (self.forced_inference or 'mamdani') if getattr(self, 'use_fuzzy', True) else 'non-fuzzy'
+        lines = [
+            frame_txt,
+            f'AI turn: {getattr(self, "last_ai_ms", 0.0):.2f} ms  last enemy_action: {getattr(self, "last_action_ms", 0.0):.3f} ms',
+            f'AI: {method} via {getattr(self, "last_ai_source", "-")}',
+            f'AI backend: {backend}',
+            f'Fuzzy cache: {hit_rate} hit  ({ci.hits}/{lookups}, size {ci.currsize})',
+            f'Text render: {tc.last_frame_renders}/frame  total {tc.renders}  hits {tc.hits}',
+            f'Text cache: {len(tc.entries)}/{tc.maxsize}  evict {tc.evictions}',
+        ]
+        self.debug_cache = (now, lines)
+        return lines
+
+    def debug_rect(self, lines):
+        return pygame.Rect(4, 4, 400, 18 * len(lines) + 6)
+
+    def draw_debug_overlay(self, lines=None):
+        lines = lines if lines is not None else self.debug_lines()
+        rect = self.debug_rect(lines)
+        pygame.draw.rect(self.screen, BLACK, rect)
+        pygame.draw.rect(self.screen, GRAY, rect, 1)
+        for i, line in enumerate(lines):
+            # sengaja tidak lewat text_cache supaya overlay tidak ikut menghitung dirinya sendiri
+            self.screen.blit(self.font.render(line, True, GREEN), (rect.x + 6, rect.y + 4 + i * 18))
+
+    def debug_ops(self):
+        if not self.show_debug:
+            return []
+        lines = self.debug_lines()
+        return [('debug', self.debug_rect(lines), tuple(lines), lambda scr: self.draw_debug_overlay(lines))]
+
+    def frame_ops(self):
+        # urutan sama dengan gambar penuh: units -> cursor -> panel UI -> debug overlay
+        return self.unit_ops() + self.cursor_ops() + self.ui_ops() + self.debug_ops()
+
+    def update(self, ticks=1):
+        # ticks: jumlah tick 1/FPS yang lewat sejak update terakhir (idle mode bisa > 1 atau 0)
         if self.menu_state == 'IN_GAME':
-            if not getattr(self, 'victory', False) and hasattr(self, 'enemy') and not self.enemy.alive:
+            self.poll_ai()
+        if self.menu_state == 'IN_GAME':
+            if not getattr(self, 'victory', False) and hasattr(self, 'enemy') and self.enemies_remaining() == 0:
                 if self.stage_index < self.max_stages - 1:
                     self.stage_index += 1
                     self.spawn_enemy(self.stage_index)
@@ -946,31 +1959,7 @@ class Game:
                 else:
                     self.victory = True
                     self.message = 'SEMUA MUSUH DIKALAHKAN! Tekan R untuk restart.'
-            self.player_idle_anim.update()
-            # advance zombie animation if present and current enemy is zombie
-            if getattr(self, 'zombie_frames', None) and getattr(self, 'enemy_type', None) == 'Zombie' and getattr(self, 'enemy', None) and self.enemy.alive:
-                self.zombie_anim_timer += 1
-                if self.zombie_anim_timer >= self.zombie_anim_speed:
-                    self.zombie_anim_timer = 0
-                    self.zombie_anim_index = (self.zombie_anim_index + 1) % len(self.zombie_frames)
-            # advance skeleton animation if present and current enemy is skeleton
-            if getattr(self, 'skeleton_frames', None) and getattr(self, 'enemy_type', None) == 'Skeleton' and getattr(self, 'enemy', None) and self.enemy.alive:
-                self.skeleton_anim_timer += 1
-                if self.skeleton_anim_timer >= self.skeleton_anim_speed:
-                    self.skeleton_anim_timer = 0
-                    self.skeleton_anim_index = (self.skeleton_anim_index + 1) % len(self.skeleton_frames)
-            # advance enderman animation if present and current enemy is enderman
-            if getattr(self, 'enderman_frames', None) and getattr(self, 'enemy_type', None) == 'Enderman' and getattr(self, 'enemy', None) and self.enemy.alive:
-                self.enderman_anim_timer += 1
-                if self.enderman_anim_timer >= self.enderman_anim_speed:
-                    self.enderman_anim_timer = 0
-                    self.enderman_anim_index = (self.enderman_anim_index + 1) % len(self.enderman_frames)
-            # advance boss animation if present and current enemy is boss
-            if getattr(self, 'boss_frames', None) and getattr(self, 'enemy_type', None) == 'Boss' and getattr(self, 'enemy', None) and self.enemy.alive:
-                self.boss_anim_timer += 1
-                if self.boss_anim_timer >= self.boss_anim_speed:
-                    self.boss_anim_timer = 0
-                    self.boss_anim_index = (self.boss_anim_index + 1) % len(self.boss_frames)
+            self.anim.advance(ticks)
 
     # helper pathfinder: BFS mengembalikan path dari start ke goal (list of nodes) atau None
     def find_path(self, start, goal, obstacles):
@@ -993,29 +1982,137 @@ class Game:
                 q.append((nn, path + [nn]))
         return None
 
-    def run(self):
+    # --- idle mode: hitung tick yang lewat & tunggu event sampai frame animasi berikutnya ---
+    def ticks_until_next_frame(self):
+        # None -> tidak ada animasi (menu/result): cukup tunggu input
+        if self.menu_state != 'IN_GAME':
+            return None
+        ticks = self.anim.ticks_until_next()
+        if self.ai_pending is not None:
+            # bangun berkala untuk indikator "berpikir" dan cek timeout
+            ticks = THINK_DOT_TICKS if ticks is None else min(ticks, THINK_DOT_TICKS)
+        return ticks
+
+    def elapsed_ticks(self, tick_ms):
+        now = time.perf_counter() * 1000.0
+        if self.menu_state != 'IN_GAME':
+            self.tick_time = now
+            return 0
+        ticks = int((now - self.tick_time) // tick_ms)
+        if ticks > FPS:
+            # jeda panjang (window di-drag, dsb): jangan kejar ribuan tick sekaligus
+            self.tick_time = now
+            return FPS
+        self.tick_time += ticks * tick_ms
+        return ticks
+
+    def wait_events(self, tick_ms):
+        ticks = self.ticks_until_next_frame()
+        if ticks is None:
+            first = pygame.event.wait()
+        else:
+            due = self.tick_time + ticks * tick_ms
+            timeout = max(1, int(math.ceil(due - time.perf_counter() * 1000.0)))
+            first = pygame.event.wait(timeout)
+        events = [first] if first.type != pygame.NOEVENT else []
+        events += pygame.event.get()
+        if any(e.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED) for e in events):
+            self.renderer.invalidate()
+        return events
+
+    def draw_frame(self):
+        if self.menu_state == 'MAIN':
+            self.draw_main_menu()
+        elif self.menu_state == 'SELECT_USE_FUZZY':
+            self.draw_use_fuzzy_menu()
+        elif self.menu_state == 'SELECT_INFER':
+            self.draw_infer_menu()
+        elif self.menu_state == 'INPUT_INTERVAL':
+            self.draw_interval_menu()
+        elif self.menu_state == 'RESULT':
+            self.draw_result()
+        else:
+            # in-game: hanya area yang berubah yang digambar & dikirim ke display
+            rects = self.renderer.render(self.frame_ops())
+            if rects:
+                pygame.display.update(rects)
+            return
+        if self.show_debug:
+            self.draw_debug_overlay()
+        self.renderer.invalidate()
+        pygame.display.flip()
+
+    def shutdown(self):
+        if self.ai_worker is not None:
+            self.ai_worker.shutdown()
+        if self.recorder is not None:
+            self.recorder.close()
+        if instrument.enabled():
+            self.dump_instrumentation()
+
+    def run_script(self, script):
+        # satu tick per frame tanpa menunggu clock: hasil sama tiap run, secepat mesin mampu
+        while not script.done():
+            t0 = time.perf_counter()
+            if self.ai_pending is not None:
+                # AI async: tunggu keputusan dulu supaya urutan input vs giliran musuh tetap
+                wait_futures([self.ai_pending[0]], timeout=AI_TIMEOUT_S)
+            self.text_cache.new_frame()
+            self.handle_input(script.next_events())
+            self.update(1)
+            self.draw_frame()
+            self.frame_times.append((time.perf_counter() - t0) * 1000.0)
+        self.shutdown()
+
+    def run(self, script=None):
+        if script is not None:
+            return self.run_script(script)
+        tick_ms = 1000.0 / FPS
+        self.tick_time = time.perf_counter() * 1000.0
+        events = None
+        if IDLE_WAIT:
+            # game tidak memakai gerakan mouse; jangan bangun hanya karena mouse bergeser
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
         while True:
-            self.handle_input()
-            self.update()
-            if self.menu_state == 'MAIN':
-                self.draw_main_menu()
-            elif self.menu_state == 'SELECT_USE_FUZZY':
-                self.draw_use_fuzzy_menu()
-            elif self.menu_state == 'SELECT_INFER':
-                self.draw_infer_menu()
-            elif self.menu_state == 'INPUT_INTERVAL':
-                self.draw_interval_menu()
-            elif self.menu_state == 'RESULT':
-                self.draw_result()
-            else:
-                # in-game
-                self.screen.fill(DARK)
-                self.draw_grid()
-                self.draw_units()
-                self.draw_cursor()
-                self.draw_ui()
-            pygame.display.flip()
+            t0 = time.perf_counter()
+            self.text_cache.new_frame()
+            self.handle_input(events)
+            self.update(self.elapsed_ticks(tick_ms) if IDLE_WAIT else 1)
+            self.draw_frame()
+            self.frame_times.append((time.perf_counter() - t0) * 1000.0)
             self.clock.tick(FPS)
+            if IDLE_WAIT:
+                events = self.wait_events(tick_ms)
+
+def main(argv=None):
+    global AI_ASYNC
+    ap = argparse.ArgumentParser(description="Turn-based fuzzy AI demo")
+    ap.add_argument("--script", nargs='?', const='default', default=None, metavar='FILE',
+                    help="jalankan input terjadwal dari file JSON (tanpa FILE: DEFAULT_SCRIPT)")
+    ap.add_argument("--profile", action="store_true",
+                    help="profile game loop; tulis profile_main.{pstats,collapsed} ke experiments_out")
+    ap.add_argument("--headless", action="store_true", help="SDL dummy video driver (tanpa window)")
+    ap.add_argument("--ai-params", default=None, metavar='FILE',
+                    help="parameter AI per tipe musuh (JSON, mis. best.json dari selfplay.py)")
+    args = ap.parse_args(argv)
+    if args.ai_params:
+        with open(args.ai_params) as f:
+            apply_ai_params(json.load(f))
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    if args.profile:
+        # inference di thread utama supaya ikut tercatat profiler
+        AI_ASYNC = False
+    game = Game()
+    script = None
+    if args.script is not None:
+        script = ScriptedInput(DEFAULT_SCRIPT) if args.script == 'default' else ScriptedInput.load(args.script)
+    if args.profile:
+        import profiling
+        profiling.run_profiled(lambda: game.run(script), 'profile_main')
+    else:
+        game.run(script)
 
 if __name__ == '__main__':
-    Game().run()
\ No newline at end of file
+    main()
\ No newline at end of file
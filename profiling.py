@@ -0,0 +1,102 @@
+"""
+Profiling — jalankan satu workload di bawah cProfile + sampling profiler
+- <name>.pstats: data cProfile (buka dengan pstats / snakeviz)
+- <name>.collapsed: stack hasil sampling format "a;b;c jumlah", siap untuk
+  flamegraph.pl / speedscope / inferno
+- Sampler berjalan di thread terpisah dan mengambil stack thread pemanggil lewat
+  sys._current_frames(); frame di atas run_profiled tidak ikut dicatat
+
+Contoh:
+  import profiling, experiments
+  profiling.run_profiled(experiments.run_all, 'profile_experiments')
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+OUT_DIR = "experiments_out"
+SAMPLE_INTERVAL_S = 0.001
+TOP_N = 25                 # baris ringkasan cumulative yang dicetak setelah selesai
+
+def frame_label(code):
+    # "modul:fungsi" — pendek dan tanpa spasi supaya aman untuk semua tool flamegraph
+    mod = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{mod}:{code.co_name}"
+
+class StackSampler:
+    """Catat stack satu thread tiap `interval` detik; counts: stack (root;..;leaf) -> jumlah sampel."""
+    def __init__(self, interval=SAMPLE_INTERVAL_S, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.counts = {}
+        self.samples = 0
+        self.anchor = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._labels = {}    # code object -> label (cache, sampling harus murah)
+
+    def start(self, anchor=None):
+        # anchor: frame pemanggil; stack berhenti di sini (frame profiler tidak ikut)
+        self.anchor = anchor
+        self._thread = threading.Thread(target=self._loop, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = frame_label(code)
+        return label
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.anchor:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if not stack:
+                continue
+            key = ';'.join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as f:
+            for stack, n in sorted(self.counts.items()):
+                f.write(f"{stack} {n}\n")
+
+def run_profiled(fn, name, out_dir=OUT_DIR, interval=SAMPLE_INTERVAL_S, top=TOP_N):
+    """
+    Jalankan fn() di bawah cProfile dan StackSampler sekaligus; hasil tetap ditulis
+    walau fn keluar lewat exception/SystemExit. Return nilai fn().
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, name)
+    # switch interval kecil supaya thread sampler dapat GIL mendekati interval sampling
+    old_switch = sys.getswitchinterval()
+    sys.setswitchinterval(min(old_switch, interval / 2))
+    sampler = StackSampler(interval)
+    prof = cProfile.Profile()
+    t0 = time.perf_counter()
+    sampler.start(sys._getframe())
+    prof.enable()
+    try:
+        return fn()
+    finally:
+        prof.disable()
+        sampler.stop()
+        sys.setswitchinterval(old_switch)
+        elapsed = time.perf_counter() - t0
+        prof.dump_stats(base + '.pstats')
+        sampler.write_collapsed(base + '.collapsed')
+        pstats.Stats(prof, stream=sys.stderr).sort_stats('cumulative').print_stats(top)
+        print(f"profile: {elapsed:.2f} s, {sampler.samples} sampel -> {base}.pstats, {base}.collapsed",
+              file=sys.stderr)
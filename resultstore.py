@@ -0,0 +1,75 @@
+"""
+Result store eksperimen — skor inference per titik grid, kolumnar dan memory-mapped
+- Satu direktori per (sumbu grid, interval set, versi fuzzy.py): satu <metode>.npy per
+  metode berbentuk (etype, ph, eh, mana) plus done.npy (mask titik yang sudah dihitung)
+- Scenario berikutnya dan run ulang membaca titik yang sudah ada; hanya shard baru dihitung
+- Hash isi fuzzy.py ikut di key, jadi perubahan kode inference otomatis memakai store baru
+- root=None: array biasa di memori (store dimatikan), API sama
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+import fuzzy
+
+METHODS = ('mamdani', 'sugeno', 'tsukamoto')
+GRID_AXES = ('etype', 'ph', 'eh', 'mana')
+
+def fuzzy_version():
+    with open(fuzzy.__file__, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+def store_key(axes, intervals):
+    blob = json.dumps({'axes': axes, 'intervals': intervals, 'fuzzy': fuzzy_version()}, sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+class ScoreStore:
+    """
+    axes: dict 'etype', 'ph', 'eh', 'mana' -> list nilai, 'cd' -> nilai skalar.
+    Satuan baca/tulis adalah shard (etype, ph): semua titik eh x mana untuk pasangan itu.
+    """
+    def __init__(self, root, axes, intervals=None):
+        self.axes = axes
+        shape = tuple(len(axes[k]) for k in GRID_AXES)
+        self.path = None
+        if root is None:
+            self.cols = {m: np.zeros(shape) for m in METHODS}
+            self.done = np.zeros(shape, dtype='u1')
+            return
+        self.path = os.path.join(root, store_key(axes, intervals))
+        meta = os.path.join(self.path, 'meta.json')
+        # meta.json ditulis terakhir: tanpa meta berarti store belum lengkap dibuat -> buat ulang
+        mode = 'r+' if os.path.exists(meta) else 'w+'
+        os.makedirs(self.path, exist_ok=True)
+        self.cols = {m: open_memmap(os.path.join(self.path, m + '.npy'), mode=mode, dtype='<f8', shape=shape)
+                     for m in METHODS}
+        self.done = open_memmap(os.path.join(self.path, 'done.npy'), mode=mode, dtype='u1', shape=shape)
+        if mode == 'w+':
+            self.flush()
+            with open(meta, 'w') as f:
+                json.dump({'axes': axes, 'intervals': intervals, 'fuzzy': fuzzy_version(),
+                           'methods': list(METHODS)}, f, indent=2)
+
+    def has(self, e, p):
+        return bool(self.done[e, p].all())
+
+    def read(self, e, p):
+        """dict metode -> array 1-D skor shard (e, p), urutan eh lalu mana."""
+        return {m: np.asarray(self.cols[m][e, p]).ravel() for m in METHODS}
+
+    def write(self, e, p, scores):
+        # scores: list dict hasil get_all_scores, urutan eh lalu mana
+        n_eh, n_mana = self.done.shape[2:]
+        for m in METHODS:
+            self.cols[m][e, p] = np.array([sc[m] for sc in scores], dtype=float).reshape(n_eh, n_mana)
+        self.done[e, p] = 1
+
+    def flush(self):
+        if self.path is None:
+            return
+        for col in self.cols.values():
+            col.flush()
+        self.done.flush()
@@ -0,0 +1,444 @@
+"""
+Self-play tuning — algoritma evolusi untuk parameter AI tiap tipe musuh
+- Genome per tipe: interval membership (fuzzy.get_membership_*), batas heal
+  (fuzzy.HEAL_THRESHOLDS, hanya Enderman/Boss) dan cut-off behavior (fuzzy.BEHAVIOR_CUTS)
+- Fitness: win rate player scripted (PLAYER_POLICIES) pada battle headless (Game.headless
+  + aturan game yang sama dengan main.py), dibandingkan dengan --target; battle ke-i memakai
+  seed yang sama untuk semua genome supaya perbandingan adil; generasi yang semua genome-nya
+  memberi hasil identik dilaporkan (fitness datar)
+- Tiap generasi: elit dipertahankan, sisanya anak (turnamen + crossover per key + mutasi);
+  battle dijalankan di process pool, genome yang sudah pernah dinilai diambil dari cache
+- Checkpoint per generasi di <out>/<name>/gen_NNN.json (populasi, fitness, cache, state rng);
+  --resume melanjutkan dari checkpoint terakhir
+
+Pemakaian:
+  python selfplay.py --target 0.5 --generations 10 --workers 4
+  python selfplay.py --etypes Boss --population 24 --resume
+  python main.py --ai-params experiments_out/selfplay/selfplay/best.json
+Catatan: dengan interval kustom, Mamdani memakai Sugeno (lihat fuzzy.mamdani_*), jadi default
+--method sugeno supaya genome default sama dengan game bawaan.
+"""
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import copy
+import glob
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import fuzzy
+import main
+import tablewriter
+import tune
+
+OUT_DIR = os.path.join("experiments_out", "selfplay")
+ETYPES = ['Zombie', 'Skeleton', 'Enderman', 'Boss']
+# grup interval (tune.GROUPS) yang di-tune per tipe; cd game selalu 5, mana player selalu 0
+INTERVAL_GROUPS = {
+    'Zombie': ['hp', 'cd_z'],
+    'Skeleton': ['hp', 'cd_z'],
+    'Enderman': ['hp_p', 'hp_b', 'mana', 'cd'],
+    'Boss': ['hp_p', 'hp_b', 'mana', 'cd'],
+}
+PLAYER_POLICIES = ('aggressive', 'cautious', 'erratic')
+HEAL_BELOW = 8             # cautious/erratic: heal jika HP player <= ini
+ERRATIC_EPS = 0.25         # erratic: peluang aksi acak
+MAX_TURNS = 60             # lewat dari ini: seri (dihitung kalah bagi player)
+POPULATION = 16
+GENERATIONS = 10
+ELITE = 4
+TOURNAMENT = 3
+BATTLES = 12
+MUT_RATE = 0.3             # peluang tiap key interval dimutasi
+MUT_JITTER = 0.1           # lebar mutasi interval (x lebar universe, lihat tune.perturb)
+MUT_SIGMA = 5.0            # sd mutasi cut-off / batas heal
+HP_WEIGHT = 0.05           # bobot tie-break HP player pada fitness
+
+def code_version():
+    # aturan battle (main.py) dan inference (fuzzy.py) ikut menentukan fitness
+    h = hashlib.sha1()
+    for mod in (fuzzy, main):
+        with open(mod.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+def interval_keys(etype):
+    return [k for g in INTERVAL_GROUPS[etype] for k in tune.GROUPS[g]]
+
+def heal_hp_max(etype):
+    # batas HP heal dibandingkan dengan HP mentah unit (bukan universe 0-100): di atas HP maks
+    # tipe ini batasnya selalu terpenuhi, jadi genome dibatasi ke HP maks supaya mutasi berpengaruh
+    return main.ENEMY_STATS[etype][0]
+
+def default_genome(etype):
+    defaults = tune.default_intervals()
+    genome = {'intervals': {k: list(defaults[k]) for k in interval_keys(etype)},
+              'cuts': list(fuzzy.BEHAVIOR_CUTS[etype])}
+    if etype in fuzzy.HEAL_THRESHOLDS:
+        hp, mana = fuzzy.HEAL_THRESHOLDS[etype]
+        genome['heal'] = [min(hp, heal_hp_max(etype)), mana]
+    return genome
+
+def genome_key(etype, genome, config):
+    blob = json.dumps({'etype': etype, 'genome': genome, 'config': config, 'code': code_version()},
+                      sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+def mutate(rng, genome, rate=MUT_RATE, jitter=MUT_JITTER, sigma=MUT_SIGMA, heal_max=100):
+    out = copy.deepcopy(genome)
+    for k, params in out['intervals'].items():
+        if rng.random() < rate:
+            out['intervals'][k] = tune.perturb(rng, k, params, jitter)
+    if rng.random() < rate:
+        weak, strong = sorted(float(np.clip(c + rng.normal(0, sigma), 1, 99)) for c in out['cuts'])
+        out['cuts'] = [round(weak, 1), round(max(strong, weak + 1), 1)]
+    if 'heal' in out and rng.random() < rate:
+        out['heal'] = [round(float(np.clip(v + rng.normal(0, sigma), 0, hi)), 1)
+                       for v, hi in zip(out['heal'], (heal_max, 100))]
+    return out
+
+def crossover(rng, a, b):
+    # per key interval, lalu cuts dan heal sebagai satu kesatuan
+    child = {'intervals': {k: list(a['intervals'][k] if rng.random() < 0.5 else b['intervals'][k])
+                           for k in a['intervals']}}
+    for field in ('cuts', 'heal'):
+        if field in a:
+            child[field] = list(a[field] if rng.random() < 0.5 else b[field])
+    return child
+
+# --- battle headless ---
+class ai_params:
+    """Pasang genome ke global AI (main.AI_INTERVALS, fuzzy.*) selama blok with, lalu kembalikan."""
+    def __init__(self, etype, genome):
+        self.etype = etype
+        self.genome = genome
+
+    def __enter__(self):
+        self.saved = (dict(main.AI_INTERVALS), dict(fuzzy.HEAL_THRESHOLDS), dict(fuzzy.BEHAVIOR_CUTS))
+        main.AI_INTERVALS.pop(self.etype, None)
+        main.apply_ai_params({self.etype: self.genome})
+
+    def __exit__(self, *exc):
+        for target, saved in zip((main.AI_INTERVALS, fuzzy.HEAL_THRESHOLDS, fuzzy.BEHAVIOR_CUTS), self.saved):
+            target.clear()
+            target.update(saved)
+        main.ai_params_changed()
+
+def new_battle(etype, method, rng):
+    game = main.Game.headless()
+    game.ai_worker = None
+    game.ai_pending = None
+    game.forced_inference = method
+    game.turn_no = 0
+    game.last_ai_ms = game.last_action_ms = 0.0
+    game.last_ai_source = '-'
+    game.last_ai_backend = '-'
+    game.player = main.Unit(1, int(rng.integers(main.GRID_H)), main.PLAYER_MAX_HP, main.PLAYER_ATK, 'PLAYER',
+                            mana=main.PLAYER_MANA, mana_regen=main.PLAYER_MANA_REGEN)
+    game.enemy_type = etype
+    game.wave_queue = []
+    game.enemy = game.make_enemy(etype, main.GRID_W - 2, int(rng.integers(main.GRID_H)))
+    game.enemies = [game.enemy]
+    game.units = [game.player, game.enemy]
+    game.menu_state = 'IN_GAME'
+    game.turn = 'PLAYER'
+    game.mode = 'IDLE'
+    game.cursor = [0, 0]
+    game.move_targets = set()
+    return game
+
+def in_line(src, dst, reach=2):
+    # target ranged player: satu baris/kolom, paling jauh reach petak
+    return (src[0] == dst[0] or src[1] == dst[1]) and 0 < main.manhattan(src, dst) <= reach
+
+def player_turn(game, policy, rng):
+    """Satu aksi player scripted lewat aturan input game (confirm_action / player_heal / end_turn)."""
+    p = game.player
+    ppos = p.pos()
+    target = min(game.alive_enemies(), key=lambda e: (main.manhattan(e.pos(), ppos), e.y, e.x))
+    if policy != 'aggressive' and p.hp <= HEAL_BELOW and p.mana >= main.PLAYER_HEAL_COST:
+        game.player_heal()
+        return
+    if policy == 'erratic' and rng.random() < ERRATIC_EPS:
+        choice = rng.integers(3)
+        if choice == 0:
+            game.end_turn()
+            return
+        if choice == 1:
+            cells = sorted(main.bfs_reachable(ppos, main.MOVE_RANGE, {e.pos() for e in game.alive_enemies()}) - {ppos})
+            if cells:
+                game.mode = 'MOVE'
+                game.move_targets = set(cells)
+                game.cursor = list(cells[rng.integers(len(cells))])
+                game.confirm_action()
+                return
+    if main.manhattan(ppos, target.pos()) == 1:
+        game.mode = 'ATTACK'
+        game.cursor = list(target.pos())
+        game.confirm_action()
+        return
+    if p.mana >= main.RANGED_COST and in_line(ppos, target.pos()):
+        game.mode = 'RANGED'
+        game.cursor = list(target.pos())
+        game.confirm_action()
+        return
+    cells = main.bfs_reachable(ppos, main.MOVE_RANGE, {e.pos() for e in game.alive_enemies()}) - {ppos}
+    if not cells:
+        game.end_turn()
+        return
+    game.mode = 'MOVE'
+    game.move_targets = cells
+    game.cursor = list(min(cells, key=lambda c: (main.manhattan(c, target.pos()), c[1], c[0])))
+    game.confirm_action()
+
+def play_battle(etype, method, policy, seed, max_turns=MAX_TURNS):
+    """Return (player menang?, jumlah giliran, HP player tersisa)."""
+    rng = np.random.default_rng(seed)
+    game = new_battle(etype, method, rng)
+    turns = 0
+    while game.menu_state == 'IN_GAME' and turns < max_turns:
+        player_turn(game, policy, rng)
+        turns += 1
+    won = game.menu_state == 'RESULT' and game.result_info.get('winner') == 'PLAYER'
+    return won, turns, max(0, game.player.hp)
+
+def evaluate_genome(etype, genome, config):
+    """Battle ke-i: policy PLAYER_POLICIES[i % 3], seed (config seed, i) — sama untuk semua genome."""
+    wins, turns, hp_left = 0, 0, 0
+    with ai_params(etype, genome):
+        for i in range(config['battles']):
+            policy = PLAYER_POLICIES[i % len(PLAYER_POLICIES)]
+            won, t, hp = play_battle(etype, config['method'], policy, [config['seed'], i], config['max_turns'])
+            wins += won
+            turns += t
+            hp_left += hp
+    n = config['battles']
+    return {'win_rate': wins / n, 'turns': turns / n, 'player_hp': hp_left / n}
+
+def _evaluate_task(args):
+    return evaluate_genome(*args)
+
+def fitness(result, target):
+    # lebih besar lebih baik: 0 jika win rate tepat sama dengan target. Pada win rate yang sama,
+    # HP sisa player jadi tie-break ke arah target (bobot < 1 battle, jadi tidak mengalahkan win rate)
+    gap = result['win_rate'] - target
+    hp = result['player_hp'] / main.PLAYER_MAX_HP
+    return -abs(gap) - HP_WEIGHT * (hp if gap > 0 else 1 - hp if gap < 0 else 0)
+
+# --- checkpoint ---
+def checkpoint_path(run_dir, gen):
+    return os.path.join(run_dir, f'gen_{gen:03d}.json')
+
+def latest_checkpoint(run_dir):
+    paths = sorted(glob.glob(os.path.join(run_dir, 'gen_*.json')))
+    if not paths:
+        return None
+    with open(paths[-1]) as f:
+        return json.load(f)
+
+def history_rows(run_dir, last_gen):
+    """Baris history.csv dari checkpoint gen_000..last_gen (juga generasi dari run sebelum --resume)."""
+    rows = []
+    for gen in range(last_gen + 1):
+        path = checkpoint_path(run_dir, gen)
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            evo = Evolution.from_checkpoint(json.load(f))
+        for etype in evo.etypes:
+            _, res = evo.best(etype)
+            rows.append([gen, etype, res['win_rate'], res['turns'], res['player_hp'], fitness(res, evo.target)])
+    return rows
+
+def save_checkpoint(run_dir, state):
+    path = checkpoint_path(run_dir, state['generation'])
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+    return path
+
+class Evolution:
+    """Populasi per tipe musuh, dievaluasi bersama tiap generasi supaya pool selalu penuh."""
+    def __init__(self, etypes, config, target, population=POPULATION, elite=ELITE, seed=0):
+        self.etypes = etypes
+        self.config = config
+        self.target = target
+        self.population = population
+        self.elite = elite
+        self.rng = np.random.default_rng(seed)
+        self.generation = 0
+        self.cache = {}
+        # generasi 0: genome default + mutasinya
+        self.pops = {}
+        for etype in etypes:
+            base = default_genome(etype)
+            self.pops[etype] = [base] + [mutate(self.rng, base, rate=0.5, heal_max=heal_hp_max(etype))
+                                         for _ in range(population - 1)]
+        self.results = {}
+
+    @classmethod
+    def from_checkpoint(cls, state):
+        evo = cls.__new__(cls)
+        evo.etypes = state['etypes']
+        evo.config = state['config']
+        evo.target = state['target']
+        evo.population = state['population']
+        evo.elite = state['elite']
+        evo.rng = np.random.default_rng()
+        evo.rng.bit_generator.state = state['rng']
+        evo.generation = state['generation']
+        evo.cache = state['cache']
+        evo.pops = state['populations']
+        evo.results = state['results']
+        return evo
+
+    def state(self):
+        return {'generation': self.generation, 'etypes': self.etypes, 'config': self.config,
+                'target': self.target, 'population': self.population, 'elite': self.elite,
+                'rng': self.rng.bit_generator.state, 'populations': self.pops, 'results': self.results,
+                'cache': self.cache, 'code': code_version()}
+
+    def evaluate(self, executor=None):
+        """Isi self.results[etype] (sejajar populasi); return jumlah genome yang benar-benar di-battle."""
+        keys = {e: [genome_key(e, g, self.config) for g in self.pops[e]] for e in self.etypes}
+        todo, seen = [], set()
+        for e in self.etypes:
+            for g, k in zip(self.pops[e], keys[e]):
+                if k not in self.cache and k not in seen:
+                    seen.add(k)
+                    todo.append((k, (e, g, self.config)))
+        tasks = [args for _, args in todo]
+        if executor is None:
+            results = [_evaluate_task(t) for t in tasks]
+        else:
+            results = list(executor.map(_evaluate_task, tasks))
+        for (k, _), res in zip(todo, results):
+            self.cache[k] = res
+        self.results = {e: [self.cache[k] for k in keys[e]] for e in self.etypes}
+        return len(todo)
+
+    def flat_types(self):
+        """Tipe yang semua genome-nya (lebih dari satu yang berbeda) memberi hasil battle identik."""
+        flat = []
+        for etype in self.etypes:
+            res = self.results[etype]
+            genomes = {json.dumps(g, sort_keys=True) for g in self.pops[etype]}
+            if len(genomes) > 1 and all(r == res[0] for r in res):
+                flat.append(etype)
+        return flat
+
+    def ranked(self, etype):
+        # index populasi terurut fitness terbaik dulu (seri: index lebih kecil, jadi deterministik)
+        res = self.results[etype]
+        return sorted(range(len(res)), key=lambda i: (-fitness(res[i], self.target), i))
+
+    def best(self, etype):
+        i = self.ranked(etype)[0]
+        return self.pops[etype][i], self.results[etype][i]
+
+    def next_generation(self):
+        for etype in self.etypes:
+            order = self.ranked(etype)
+            pop = self.pops[etype]
+            fit = [fitness(r, self.target) for r in self.results[etype]]
+            children = [pop[i] for i in order[:self.elite]]
+
+            def pick():
+                idx = self.rng.choice(len(pop), size=TOURNAMENT, replace=False)
+                return pop[max(idx, key=lambda i: (fit[i], -i))]
+
+            while len(children) < self.population:
+                children.append(mutate(self.rng, crossover(self.rng, pick(), pick()), heal_max=heal_hp_max(etype)))
+            self.pops[etype] = children
+        self.generation += 1
+
+def main_cli(argv=None):
+    ap = argparse.ArgumentParser(description="Evolutionary self-play tuning of enemy AI parameters")
+    ap.add_argument("--etypes", default=','.join(ETYPES))
+    ap.add_argument("--target", type=float, default=0.5, help="win rate player yang dituju (0-1)")
+    ap.add_argument("--generations", type=int, default=GENERATIONS)
+    ap.add_argument("--population", type=int, default=POPULATION)
+    ap.add_argument("--elite", type=int, default=ELITE)
+    ap.add_argument("--battles", type=int, default=BATTLES, help="battle per genome")
+    ap.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    ap.add_argument("--method", default='sugeno', choices=['mamdani', 'sugeno', 'tsukamoto'])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--name", default='selfplay')
+    ap.add_argument("--out", default=OUT_DIR)
+    ap.add_argument("--resume", action="store_true", help="lanjutkan dari checkpoint terakhir <out>/<name>")
+    args = ap.parse_args(argv)
+
+    run_dir = os.path.join(args.out, args.name)
+    os.makedirs(run_dir, exist_ok=True)
+    state = latest_checkpoint(run_dir) if args.resume else None
+    if state is not None:
+        if state['code'] != code_version():
+            print("peringatan: main.py/fuzzy.py berubah sejak checkpoint; fitness lama tidak dipakai ulang")
+        evo = Evolution.from_checkpoint(state)
+        # checkpoint sudah dievaluasi; maju hanya jika masih ada generasi yang belum jalan
+        # (jika tidak, pops anak baru tidak sejajar dengan results generasi checkpoint)
+        if evo.generation + 1 < args.generations:
+            evo.next_generation()
+            print(f"melanjutkan {run_dir} dari generasi {evo.generation}")
+        else:
+            print(f"{run_dir} sudah sampai generasi {evo.generation}; hanya menulis ulang best.json/history")
+    else:
+        etypes = [e for e in args.etypes.split(',') if e]
+        bad = set(etypes) - set(ETYPES)
+        if bad:
+            ap.error(f"etype tidak dikenal: {', '.join(sorted(bad))}")
+        if not 0 < args.elite < args.population:
+            ap.error("--elite harus di antara 0 dan --population")
+        config = {'battles': args.battles, 'method': args.method, 'seed': args.seed, 'max_turns': args.max_turns}
+        evo = Evolution(etypes, config, args.target, args.population, args.elite, args.seed)
+
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    history = os.path.join(run_dir, 'history')
+    pending = state is None or evo.generation > state['generation']
+    try:
+        while pending and evo.generation < args.generations:
+            t0 = time.perf_counter()
+            n = evo.evaluate(executor)
+            elapsed = time.perf_counter() - t0
+            line = []
+            for etype in evo.etypes:
+                _, res = evo.best(etype)
+                line.append(f"{etype} wr={res['win_rate']:.2f}")
+            print(f"gen {evo.generation}: {n} genome di-battle ({elapsed:.1f} s); best " + ', '.join(line), flush=True)
+            for etype in evo.flat_types():
+                print(f"peringatan: {etype} generasi {evo.generation}: semua genome memberi hasil battle identik "
+                      f"(fitness datar, seleksi tidak punya arah)", flush=True)
+            save_checkpoint(run_dir, evo.state())
+            if evo.generation + 1 >= args.generations:
+                break
+            evo.next_generation()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    with tablewriter.open_table(run_dir, 'history', ['generation', 'etype', 'win_rate', 'turns',
+                                                     'player_hp', 'fitness']) as w:
+        w.writerows(history_rows(run_dir, evo.generation))
+    best = {}
+    for etype in evo.etypes:
+        genome, res = evo.best(etype)
+        best[etype] = genome
+        print(f"  {etype:9s} win rate {res['win_rate']:.2f} (target {evo.target:.2f}), "
+              f"{res['turns']:.1f} giliran, HP player {res['player_hp']:.1f}; "
+              f"cuts={genome['cuts']}" + (f" heal={genome['heal']}" if 'heal' in genome else ''))
+    path = os.path.join(run_dir, 'best.json')
+    with open(path, 'w') as f:
+        json.dump(best, f, indent=2, sort_keys=True)
+    print(f"best -> {path} (python main.py --ai-params {path}); history -> {history}.csv")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,227 @@
+"""
+Analisis sensitivitas global (Sobol + Morris) untuk controller fuzzy tiap entity dan metode
+- Input: HP_Player, HP_Bot, Mana_Player, Mana_Bot, CD_Player di universe masing-masing
+  (Zombie/Skeleton tidak memakai mana -> indeksnya harus 0, jadi sekaligus sanity check)
+- Sobol: matriks A, B (Sobol quasi-random dari scipy.stats.qmc, fallback random biasa) dan
+  A_B^i; indeks orde-1 (estimator Saltelli 2010) dan total (Jansen), CI 95% via bootstrap
+- Morris: R trajectory one-at-a-time di grid p level; mu*, mu, sigma elementary effect
+  (satuan: skor per satu rentang penuh input)
+- Rule: ablation tiap rule di rule_specs / rule_specs_z (specs=... di get_all_scores_batch)
+  di atas sampel A; rule dengan |delta skor| maksimum <= TOL pada suatu metode = dead
+- Semua titik dihitung lewat fuzzy.get_all_scores_batch per chunk BATCH titik
+- Output di <out>/<name>/: sobol.csv, morris.csv, rules.csv, meta.json
+
+Pemakaian:
+  python sensitivity.py                                  # semua entity, N=2048, R=64
+  python sensitivity.py --etype Boss --samples 8192 --trajectories 256
+  python sensitivity.py --etype Enderman --intervals tuned.json --no-rules
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import fuzzy
+import tablewriter
+
+try:
+    from scipy.stats import qmc
+except Exception:
+    qmc = None
+
+OUT_DIR = os.path.join("experiments_out", "sensitivity")
+ETYPES = ('Zombie', 'Skeleton', 'Enderman', 'Boss')
+METHODS = ('mamdani', 'sugeno', 'tsukamoto')
+INPUTS = ('hp_p', 'hp_b', 'mana_p', 'mana_b', 'cd')
+LO = np.array([0.0, 0.0, 0.0, 0.0, 0.0])
+HI = np.array([100.0, 100.0, 100.0, 100.0, 10.0])
+SAMPLES = 2048             # N Sobol (dibulatkan ke pangkat 2)
+TRAJECTORIES = 64          # R Morris
+LEVELS = 4                 # p Morris
+BOOTSTRAP = 200
+BATCH = 1 << 15            # titik per panggilan get_all_scores_batch
+TOL = 1e-9
+
+def evaluate(etype, u, intervals=None, specs=None):
+    """Titik di unit cube (n, 5) -> skor (n, metode)."""
+    x = LO + u * (HI - LO)
+    out = np.empty((len(x), len(METHODS)))
+    for start in range(0, len(x), BATCH):
+        part = x[start:start + BATCH]
+        res = fuzzy.get_all_scores_batch(etype, *part.T, intervals=intervals, specs=specs)
+        out[start:start + len(part)] = np.column_stack([res[m] for m in METHODS])
+    return out
+
+def sobol_matrices(n, d, seed):
+    """(A, B) berukuran (n, d) di unit cube."""
+    if qmc is not None:
+        m = max(1, int(np.ceil(np.log2(n))))
+        base = qmc.Sobol(2 * d, scramble=True, seed=seed).random_base2(m)
+    else:
+        base = np.random.default_rng(seed).random((n, 2 * d))
+    return base[:, :d], base[:, d:]
+
+def sobol_indices(f_a, f_b, f_ab):
+    """f_a, f_b: (n,); f_ab: (d, n) -> (S1, ST) masing-masing (d,). Varians 0 -> indeks 0."""
+    var = np.var(np.concatenate([f_a, f_b]))
+    if var <= TOL:
+        d = f_ab.shape[0]
+        return np.zeros(d), np.zeros(d)
+    s1 = np.mean(f_b * (f_ab - f_a), axis=1) / var
+    st = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / var
+    return s1, st
+
+def sobol_analysis(etype, n, seed, intervals=None, bootstrap=BOOTSTRAP):
+    d = len(INPUTS)
+    a, b = sobol_matrices(n, d, seed)
+    n = len(a)
+    ab = np.repeat(a[None], d, axis=0)                   # (d, n, d): kolom i diambil dari B
+    for i in range(d):
+        ab[i, :, i] = b[:, i]
+    scores = evaluate(etype, np.concatenate([a, b, ab.reshape(-1, d)]), intervals)
+    f_a, f_b, f_ab = scores[:n], scores[n:2 * n], scores[2 * n:].reshape(d, n, -1)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, size=(bootstrap, n))
+    res = {}
+    for j, m in enumerate(METHODS):
+        s1, st = sobol_indices(f_a[:, j], f_b[:, j], f_ab[:, :, j])
+        boot = [sobol_indices(f_a[k, j], f_b[k, j], f_ab[:, k, j]) for k in idx]
+        s1_ci = 1.96 * np.std([x[0] for x in boot], axis=0)
+        st_ci = 1.96 * np.std([x[1] for x in boot], axis=0)
+        res[m] = (s1, s1_ci, st, st_ci)
+    return res, a, len(scores)
+
+def morris_trajectories(r, d, levels, rng):
+    """(r, d+1, d) titik trajectory, arah (r, d) +-1 dan urutan input (r, d)."""
+    delta = levels / (2.0 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    grid = grid[grid + delta <= 1 + TOL]
+    base = rng.choice(grid, size=(r, d))
+    sign = rng.choice([-1.0, 1.0], size=(r, d))
+    start = np.where(sign < 0, base + delta, base)
+    order = np.argsort(rng.random((r, d)), axis=1)
+    traj = np.repeat(start[:, None, :], d + 1, axis=1)
+    rows = np.arange(r)
+    for j in range(d):
+        step = np.zeros((r, d))
+        step[rows, order[:, j]] = sign[rows, order[:, j]] * delta
+        traj[:, j + 1:] += step[:, None, :]
+    return traj, sign, order, delta
+
+def morris_analysis(etype, r, levels, seed, intervals=None):
+    d = len(INPUTS)
+    traj, sign, order, delta = morris_trajectories(r, d, levels, np.random.default_rng(seed))
+    scores = evaluate(etype, np.clip(traj.reshape(-1, d), 0.0, 1.0), intervals).reshape(r, d + 1, -1)
+    diff = scores[:, 1:] - scores[:, :-1]                 # (r, d, metode), langkah ke-j
+    rows = np.arange(r)[:, None]
+    ee = np.empty((r, d, len(METHODS)))
+    ee[rows, order] = diff / (sign[rows, order] * delta)[:, :, None]
+    res = {m: (np.mean(np.abs(ee[:, :, j]), axis=0), np.mean(ee[:, :, j], axis=0),
+               np.std(ee[:, :, j], axis=0, ddof=1) if r > 1 else np.zeros(d))
+           for j, m in enumerate(METHODS)}
+    return res, r * (d + 1)
+
+def rule_specs_for(etype):
+    return fuzzy.rule_specs_z if etype in ('Zombie', 'Skeleton') else fuzzy.rule_specs
+
+def rule_analysis(etype, u, intervals=None):
+    """Per rule: firing maks (label Sugeno/Tsukamoto dan Mamdani), share aktif, |delta| mean/maks per metode."""
+    specs = rule_specs_for(etype)
+    x = LO + u * (HI - LO)
+    if etype in ('Zombie', 'Skeleton'):
+        deg = fuzzy._degrees_no_mana_batch(x[:, 0], x[:, 1], x[:, 4], intervals)
+    else:
+        deg = fuzzy._degrees_with_mana_batch(*x.T, intervals)
+    fire = fuzzy._firing_batch(deg, specs, len(x))
+    fire_m = fuzzy._firing_batch(deg, specs, len(x), fuzzy._MAMDANI_LABELS)
+    base = evaluate(etype, u, intervals)
+    rows = []
+    for i, (conds, out) in enumerate(specs):
+        delta = np.abs(evaluate(etype, u, intervals, specs[:i] + specs[i + 1:]) - base)
+        rows.append({'rule': i, 'conds': ' & '.join(conds), 'out': out,
+                     'fire_max': float(fire[i][0].max()), 'fire_max_mamdani': float(fire_m[i][0].max()),
+                     'active': float(np.mean(fire[i][0] > 0)),
+                     'delta_mean': delta.mean(axis=0), 'delta_max': delta.max(axis=0)})
+    return rows, len(u) * (len(specs) + 1)
+
+def main():
+    ap = argparse.ArgumentParser(description="Sobol/Morris sensitivity analysis of the fuzzy controllers")
+    ap.add_argument("--etype", action="append", choices=ETYPES, default=None, help="default semua entity")
+    ap.add_argument("--samples", type=int, default=SAMPLES, help="N Sobol (dibulatkan ke pangkat 2)")
+    ap.add_argument("--trajectories", type=int, default=TRAJECTORIES, help="R trajectory Morris")
+    ap.add_argument("--levels", type=int, default=LEVELS, help="p level grid Morris")
+    ap.add_argument("--bootstrap", type=int, default=BOOTSTRAP)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--intervals", default=None, help="file JSON interval membership")
+    ap.add_argument("--no-rules", action="store_true", help="lewati ablation rule")
+    ap.add_argument("--name", default=None)
+    ap.add_argument("--out", default=OUT_DIR)
+    args = ap.parse_args()
+    if args.samples < 2 or args.trajectories < 1 or args.levels < 2 or args.bootstrap < 1:
+        ap.error("--samples >= 2, --trajectories >= 1, --levels >= 2, --bootstrap >= 1")
+
+    intervals = None
+    if args.intervals:
+        with open(args.intervals) as f:
+            intervals = json.load(f)
+    etypes = args.etype or list(ETYPES)
+    path = os.path.join(args.out, args.name or time.strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(path, exist_ok=True)
+
+    sobol_w = tablewriter.open_table(path, 'sobol', ['etype', 'method', 'input', 'S1', 'S1_ci', 'ST', 'ST_ci'])
+    morris_w = tablewriter.open_table(path, 'morris', ['etype', 'method', 'input', 'mu_star', 'mu', 'sigma'])
+    rules_w = None if args.no_rules else tablewriter.open_table(
+        path, 'rules', ['etype', 'rule', 'conds', 'out', 'fire_max', 'fire_max_mamdani', 'active']
+        + [f'{m}_delta_{s}' for m in METHODS for s in ('mean', 'max')] + ['dead'])
+    meta = {'samples': args.samples, 'trajectories': args.trajectories, 'levels': args.levels,
+            'bootstrap': args.bootstrap, 'seed': args.seed, 'intervals': intervals,
+            'sampler': 'sobol' if qmc is not None else 'random', 'etypes': {}}
+    with sobol_w, morris_w:
+        for etype in etypes:
+            t0 = time.perf_counter()
+            sob, a, n_sob = sobol_analysis(etype, args.samples, args.seed, intervals, args.bootstrap)
+            mor, n_mor = morris_analysis(etype, args.trajectories, args.levels, args.seed, intervals)
+            points = n_sob + n_mor
+            print(f"{etype}:")
+            for m in METHODS:
+                s1, s1_ci, st, st_ci = sob[m]
+                mu_star, mu, sigma = mor[m]
+                for i, inp in enumerate(INPUTS):
+                    sobol_w.writerow([etype, m, inp, s1[i], s1_ci[i], st[i], st_ci[i]])
+                    morris_w.writerow([etype, m, inp, mu_star[i], mu[i], sigma[i]])
+                rank = np.argsort(-st)
+                print(f"  {m:10s} ST " + ', '.join(f"{INPUTS[i]} {st[i]:.2f}" for i in rank)
+                      + " | mu* " + ', '.join(f"{INPUTS[i]} {mu_star[i]:.1f}" for i in np.argsort(-mu_star)))
+            dead = {}
+            if rules_w is not None:
+                rows, n_rule = rule_analysis(etype, a, intervals)
+                points += n_rule
+                for row in rows:
+                    flags = [m for j, m in enumerate(METHODS) if row['delta_max'][j] <= TOL]
+                    if flags:
+                        dead[row['rule']] = flags
+                    rules_w.writerow([etype, row['rule'], row['conds'], row['out'], row['fire_max'],
+                                      row['fire_max_mamdani'], row['active']]
+                                     + [float(v) for j in range(len(METHODS))
+                                        for v in (row['delta_mean'][j], row['delta_max'][j])]
+                                     + ['|'.join(flags)])
+                print("  rule dead: " + '; '.join(
+                    f"{m} " + (','.join(f"#{i}" for i, f in dead.items() if m in f) or '-') for m in METHODS))
+                idle = [f"#{row['rule']}" for row in rows if row['fire_max'] <= TOL]
+                if idle:
+                    print(f"  tidak pernah menyala (label Sugeno/Tsukamoto): {','.join(idle)}")
+            elapsed = time.perf_counter() - t0
+            print(f"  {points} titik dalam {elapsed:.2f} s ({points / elapsed:.0f} titik/s)")
+            meta['etypes'][etype] = {'points': points, 'seconds': elapsed, 'dead_rules': dead}
+    if rules_w is not None:
+        rules_w.close()
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    print(f"hasil -> {path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Statistik streaming untuk agregasi eksperimen — satu pass, memori tetap, bisa di-merge antar shard
+- RunningStats: count, mean, pstdev, min/max dan quantile
+- mean/pstdev memakai jumlah parsial integer eksak per eksponen float (representasi yang sama
+  dengan statistics._sum/_ss), jadi hasilnya identik bit-per-bit dengan statistics.mean/pstdev
+  berapa pun urutan data dan cara shard-nya digabung; memorinya O(jumlah eksponen), bukan O(n)
+- quantile/median/order_stat: eksak selama data <= EXACT_MAX (sama dengan statistics.median),
+  setelah itu nilai dipadatkan ke TDigest (merging t-digest, ukuran terbatas oleh compression)
+"""
+import math
+from fractions import Fraction
+
+import numpy as np
+
+EXACT_MAX = 65536          # nilai yang disimpan apa adanya sebelum pindah ke t-digest
+COMPRESSION = 200          # delta t-digest: jumlah centroid ~ compression
+_CHUNK = 512               # elemen per reduksi int64 (2**9 * 2**54 < 2**63, tidak overflow)
+_SQRT_BITS = 2 * 53 + 3
+
+def _sqrt_frac(n, m):
+    # sqrt(n/m) dibulatkan benar (round-to-odd lalu pembagian int/int), sama dengan statistics
+    def isqrt_rto(n, m):
+        a = math.isqrt(n // m)
+        return a | (a * a * m != n)
+    q = (n.bit_length() - m.bit_length() - _SQRT_BITS) // 2
+    if q >= 0:
+        return (isqrt_rto(n, m << 2 * q) << q) / 1
+    return isqrt_rto(n << -2 * q, m) / (1 << -q)
+
+class TDigest:
+    """Merging t-digest (skala k1). add_array/merge menampung ke buffer, _compress memadatkan."""
+    def __init__(self, compression=COMPRESSION):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self._buf_m = []
+        self._buf_w = []
+        self._buffered = 0
+
+    def add_array(self, values, weights=None):
+        values = np.asarray(values, dtype=float)
+        self._buf_m.append(values)
+        self._buf_w.append(np.ones(len(values)) if weights is None else np.asarray(weights, dtype=float))
+        self._buffered += len(values)
+        if self._buffered > 8 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        other._compress()
+        self.add_array(other.means, other.weights)
+
+    def _compress(self):
+        # centroid = run titik terurut dengan floor(k(q_kiri)) sama; tiap centroid mencakup
+        # paling banyak satu satuan skala k1, jadi ekor (q dekat 0/1) tetap beresolusi tinggi
+        if not self._buffered:
+            return
+        means = np.concatenate([self.means] + self._buf_m)
+        weights = np.concatenate([self.weights] + self._buf_w)
+        self._buf_m, self._buf_w, self._buffered = [], [], 0
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cum = np.cumsum(weights)
+        q_left = np.clip((cum - weights) / cum[-1], 0.0, 1.0)
+        k = np.floor(self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1))
+        starts = np.r_[0, np.flatnonzero(np.diff(k)) + 1]
+        w = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / w
+        self.weights = w
+
+    def quantile(self, q, lo, hi):
+        # interpolasi linear antar pusat centroid; lo/hi = min/max data sebenarnya
+        self._compress()
+        if len(self.means) == 1:
+            return float(self.means[0])
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[0.0], centers, [total]])
+        ys = np.concatenate([[lo], self.means, [hi]])
+        return float(np.interp(q * total, xs, ys))
+
+class RunningStats:
+    """
+    Akumulator satu pass: add() / extend() per nilai atau array, merge() untuk gabung shard.
+    mean()/pstdev()/median() identik dengan statistics untuk data float yang sama.
+    """
+    def __init__(self, exact_max=EXACT_MAX, compression=COMPRESSION):
+        self.count = 0
+        self.sx = {}       # eksponen e -> jumlah mantissa integer (nilai = m * 2**e)
+        self.sxx = {}      # eksponen e -> jumlah kuadrat mantissa (nilai = m*m * 2**(2e))
+        self.min = math.inf
+        self.max = -math.inf
+        self.exact_max = exact_max
+        self.compression = compression
+        self.values = []   # chunk nilai eksak (list array) selama count <= exact_max
+        self.digest = None
+
+    def add(self, x):
+        self.extend(np.array([x], dtype=float))
+
+    def extend(self, values):
+        arr = np.asarray(values, dtype=float).ravel()
+        if not len(arr):
+            return
+        if not np.isfinite(arr).all():
+            raise ValueError('RunningStats hanya menerima nilai finite')
+        self.count += len(arr)
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+        self._add_sums(arr)
+        if self.digest is None:
+            self.values.append(arr.copy())
+            if self.count > self.exact_max:
+                self._to_digest()
+        else:
+            self.digest.add_array(arr)
+
+    def _add_sums(self, arr):
+        # x = mant * 2**exp dengan mant 53-bit integer; jumlahkan per eksponen tanpa pembulatan
+        frac, exp = np.frexp(arr)
+        mant = np.ldexp(frac, 53).astype(np.int64)
+        exp = exp.astype(np.int64) - 53
+        order = np.argsort(exp, kind='stable')
+        mant, exp = mant[order], exp[order]
+        bounds = np.flatnonzero(np.diff(exp)) + 1
+        for grp_m, e in zip(np.split(mant, bounds), exp[np.r_[0, bounds]].tolist()):
+            s = ss = 0
+            absm = np.abs(grp_m)
+            hi, lo = absm >> 27, absm & ((1 << 27) - 1)
+            for i in range(0, len(grp_m), _CHUNK):
+                sl = slice(i, i + _CHUNK)
+                s += int(grp_m[sl].sum())
+                h, l = hi[sl], lo[sl]
+                ss += (int((h * h).sum()) << 54) + (int((h * l).sum()) << 28) + int((l * l).sum())
+            self.sx[e] = self.sx.get(e, 0) + s
+            self.sxx[e] = self.sxx.get(e, 0) + ss
+
+    def _to_digest(self):
+        self.digest = TDigest(self.compression)
+        for chunk in self.values:
+            self.digest.add_array(chunk)
+        self.values = []
+
+    def merge(self, other):
+        """Gabungkan akumulator shard lain ke sini (hasil sama seperti semua data di-extend ke satu)."""
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for e, s in other.sx.items():
+            self.sx[e] = self.sx.get(e, 0) + s
+        for e, s in other.sxx.items():
+            self.sxx[e] = self.sxx.get(e, 0) + s
+        if self.digest is None and other.digest is None and self.count <= self.exact_max:
+            self.values.extend(c.copy() for c in other.values)
+            return self
+        if self.digest is None:
+            self._to_digest()
+        if other.digest is not None:
+            self.digest.merge(other.digest)
+        for chunk in other.values:
+            self.digest.add_array(chunk)
+        return self
+
+    def _exact_sums(self):
+        sx = sum((Fraction(s) * Fraction(2) ** e for e, s in self.sx.items()), Fraction(0))
+        sxx = sum((Fraction(s) * Fraction(2) ** (2 * e) for e, s in self.sxx.items()), Fraction(0))
+        return sx, sxx
+
+    def mean(self):
+        if not self.count:
+            raise ValueError('mean membutuhkan minimal satu data')
+        sx, _ = self._exact_sums()
+        return float(sx / self.count)
+
+    def pstdev(self):
+        if not self.count:
+            raise ValueError('pstdev membutuhkan minimal satu data')
+        sx, sxx = self._exact_sums()
+        mss = (self.count * sxx - sx * sx) / self.count / self.count
+        return _sqrt_frac(mss.numerator, mss.denominator)
+
+    def quantile(self, q):
+        if not self.count:
+            raise ValueError('quantile membutuhkan minimal satu data')
+        if self.digest is not None:
+            return self.digest.quantile(q, self.min, self.max)
+        data = np.sort(np.concatenate(self.values))
+        return float(np.interp(q * (len(data) - 1), np.arange(len(data)), data))
+
+    def order_stat(self, k):
+        """Nilai ke-k (0-based) dari data terurut; eksak selama data <= exact_max, lalu dari t-digest."""
+        if not 0 <= k < self.count:
+            raise ValueError('order_stat: k di luar 0..count-1')
+        if self.digest is not None:
+            # pusat centroid ada di posisi kumulatif bobot - w/2, jadi rank k ada di (k + 0.5) / n
+            return self.digest.quantile((k + 0.5) / self.count, self.min, self.max)
+        if len(self.values) > 1:
+            self.values = [np.concatenate(self.values)]
+        return float(np.partition(self.values[0], k)[k])
+
+    def median(self):
+        if self.digest is not None:
+            return self.quantile(0.5)
+        if not self.count:
+            raise ValueError('median membutuhkan minimal satu data')
+        # sama dengan statistics.median: nilai tengah, atau rata-rata dua nilai tengah
+        data = np.sort(np.concatenate(self.values))
+        n = len(data)
+        if n % 2 == 1:
+            return float(data[n // 2])
+        return (float(data[n // 2 - 1]) + float(data[n // 2])) / 2
@@ -0,0 +1,180 @@
+"""
+Dense sweep — skor inference atas grid rapat (default: seluruh universe fuzzy) tanpa muat di RAM
+- Grid hp_p x hp_b x mana_p x mana_b x cd dipecah per chunk (indeks datar); tiap chunk
+  dihitung lewat fuzzy.get_all_scores_batch lalu ditulis ke <metode>.npy (open_memmap)
+- Ringkasan per metode (streamstats.RunningStats) dibangun chunk demi chunk -> summary.csv
+- progress di meta.json: sweep yang terputus dilanjutkan dari chunk terakhir yang selesai
+- Zombie/Skeleton tidak memakai mana, jadi sumbu mana diringkas menjadi satu titik (0)
+
+Pemakaian:
+  python sweep.py --etype Boss                              # seluruh universe (besar!)
+  python sweep.py --etype Boss --hp-p 0:101:5 --cd 5 --name boss_cd5
+  python sweep.py --etype Zombie --dtype float64
+Sumbu: "start:stop:step" (seperti range, boleh float), "a,b,c", atau satu nilai.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+import fuzzy
+import resultstore
+import streamstats
+
+OUT_DIR = os.path.join("experiments_out", "sweeps")
+CHUNK = 1 << 16
+AXES = ('hp_p', 'hp_b', 'mana_p', 'mana_b', 'cd')
+METHODS = ('mamdani', 'sugeno', 'tsukamoto')
+
+def default_axes():
+    return {'hp_p': fuzzy.x_hp, 'hp_b': fuzzy.x_hp, 'mana_p': fuzzy.x_mana,
+            'mana_b': fuzzy.x_mana, 'cd': fuzzy.x_cd}
+
+def parse_axis(text):
+    if ':' in text:
+        parts = [float(p) for p in text.split(':')]
+        return np.arange(*parts)
+    return np.array([float(v) for v in text.split(',')])
+
+def sweep_axes(etype, overrides=None):
+    """dict sumbu -> array nilai (float64); overrides: dict sumbu -> array."""
+    axes = {k: np.asarray(v, dtype=float) for k, v in default_axes().items()}
+    axes.update({k: np.asarray(v, dtype=float) for k, v in (overrides or {}).items()})
+    if etype in ('Zombie', 'Skeleton'):
+        axes['mana_p'] = axes['mana_b'] = np.zeros(1)
+    return axes
+
+class Sweep:
+    """
+    Satu sweep di direktori <out>/<name>: meta.json (spec + progress), <metode>.npy dengan
+    shape = panjang tiap sumbu, summary.csv setelah selesai.
+    """
+    def __init__(self, etype, axes, name=None, out_dir=OUT_DIR, chunk=CHUNK, dtype='float32', intervals=None):
+        self.etype = etype
+        self.axes = axes
+        self.chunk = chunk
+        self.dtype = np.dtype(dtype)
+        self.intervals = intervals
+        self.shape = tuple(len(axes[k]) for k in AXES)
+        self.size = int(np.prod(self.shape))
+        self.path = os.path.join(out_dir, name or etype.lower())
+        self.spec = {'etype': etype, 'axes': {k: axes[k].tolist() for k in AXES}, 'chunk': chunk,
+                     'dtype': self.dtype.str, 'intervals': intervals, 'fuzzy': resultstore.fuzzy_version()}
+        self.done_chunks = 0
+        os.makedirs(self.path, exist_ok=True)
+        meta = self._load_meta()
+        # spec sama -> lanjutkan; beda (atau belum ada) -> mulai dari awal
+        mode = 'r+' if meta is not None and meta['spec'] == self.spec else 'w+'
+        if mode == 'r+':
+            self.done_chunks = meta['done_chunks']
+        self.cols = {m: open_memmap(os.path.join(self.path, m + '.npy'), mode=mode, dtype=self.dtype,
+                                    shape=self.shape) for m in METHODS}
+        if mode == 'w+':
+            self._save_meta()
+
+    def _load_meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self):
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'spec': self.spec, 'shape': self.shape, 'done_chunks': self.done_chunks}, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+
+    @property
+    def n_chunks(self):
+        return -(-self.size // self.chunk)
+
+    def chunk_inputs(self, start, stop):
+        idx = np.unravel_index(np.arange(start, stop), self.shape)
+        return [self.axes[k][i] for k, i in zip(AXES, idx)]
+
+    def run(self, progress=None):
+        """Hitung chunk yang belum selesai; return dict metode -> RunningStats atas seluruh grid."""
+        stats = {m: streamstats.RunningStats() for m in METHODS}
+        flat = {m: col.reshape(-1) for m, col in self.cols.items()}
+        for c in range(self.n_chunks):
+            start, stop = c * self.chunk, min(self.size, (c + 1) * self.chunk)
+            if c >= self.done_chunks:
+                scores = fuzzy.get_all_scores_batch(self.etype, *self.chunk_inputs(start, stop),
+                                                    intervals=self.intervals)
+                for m in METHODS:
+                    flat[m][start:stop] = scores[m]
+                self.done_chunks = c + 1
+                if c % 16 == 15 or self.done_chunks == self.n_chunks:
+                    self.flush()
+            # ringkasan selalu dari nilai yang tersimpan (dtype file), jadi run baru dan run
+            # lanjutan menghasilkan summary yang sama; chunk lama tidak dihitung ulang
+            for m in METHODS:
+                stats[m].extend(flat[m][start:stop])
+            if progress is not None:
+                progress(c + 1, self.n_chunks)
+        self.flush()
+        return stats
+
+    def flush(self):
+        for col in self.cols.values():
+            col.flush()
+        self._save_meta()
+
+    def write_summary(self, stats):
+        path = os.path.join(self.path, 'summary.csv')
+        with open(path, 'w') as f:
+            f.write('method,count,mean,median,pstd,min,max\n')
+            for m in METHODS:
+                s = stats[m]
+                f.write(f"{m},{s.count},{s.mean()},{s.median()},{s.pstdev()},{s.min},{s.max}\n")
+        return path
+
+def main():
+    ap = argparse.ArgumentParser(description="Dense inference sweep to memory-mapped arrays")
+    ap.add_argument("--etype", required=True, choices=['Zombie', 'Skeleton', 'Enderman', 'Boss'])
+    for axis in AXES:
+        ap.add_argument("--" + axis.replace('_', '-'), default=None, help="default: seluruh universe")
+    ap.add_argument("--name", default=None, help="nama direktori output (default: etype)")
+    ap.add_argument("--out", default=OUT_DIR)
+    ap.add_argument("--chunk", type=int, default=CHUNK, help="titik per batch inference")
+    ap.add_argument("--dtype", default='float32', choices=['float32', 'float64'])
+    ap.add_argument("--intervals", default=None, help="file JSON interval membership")
+    args = ap.parse_args()
+
+    overrides = {a: parse_axis(getattr(args, a)) for a in AXES if getattr(args, a) is not None}
+    intervals = None
+    if args.intervals:
+        with open(args.intervals) as f:
+            intervals = json.load(f)
+    sw = Sweep(args.etype, sweep_axes(args.etype, overrides), args.name, args.out, args.chunk,
+               args.dtype, intervals)
+    disk = sw.size * sw.dtype.itemsize * len(METHODS)
+    print(f"{sw.path}: grid {'x'.join(map(str, sw.shape))} = {sw.size} titik, "
+          f"{sw.n_chunks} chunk, {disk / 2**20:.1f} MiB")
+    if sw.done_chunks:
+        print(f"melanjutkan dari chunk {sw.done_chunks}")
+    t0 = time.perf_counter()
+    last = [t0]
+
+    def progress(done, total):
+        now = time.perf_counter()
+        if now - last[0] >= 2.0 or done == total:
+            last[0] = now
+            print(f"  {done}/{total} chunk ({(now - t0):.1f} s)", flush=True)
+
+    stats = sw.run(progress)
+    elapsed = time.perf_counter() - t0
+    for m in METHODS:
+        s = stats[m]
+        print(f"  {m:10s} mean={s.mean():.3f} median={s.median():.3f} sd={s.pstdev():.3f} "
+              f"min={s.min:.3f} max={s.max:.3f}")
+    print(f"summary -> {sw.write_summary(stats)} ({elapsed:.1f} s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
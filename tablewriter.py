@@ -0,0 +1,162 @@
+"""
+Penulis tabel streaming untuk output eksperimen
+- StreamWriter: writerow() hanya memasukkan baris ke antrian; thread background menulis ke
+  semua sink, jadi baris pertama sudah ada di disk saat studi besar masih berjalan dan
+  baris tidak pernah dikumpulkan semua di memori
+- CsvSink: CSV biasa (csv.writer, sama persis dengan output lama)
+- ColumnarSink: direktori <name>.cols/ berisi satu file biner per kolom + meta.json;
+  angka -> float64/int64, teks -> kode uint32 dengan kamus (dictionary encoding).
+  Baca lagi dengan read_columnar() (np.memmap per kolom)
+"""
+import csv
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+FORMATS = ('csv', 'columnar', 'both')
+QUEUE_ROWS = 1024          # producer menunggu jika writer tertinggal sejauh ini
+COLUMN_BUFFER = 1 << 16    # byte per kolom sebelum ditulis ke file
+
+class CsvSink:
+    def __init__(self, path, header):
+        self.path = path
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(header)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+class ColumnarSink:
+    """Tipe kolom ditentukan dari baris pertama: str -> dict-encoded u4, int -> i8, lainnya -> f8."""
+    def __init__(self, path, header):
+        self.path = path
+        self.header = list(header)
+        self.rows = 0
+        self.dtypes = None
+        self.dicts = None
+        os.makedirs(path, exist_ok=True)
+        self.files = [open(os.path.join(path, f'{i:03d}.bin'), 'wb') for i in range(len(header))]
+        self.buffers = [bytearray() for _ in header]
+
+    def _init_types(self, row):
+        self.dtypes = []
+        for v in row:
+            if isinstance(v, str):
+                self.dtypes.append('<u4')
+            elif isinstance(v, (bool, int, np.integer)):
+                self.dtypes.append('<i8')
+            else:
+                self.dtypes.append('<f8')
+        self.dicts = [{} if dt == '<u4' else None for dt in self.dtypes]
+
+    def write(self, row):
+        if self.dtypes is None:
+            self._init_types(row)
+        for i, v in enumerate(row):
+            codes = self.dicts[i]
+            if codes is not None:
+                v = codes.setdefault('' if v is None else str(v), len(codes))
+            elif v is None:
+                v = np.nan
+            buf = self.buffers[i]
+            buf += np.array(v, dtype=self.dtypes[i]).tobytes()
+            if len(buf) >= COLUMN_BUFFER:
+                self.files[i].write(buf)
+                buf.clear()
+        self.rows += 1
+
+    def close(self):
+        for f, buf in zip(self.files, self.buffers):
+            f.write(buf)
+            f.close()
+        columns = []
+        for i, name in enumerate(self.header):
+            dt = self.dtypes[i] if self.dtypes else '<f8'
+            col = {'name': name, 'file': f'{i:03d}.bin', 'dtype': dt}
+            if self.dicts and self.dicts[i] is not None:
+                col['dictionary'] = list(self.dicts[i])
+            columns.append(col)
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump({'rows': self.rows, 'columns': columns}, f, indent=2)
+
+def read_columnar(path, decode=True):
+    """dict nama kolom -> array (memmap untuk kolom angka); decode: kode teks -> array string."""
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    out = {}
+    for col in meta['columns']:
+        fname = os.path.join(path, col['file'])
+        if meta['rows'] == 0:
+            arr = np.zeros(0, dtype=col['dtype'])
+        else:
+            arr = np.memmap(fname, dtype=col['dtype'], mode='r', shape=(meta['rows'],))
+        if decode and 'dictionary' in col:
+            arr = np.array(col['dictionary'], dtype=object)[arr]
+        out[col['name']] = arr
+    return out
+
+_STOP = object()
+
+class StreamWriter:
+    """Satu tabel ke satu atau lebih sink lewat thread writer. Pakai sebagai context manager."""
+    def __init__(self, sinks):
+        self.sinks = sinks
+        self.queue = queue.Queue(maxsize=QUEUE_ROWS)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name='table-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            row = self.queue.get()
+            if row is _STOP:
+                break
+            if self.error is not None:
+                continue
+            try:
+                for sink in self.sinks:
+                    sink.write(row)
+            except Exception as e:
+                self.error = e
+        for sink in self.sinks:
+            sink.close()
+
+    def writerow(self, row):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(list(row))
+
+    def writerows(self, rows):
+        for row in rows:
+            self.writerow(row)
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_table(out_dir, name, header, fmt='csv'):
+    """StreamWriter untuk <out_dir>/<name>.csv dan/atau <out_dir>/<name>.cols/ sesuai fmt."""
+    if fmt not in FORMATS:
+        raise ValueError(f'format output tidak dikenal: {fmt!r} (pilih {", ".join(FORMATS)})')
+    os.makedirs(out_dir, exist_ok=True)
+    sinks = []
+    if fmt in ('csv', 'both'):
+        sinks.append(CsvSink(os.path.join(out_dir, name + '.csv'), header))
+    if fmt in ('columnar', 'both'):
+        sinks.append(ColumnarSink(os.path.join(out_dir, name + '.cols'), header))
+    return StreamWriter(sinks)
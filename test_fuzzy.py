@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import fuzzy
+import tune
+
+ETYPES = ('Zombie', 'Skeleton', 'Enderman', 'Boss')
+
+def sample_inputs(seed, n=24):
+    # titik acak di universe + titik di luar universe (negatif, > 100, cd > 10) dan tepat di batas
+    rng = np.random.default_rng(seed)
+    x = rng.uniform([0, 0, 0, 0, 0], [100, 100, 100, 100, 10], size=(n, 5))
+    edge = np.array([[0, 0, 0, 0, 0], [100, 100, 100, 100, 10], [-5, 120, -1, 101, 12],
+                     [150, -20, 300, -50, -3], [50, 50, 50, 50, 5]], dtype=float)
+    return np.concatenate([x, edge])
+
+def custom_intervals(seed):
+    rng = np.random.default_rng(seed)
+    return {k: tune.perturb(rng, k, v, 0.1) for k, v in tune.default_intervals().items()}
+
+@pytest.mark.parametrize('etype', ETYPES)
+@pytest.mark.parametrize('with_intervals', [False, True])
+def test_batch_matches_scalar_bitwise(etype, with_intervals):
+    intervals = custom_intervals(1) if with_intervals else None
+    x = sample_inputs(ETYPES.index(etype))
+    batch = fuzzy.get_all_scores_batch(etype, *x.T, intervals=intervals)
+    scalar = [fuzzy.get_all_scores(etype, *row, intervals=intervals) for row in x]
+    for m in ('mamdani', 'sugeno', 'tsukamoto'):
+        want = np.array([float(s[m]) for s in scalar])
+        assert np.array_equal(batch[m], want), (m, np.abs(batch[m] - want).max())
@@ -0,0 +1,25 @@
+import numpy as np
+
+import fuzzy
+import instrument
+import sensitivity
+
+def test_rule_ablation_with_instrumentation():
+    # ablation (specs=...) tidak boleh masuk ke statistik rule base game
+    instrument.enable()
+    try:
+        instrument.reset()
+        u = np.random.default_rng(0).random((64, 5))
+        sensitivity.evaluate('Zombie', u)
+        rows, _ = sensitivity.rule_analysis('Boss', u)
+        sensitivity.rule_analysis('Zombie', u)
+        stats = instrument.rule_stats()
+    finally:
+        instrument.disable()
+        instrument.reset()
+    assert len(rows) == len(fuzzy.rule_specs)
+    assert len(stats['with_mana_batch']['rules']) == len(fuzzy.rule_specs)
+    assert len(stats['no_mana_batch']['rules']) == len(fuzzy.rule_specs_z)
+    # per rule_analysis: firing langsung + skor base = 2 batch; Zombie juga 1 batch evaluate
+    assert stats['no_mana_batch']['evals'] == 3 * len(u)
+    assert stats['with_mana_batch']['evals'] == 2 * len(u)
@@ -0,0 +1,19 @@
+import selfplay
+
+CONFIG = {'battles': 6, 'method': 'sugeno', 'seed': 0, 'max_turns': 30}
+
+def test_genome_changes_battle_outcome():
+    # cut-off behavior harus sampai ke aksi musuh: skor < 98 -> MOVE_RETREAT, musuh tidak pernah menyerang
+    base = selfplay.default_genome('Zombie')
+    shy = dict(base, cuts=[98, 99])
+    res_base = selfplay.evaluate_genome('Zombie', base, CONFIG)
+    res_shy = selfplay.evaluate_genome('Zombie', shy, CONFIG)
+    assert res_base['win_rate'] != res_shy['win_rate']
+
+def test_boss_heal_threshold_changes_battle_outcome():
+    base = selfplay.default_genome('Boss')
+    assert base['heal'][0] <= selfplay.heal_hp_max('Boss')
+    rare = dict(base, heal=[10, base['heal'][1]])
+    res_base = selfplay.evaluate_genome('Boss', base, CONFIG)
+    res_rare = selfplay.evaluate_genome('Boss', rare, CONFIG)
+    assert res_base['win_rate'] != res_rare['win_rate']
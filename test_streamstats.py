@@ -0,0 +1,18 @@
+import numpy as np
+
+import streamstats
+
+def test_order_stat_exact_and_digest():
+    rng = np.random.default_rng(0)
+    data = rng.normal(50, 10, 5000)
+    exact = streamstats.RunningStats()
+    digest = streamstats.RunningStats(exact_max=1000)
+    for part in np.array_split(data, 7):
+        exact.extend(part)
+        digest.extend(part)
+    ref = np.sort(data)
+    for k in (0, 100, 2499, 2500, 4999):
+        assert exact.order_stat(k) == ref[k]
+    assert digest.digest is not None
+    for k in (1000, 2500, 4000):
+        assert abs(digest.order_stat(k) - ref[k]) < 0.5
@@ -0,0 +1,268 @@
+"""
+Auto-tuner interval membership — random search + successive halving, paralel dan ter-cache
+- Kandidat = dict intervals (format fuzzy.get_membership_*): titik trapmf/trimf default digeser
+  acak (--jitter x lebar universe), bahu universe (0 / 100 / 10) tetap, lalu diurutkan
+- Tiap rung mengevaluasi kandidat yang tersisa pada prefix sampel titik yang makin panjang
+  (x eta) lewat fuzzy.get_all_scores_batch; hanya 1/eta terbaik yang lanjut (early stop)
+- Evaluasi di-cache (memori + experiments_out/tune/cache.jsonl) per (kandidat, objective,
+  etype, jumlah titik, seed, versi fuzzy.py), jadi run ulang / rung yang sama tidak dihitung lagi
+- Objective: nama bawaan (OBJECTIVES) atau "modul:fungsi" milik user dengan signature
+  f(etype, inputs, scores) -> float (lebih besar = lebih baik); inputs/scores: dict array
+
+Pemakaian:
+  python tune.py --objective fallback --candidates 2000 --workers 4
+  python tune.py --objective mymod:score --etypes Boss --groups hp_p,hp_b
+Hasil: experiments_out/tune/<name>.csv (kandidat rung terakhir) dan <name>_best.json
+(bisa dipakai di interval_sets spec experiments.py atau sweep.py --intervals).
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import fuzzy
+import resultstore
+import tablewriter
+
+OUT_DIR = os.path.join("experiments_out", "tune")
+ETYPES = ['Zombie', 'Skeleton', 'Enderman', 'Boss']
+# grup parameter -> key interval (with-mana / no-mana)
+GROUPS = {
+    'hp_p': ['hp_p_low', 'hp_p_med', 'hp_p_high'],
+    'hp_b': ['hp_b_low', 'hp_b_med', 'hp_b_high'],
+    'mana': ['mana_p_low', 'mana_p_med', 'mana_p_high', 'mana_b_low', 'mana_b_med', 'mana_b_high'],
+    'cd': ['cd_ready', 'cd_mid', 'cd_long'],
+    'hp': ['hp_l', 'hp_m', 'hp_h'],
+    'cd_z': ['cd_r', 'cd_m', 'cd_l'],
+}
+CANDIDATES = 1000
+ETA = 4
+RUNGS = 3
+MAX_POINTS = 4096          # titik per etype pada rung terakhir
+JITTER = 0.2
+TASK_SIZE = 32             # kandidat per task process pool
+
+# --- objective bawaan (lebih besar = lebih baik) ---
+def obj_spread(etype, inputs, scores):
+    # AI lebih "tegas": sebaran skor Sugeno lebar
+    return float(np.std(scores['sugeno']))
+
+def obj_fallback(etype, inputs, scores):
+    # dekat dengan heuristik fallback (negatif MSE)
+    fb = fuzzy._fallback_batch(etype in ('Zombie', 'Skeleton'), inputs['hp_p'], inputs['hp_b'],
+                               inputs['mana_p'], inputs['mana_b'], inputs['cd'])
+    return -float(np.mean((scores['sugeno'] - fb) ** 2))
+
+def obj_agree(etype, inputs, scores):
+    # Sugeno dan Tsukamoto sepakat (negatif selisih absolut rata-rata)
+    return -float(np.mean(np.abs(scores['sugeno'] - scores['tsukamoto'])))
+
+OBJECTIVES = {'spread': obj_spread, 'fallback': obj_fallback, 'agree': obj_agree}
+
+def resolve_objective(name):
+    if name in OBJECTIVES:
+        return OBJECTIVES[name]
+    if ':' not in name:
+        raise ValueError(f"objective tidak dikenal: {name!r} (bawaan: {', '.join(OBJECTIVES)} atau modul:fungsi)")
+    mod, func = name.split(':', 1)
+    return getattr(importlib.import_module(mod), func)
+
+def default_intervals():
+    out = dict(fuzzy.DEFAULT_INTERVALS_WITH_MANA)
+    out.update(fuzzy.DEFAULT_INTERVALS_NO_MANA)
+    return out
+
+def perturb(rng, key, params, jitter):
+    # geser tiap titik; titik yang berada di batas universe (bahu) tidak digeser
+    x = fuzzy.universe_for(key)
+    lo, hi = float(x[0]), float(x[-1])
+    out = []
+    for p in params:
+        if p in (lo, hi):
+            out.append(float(p))
+        else:
+            out.append(float(np.clip(p + rng.uniform(-jitter, jitter) * (hi - lo), lo, hi)))
+    return [round(v, 2) for v in sorted(out)]
+
+def sample_candidates(n, keys, seed, jitter=JITTER):
+    """List dict intervals; kandidat pertama = default ({}), sebagai pembanding."""
+    rng = np.random.default_rng(seed)
+    defaults = default_intervals()
+    cands = [{}]
+    seen = {'{}'}
+    while len(cands) < n:
+        cand = {k: perturb(rng, k, defaults[k], jitter) for k in keys}
+        key = json.dumps(cand, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            cands.append(cand)
+    return cands
+
+def sample_points(etypes, n, seed):
+    """etype -> dict input array (n titik acak dalam universe); prefix dipakai rung awal."""
+    rng = np.random.default_rng(seed)
+    out = {}
+    for etype in etypes:
+        pts = {'hp_p': rng.uniform(0, 100, n), 'hp_b': rng.uniform(0, 100, n),
+               'mana_p': rng.uniform(0, 100, n), 'mana_b': rng.uniform(0, 100, n),
+               'cd': rng.uniform(0, 10, n)}
+        if etype in ('Zombie', 'Skeleton'):
+            pts['mana_p'] = pts['mana_b'] = np.zeros(n)
+        out[etype] = pts
+    return out
+
+def evaluate(cand, objective, points, n):
+    """Rata-rata objective atas etype, memakai n titik pertama tiap etype."""
+    fn = resolve_objective(objective)
+    total = 0.0
+    for etype, pts in points.items():
+        inputs = {k: v[:n] for k, v in pts.items()}
+        scores = fuzzy.get_all_scores_batch(etype, inputs['hp_p'], inputs['hp_b'], inputs['mana_p'],
+                                            inputs['mana_b'], inputs['cd'], intervals=cand)
+        total += fn(etype, inputs, scores)
+    return total / len(points)
+
+def _evaluate_task(cands, objective, points, n):
+    return [evaluate(c, objective, points, n) for c in cands]
+
+class EvalCache:
+    """dict key -> nilai, ditambah append-only jsonl di disk (path None -> hanya memori)."""
+    def __init__(self, path=None):
+        self.path = path
+        self.values = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue   # baris terakhir terpotong (run sebelumnya dihentikan)
+                    self.values[rec['key']] = rec['value']
+        self.file = open(path, 'a') if path else None
+
+    def key(self, cand, objective, etypes, n, seed, max_points):
+        blob = json.dumps({'cand': cand, 'objective': objective, 'etypes': etypes, 'n': n, 'seed': seed,
+                           'max_points': max_points, 'fuzzy': resultstore.fuzzy_version()}, sort_keys=True)
+        return hashlib.sha1(blob.encode()).hexdigest()
+
+    def put(self, key, value):
+        self.values[key] = value
+        if self.file:
+            self.file.write(json.dumps({'key': key, 'value': value}) + '\n')
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+def successive_halving(cands, objective, etypes, seed=0, eta=ETA, rungs=RUNGS, max_points=MAX_POINTS,
+                       executor=None, cache=None, log=print):
+    """
+    Return list (skor, index kandidat) rung terakhir, terurut terbaik dulu, dan statistik per rung.
+    Rung r memakai max_points / eta**(rungs-1-r) titik; kandidat yang lanjut: ceil(n / eta) + default.
+    """
+    cache = cache or EvalCache()
+    points = sample_points(etypes, max_points, seed)
+    alive = list(range(len(cands)))
+    history = []
+    for r in range(rungs):
+        n = max(1, max_points // eta ** (rungs - 1 - r))
+        t0 = time.perf_counter()
+        keys = [cache.key(cands[i], objective, etypes, n, seed, max_points) for i in alive]
+        todo = [i for i, k in zip(alive, keys) if k not in cache.values]
+        if executor is None:
+            results = _evaluate_task([cands[i] for i in todo], objective, points, n)
+        else:
+            chunks = [todo[j:j + TASK_SIZE] for j in range(0, len(todo), TASK_SIZE)]
+            futures = [executor.submit(_evaluate_task, [cands[i] for i in ch], objective, points, n)
+                       for ch in chunks]
+            results = [v for fut in futures for v in fut.result()]
+        for i, v in zip(todo, results):
+            cache.put(cache.key(cands[i], objective, etypes, n, seed, max_points), v)
+        scored = sorted(((cache.values[k], i) for i, k in zip(alive, keys)), key=lambda t: (-t[0], t[1]))
+        elapsed = time.perf_counter() - t0
+        history.append({'rung': r, 'points': n, 'candidates': len(alive), 'evaluated': len(todo),
+                        'best': scored[0][0], 'seconds': elapsed})
+        log(f"rung {r}: {len(alive)} kandidat x {n} titik/etype, {len(todo)} dihitung "
+            f"({len(alive) - len(todo)} dari cache), best={scored[0][0]:.4f}, {elapsed:.1f} s")
+        if r == rungs - 1:
+            return scored, history
+        # kandidat 0 (default) selalu ikut sebagai pembanding
+        alive = sorted({i for _, i in scored[:max(1, math.ceil(len(scored) / eta))]} | ({0} & set(alive)))
+
+def main():
+    ap = argparse.ArgumentParser(description="Membership interval auto-tuner (successive halving)")
+    ap.add_argument("--objective", default="fallback", help=f"bawaan: {', '.join(OBJECTIVES)}; atau modul:fungsi")
+    ap.add_argument("--etypes", default="Enderman,Boss")
+    ap.add_argument("--groups", default=None,
+                    help=f"grup parameter yang di-tune ({', '.join(GROUPS)}); default sesuai etype")
+    ap.add_argument("--candidates", type=int, default=CANDIDATES)
+    ap.add_argument("--eta", type=int, default=ETA)
+    ap.add_argument("--rungs", type=int, default=RUNGS)
+    ap.add_argument("--max-points", type=int, default=MAX_POINTS)
+    ap.add_argument("--jitter", type=float, default=JITTER)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--name", default=None, help="nama file output (default: tune_<objective>)")
+    ap.add_argument("--out", default=OUT_DIR)
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--top", type=int, default=5)
+    args = ap.parse_args()
+
+    etypes = [e for e in args.etypes.split(',') if e]
+    bad = set(etypes) - set(ETYPES)
+    if bad:
+        ap.error(f"etype tidak dikenal: {', '.join(sorted(bad))}")
+    if args.groups:
+        groups = args.groups.split(',')
+    else:
+        groups = []
+        if any(e in ('Enderman', 'Boss') for e in etypes):
+            groups += ['hp_p', 'hp_b', 'mana', 'cd']
+        if any(e in ('Zombie', 'Skeleton') for e in etypes):
+            groups += ['hp', 'cd_z']
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        ap.error(f"grup tidak dikenal: {', '.join(sorted(unknown))}")
+    try:
+        resolve_objective(args.objective)   # gagal cepat sebelum membuat pool
+    except (ValueError, ImportError, AttributeError) as e:
+        ap.error(str(e))
+    keys = [k for g in groups for k in GROUPS[g]]
+    os.makedirs(args.out, exist_ok=True)
+    name = args.name or f"tune_{args.objective.replace(':', '_')}"
+
+    cands = sample_candidates(args.candidates, keys, args.seed, args.jitter)
+    cache = EvalCache(None if args.no_cache else os.path.join(args.out, 'cache.jsonl'))
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    t0 = time.perf_counter()
+    try:
+        scored, history = successive_halving(cands, args.objective, etypes, args.seed, args.eta, args.rungs,
+                                             args.max_points, executor, cache)
+    finally:
+        cache.close()
+        if executor is not None:
+            executor.shutdown()
+    elapsed = time.perf_counter() - t0
+
+    with tablewriter.open_table(args.out, name, ['rank', 'score', 'candidate', 'is_default', 'intervals']) as w:
+        for rank, (score, i) in enumerate(scored):
+            w.writerow([rank, score, i, int(i == 0), json.dumps(cands[i], sort_keys=True)])
+    best_score, best = scored[0]
+    with open(os.path.join(args.out, name + '_best.json'), 'w') as f:
+        json.dump(cands[best], f, indent=2, sort_keys=True)
+    default = [s for s, i in scored if i == 0][0]
+    print(f"{len(cands)} kandidat, {elapsed:.1f} s; best #{best} score={best_score:.4f} (default={default:.4f})")
+    for score, i in scored[:args.top]:
+        print(f"  #{i:<5d} {score:10.4f}  {json.dumps(cands[i], sort_keys=True)[:100]}")
+    print(f"hasil -> {os.path.join(args.out, name)}.csv, {name}_best.json")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Turn log — rekam setiap keputusan musuh ke file biner ringkas, lalu replay tanpa render
+- Satu record (ukuran tetap, RECORD_DTYPE) per aksi musuh: state sebelum, input fuzzy,
+  skor ketiga metode, behavior terpilih, dan state sesudah
+- TurnRecorder: ring buffer numpy + thread writer di background (render thread tidak menunggu I/O)
+- replay(): hitung ulang skor (batch) dan jalankan ulang Game.enemy_action dari state
+  sebelum tiap record; setiap perbedaan skor/behavior/hasil dilaporkan sebagai divergence.
+  Record yang skornya dari fallback (worker timeout/gagal, field source) di-replay dengan skor fallback
+- Parameter AI (main.AI_INTERVALS, fuzzy.HEAL_THRESHOLDS/BEHAVIOR_CUTS, dari --ai-params atau
+  layar interval) ditulis ke sidecar <log>.params.jsonl setiap kali berubah; replay memasangnya
+  lagi per segmen record lalu mengembalikan nilai semula
+
+Pemakaian:
+  python turnlog.py replay turn_logs/*.ftl
+"""
+import json
+import os
+import sys
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b'FZTL'
+VERSION = 2                # v2: field source
+LOG_EXT = '.ftl'
+PARAMS_EXT = '.params.jsonl'   # sidecar: {"from": index record pertama, "params": {...}} per baris
+RING_CAPACITY = 4096       # record di ring buffer sebelum producer mulai membuang (dropped)
+FLUSH_RECORDS = 256        # writer bangun saat sebanyak ini record menunggu
+FLUSH_INTERVAL_S = 0.5     # ... atau paling lambat tiap interval ini
+
+ETYPES = ('Zombie', 'Skeleton', 'Enderman', 'Boss')
+METHODS = ('mamdani', 'sugeno', 'tsukamoto')
+BEHAVIORS = ('WAIT', 'NON_FUZZY', 'HEAL', 'MELEE', 'RANGED_ATTACK', 'MOVE_CLOSE', 'MOVE_RETREAT',
+             'TELEPORT_CLOSE', 'TELEPORT_FAR')
+# asal skor: inference fuzzy, atau main.fallback_snapshot_scores (worker timeout/gagal)
+SOURCES = ('inference', 'fallback')
+
+_HEADER = struct.Struct('<4sHHBB')   # magic, version, itemsize, grid_w, grid_h
+
+# satu keputusan musuh; field b_* = sebelum aksi, a_* = sesudah aksi
+RECORD_DTYPE = np.dtype([
+    ('turn', '<u4'), ('unit', '<u2'), ('etype', 'u1'), ('method', 'u1'),
+    ('use_fuzzy', 'u1'), ('behavior', 'u1'), ('source', 'u1'),
+    ('occupied', '<u8'),                      # bitmask petak terisi unit lain (x + y*grid_w)
+    ('b_px', 'u1'), ('b_py', 'u1'), ('b_php', '<i2'), ('b_pmana', '<i2'),
+    ('b_ex', 'u1'), ('b_ey', 'u1'), ('b_ehp', '<i2'), ('b_emana', '<i2'), ('b_ecd', 'i1'),
+    ('inputs', '<f4', (5,)),                  # hp_p, hp_b, mana_p, mana_b, cd_p
+    ('scores', '<f8', (3,)),                  # urutan METHODS
+    ('a_ex', 'u1'), ('a_ey', 'u1'), ('a_ehp', '<i2'), ('a_emana', '<i2'), ('a_ecd', 'i1'),
+    ('a_php', '<i2'),
+])
+
+# log v1 (tanpa source) tetap bisa dibaca; source dianggap inference
+RECORD_DTYPE_V1 = np.dtype([(name, RECORD_DTYPE.fields[name][0]) for name in RECORD_DTYPE.names
+                            if name != 'source'])
+
+def occupied_mask(cells, grid_w):
+    mask = 0
+    for x, y in cells:
+        mask |= 1 << (x + y * grid_w)
+    return mask
+
+def mask_cells(mask, grid_w, grid_h):
+    return {(i % grid_w, i // grid_w) for i in range(grid_w * grid_h) if (mask >> i) & 1}
+
+def capture(game, enemy, scores, occupied):
+    """State sebelum aksi (dipanggil Game.act_enemy sebelum enemy_action)."""
+    p = game.player
+    others = set(occupied) - {enemy.pos()}
+    scores = scores or {}
+    return (
+        game.turn_no, game.turn_unit,
+        ETYPES.index(enemy.etype), METHODS.index(game.forced_inference) if game.forced_inference in METHODS else 0,
+        1 if getattr(game, 'use_fuzzy', True) else 0,
+        SOURCES.index('fallback') if getattr(game, 'last_ai_source', '').startswith('fallback') else 0,
+        occupied_mask(others, game.recorder.grid_w),
+        p.x, p.y, p.hp, getattr(p, 'mana', 0),
+        enemy.x, enemy.y, enemy.hp, getattr(enemy, 'mana', 0), getattr(enemy, 'heal_cooldown', 0),
+        (p.hp, enemy.hp, 0, getattr(enemy, 'mana', 0), 5),
+        tuple(float(scores.get(m, np.nan)) for m in METHODS),
+    )
+
+def make_record(game, enemy, before):
+    """Gabung state sebelum + behavior + state sesudah menjadi satu tuple RECORD_DTYPE."""
+    (turn, unit, etype, method, use_fuzzy, source, occ, px, py, php, pmana,
+     ex, ey, ehp, emana, ecd, inputs, scores) = before
+    behavior = BEHAVIORS.index(game.last_behavior) if game.last_behavior in BEHAVIORS else 0
+    return (turn, unit, etype, method, use_fuzzy, behavior, source, occ, px, py, php, pmana,
+            ex, ey, ehp, emana, ecd, inputs, scores,
+            enemy.x, enemy.y, enemy.hp, getattr(enemy, 'mana', 0), getattr(enemy, 'heal_cooldown', 0),
+            game.player.hp)
+
+class TurnRecorder:
+    """
+    record() hanya menyalin satu tuple ke ring buffer (tanpa I/O). Thread writer
+    menulis blok record yang menunggu ke file. Jika ring penuh, record baru dibuang
+    dan dihitung di `dropped` supaya frame tidak pernah menunggu disk.
+    """
+    def __init__(self, path, grid_w=8, grid_h=6, capacity=RING_CAPACITY):
+        if grid_w * grid_h > 64:
+            raise ValueError('occupied bitmask hanya muat grid <= 64 petak')
+        self.path = path
+        self.grid_w, self.grid_h = grid_w, grid_h
+        self.capacity = capacity
+        self.ring = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self.head = 0      # total record masuk
+        self.tail = 0      # total record sudah ditulis
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+        self.params = None
+        self.params_version = None
+        if os.path.exists(path + PARAMS_EXT):
+            os.remove(path + PARAMS_EXT)
+        self.file = open(path, 'wb')
+        self.file.write(_HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, grid_w, grid_h))
+        self.thread = threading.Thread(target=self._writer, name='turnlog-writer', daemon=True)
+        self.thread.start()
+
+    def record(self, values):
+        with self.cond:
+            if self.closed:
+                return
+            if self.head - self.tail >= self.capacity:
+                self.dropped += 1
+                return
+            self.ring[self.head % self.capacity] = values
+            self.head += 1
+            if self.head - self.tail >= FLUSH_RECORDS:
+                self.cond.notify()
+
+    def set_params(self, params, version=None):
+        """
+        Parameter AI (format main.apply_ai_params) untuk record berikutnya; sidecar ditulis hanya jika
+        berubah. version: main.AI_PARAMS_VERSION, supaya pemanggil bisa melewati snapshot yang sama.
+        """
+        self.params_version = version
+        if params == self.params:
+            return
+        self.params = params
+        with self.cond:
+            start = self.head
+        with open(self.path + PARAMS_EXT, 'a') as f:
+            f.write(json.dumps({'from': start, 'params': params}) + '\n')
+
+    def _writer(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.closed or self.head - self.tail >= FLUSH_RECORDS,
+                                   timeout=FLUSH_INTERVAL_S)
+                start, end, closed = self.tail, self.head, self.closed
+            # slot [start, end) tidak ditimpa producer sampai tail dimajukan
+            if end > start:
+                i, j = start % self.capacity, end % self.capacity
+                if i < j:
+                    self.file.write(self.ring[i:j].tobytes())
+                else:
+                    self.file.write(self.ring[i:].tobytes())
+                    self.file.write(self.ring[:j].tobytes())
+                with self.cond:
+                    self.tail = end
+            if closed:
+                break
+        self.file.flush()
+
+    def close(self):
+        with self.cond:
+            if self.closed:
+                return
+            self.closed = True
+            self.cond.notify()
+        self.thread.join()
+        self.file.close()
+
+def read_log(path):
+    """Return (records ndarray RECORD_DTYPE, grid_w, grid_h)."""
+    with open(path, 'rb') as f:
+        magic, version, itemsize, grid_w, grid_h = _HEADER.unpack(f.read(_HEADER.size))
+        dtype = {1: RECORD_DTYPE_V1, VERSION: RECORD_DTYPE}.get(version) if magic == MAGIC else None
+        if dtype is None or itemsize != dtype.itemsize:
+            raise ValueError(f'{path}: bukan turn log v1..v{VERSION}')
+        data = f.read()
+    n = len(data) // itemsize
+    recs = np.frombuffer(data[:n * itemsize], dtype=dtype)
+    if dtype is not RECORD_DTYPE:
+        out = np.zeros(n, dtype=RECORD_DTYPE)
+        for name in dtype.names:
+            out[name] = recs[name]
+        recs = out
+    return recs, grid_w, grid_h
+
+def read_params(path):
+    """Segmen parameter AI dari sidecar: list (index record pertama, params); [] jika tidak ada sidecar."""
+    if not os.path.exists(path + PARAMS_EXT):
+        return []
+    with open(path + PARAMS_EXT) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [(int(e['from']), e['params']) for e in entries]
+
+class applied_params:
+    """Pasang parameter AI dari log selama blok with (None -> tidak diubah), lalu kembalikan."""
+    def __init__(self, params):
+        self.params = params
+
+    def __enter__(self):
+        import fuzzy
+        import main
+        self.targets = (main.AI_INTERVALS, fuzzy.HEAL_THRESHOLDS, fuzzy.BEHAVIOR_CUTS)
+        self.saved = [dict(t) for t in self.targets]
+        if self.params is not None:
+            main.AI_INTERVALS.clear()
+            main.apply_ai_params(self.params)
+        return self
+
+    def __exit__(self, *exc):
+        import main
+        for target, saved in zip(self.targets, self.saved):
+            target.clear()
+            target.update(saved)
+        main.ai_params_changed()
+
+def _rescore(recs, intervals=None):
+    # skor semua record dihitung ulang sekaligus, satu batch per tipe musuh
+    # intervals: etype -> dict interval (main.AI_INTERVALS saat record dibuat)
+    # record bersumber fallback (worker timeout/gagal) dibandingkan dengan skor fallback, bukan inference
+    import fuzzy
+    import main
+    scores = np.full((len(recs), 3), np.nan)
+    for code, etype in enumerate(ETYPES):
+        idx = np.nonzero(recs['etype'] == code)[0]
+        if len(idx) == 0:
+            continue
+        inp = recs['inputs'][idx].astype(np.float64)
+        batch = fuzzy.get_all_scores_batch(etype, *[inp[:, k] for k in range(5)],
+                                           intervals=(intervals or {}).get(etype))
+        for k, m in enumerate(METHODS):
+            scores[idx, k] = batch[m]
+    for i in np.nonzero(recs['source'] == SOURCES.index('fallback'))[0]:
+        inp = recs['inputs'][i].astype(np.float64)
+        snapshot = {'player_hp': inp[0], 'units': [(ETYPES[recs['etype'][i]], inp[1], inp[3])]}
+        fb = main.fallback_snapshot_scores(snapshot)[0]
+        scores[i] = [fb[m] for m in METHODS]
+    return scores
+
+def _replay_record(main, game, r, scores, grid_w, grid_h, flag):
+    logged = r['scores']
+    logged_ok = ~np.isnan(logged)
+    if not np.array_equal(logged[logged_ok], scores[logged_ok]):
+        flag('scores', logged.tolist(), scores.tolist())
+    etype = ETYPES[r['etype']]
+    game.use_fuzzy = bool(r['use_fuzzy'])
+    game.forced_inference = METHODS[r['method']]
+    game.enemy_type = etype
+    player = main.Unit(int(r['b_px']), int(r['b_py']), int(r['b_php']), main.PLAYER_ATK, 'PLAYER',
+                       mana=int(r['b_pmana']))
+    enemy = game.make_enemy(etype, int(r['b_ex']), int(r['b_ey']))
+    enemy.hp, enemy.mana, enemy.heal_cooldown = int(r['b_ehp']), int(r['b_emana']), int(r['b_ecd'])
+    others = mask_cells(int(r['occupied']), grid_w, grid_h)
+    blockers = [main.Unit(x, y, 1, 0, 'ENEMY') for x, y in others if (x, y) != player.pos()]
+    game.player, game.enemy = player, enemy
+    game.units = [player, enemy] + blockers
+    game.anim.remove(enemy.anim)
+    occupied = others | {enemy.pos()}
+    game.enemy_action(enemy, scores=dict(zip(METHODS, scores.tolist())), occupied=occupied)
+
+    behavior = BEHAVIORS.index(game.last_behavior) if game.last_behavior in BEHAVIORS else 0
+    if behavior != r['behavior']:
+        flag('behavior', BEHAVIORS[r['behavior']], BEHAVIORS[behavior])
+    got = (enemy.x, enemy.y, enemy.hp, enemy.mana, enemy.heal_cooldown, player.hp)
+    want = tuple(int(r[f]) for f in ('a_ex', 'a_ey', 'a_ehp', 'a_emana', 'a_ecd', 'a_php'))
+    if got != want:
+        flag('result', want, got)
+
+def replay(path, max_report=10):
+    """
+    Re-simulasi setiap record dari state sebelumnya memakai kode AI saat ini.
+    Return dict: records, elapsed, divergences (list (index, field, logged, replayed)).
+    """
+    import main
+    recs, grid_w, grid_h = read_log(path)
+    t0 = time.perf_counter()
+    # segmen [start, end) dengan parameter AI yang sama; log tanpa sidecar -> parameter saat ini
+    segments = read_params(path)
+    if not segments or segments[0][0] > 0:
+        segments.insert(0, (0, None))
+    bounds = [start for start, _ in segments[1:]] + [len(recs)]
+    game = main.Game.headless()
+    divergences = []
+    counts = {}
+
+    def flag(i, field, logged, got):
+        counts[field] = counts.get(field, 0) + 1
+        if len(divergences) < max_report:
+            divergences.append((i, field, logged, got))
+
+    for (start, params), end in zip(segments, bounds):
+        with applied_params(params):
+            scores = _rescore(recs[start:end], main.AI_INTERVALS)
+            for i in range(start, end):
+                _replay_record(main, game, recs[i], scores[i - start], grid_w, grid_h,
+                               lambda field, logged, got: flag(i, field, logged, got))
+    return {
+        'records': len(recs),
+        'elapsed': time.perf_counter() - t0,
+        'divergences': divergences,
+        'counts': counts,
+    }
+
+def main_cli(argv):
+    if len(argv) < 2 or argv[0] != 'replay':
+        print(__doc__)
+        return 2
+    status = 0
+    for path in argv[1:]:
+        res = replay(path)
+        rate = res['records'] / res['elapsed'] if res['elapsed'] > 0 else 0.0
+        print(f"{path}: {res['records']} keputusan, {res['elapsed']*1000:.0f} ms ({rate:.0f}/s)")
+        if res['counts']:
+            status = 1
+            print(f"  DIVERGENCE: {res['counts']}")
+            for i, field, logged, got in res['divergences']:
+                print(f"    #{i} {field}: log={logged} replay={got}")
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main_cli(sys.argv[1:]))